@@ -0,0 +1,69 @@
+"""Load-test the API against recorded Notion/OpenAI traffic.
+
+Record once against the live APIs (REPLAY_MODE=record while using the app),
+then run this script to replay the cassette with simulated latency and
+faults, e.g.:
+
+    REPLAY_LATENCY_MS=250 REPLAY_LATENCY_SIGMA=0.4 python benchmark_replay.py GET /api/tasks -n 200 -c 20
+
+While replaying, the mirror sync, pre-analysis and insight refresh workers
+are off and the LLM ledger, response cache and insight store are in memory,
+so only the benchmarked requests consume the cassette and no real data
+files are written.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import httpx
+
+os.environ.setdefault('REPLAY_MODE', 'replay')
+
+from src.main import create_app
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+async def benchmark(method: str, path: str, body, requests: int, concurrency: int):
+    app = create_app()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], {}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark', timeout=None) as client:
+            async def one():
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.request(method, path, json=body)
+                    latencies.append(time.perf_counter() - started)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(requests)))
+            elapsed = time.perf_counter() - started
+
+    print(f"{requests} x {method} {path} at concurrency {concurrency} in {elapsed:.2f}s")
+    print(f"throughput: {requests / elapsed:.1f} req/s, statuses: {statuses}")
+    print(
+        f"latency ms: mean {statistics.mean(latencies) * 1000:.1f}, "
+        f"p50 {percentile(latencies, 0.5) * 1000:.1f}, "
+        f"p95 {percentile(latencies, 0.95) * 1000:.1f}, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.1f}"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('method')
+    parser.add_argument('path')
+    parser.add_argument('--json', help='JSON request body')
+    parser.add_argument('-n', '--requests', type=int, default=100)
+    parser.add_argument('-c', '--concurrency', type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(benchmark(
+        args.method.upper(), args.path, json.loads(args.json) if args.json else None,
+        args.requests, args.concurrency
+    ))
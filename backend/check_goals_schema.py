@@ -1,6 +1,7 @@
 from notion_client import Client
 import os
 from dotenv import load_dotenv
+from src.services.notion.schema_cache import property_types
 
 # Load .env file
 dotenv_path = os.path.join(os.path.dirname(__file__), '.env')
@@ -12,6 +13,7 @@ notion = Client(auth=os.getenv('NOTION_API_KEY'))
 # Retrieve goals database schema
 try:
     response = notion.databases.retrieve(database_id=os.getenv('NOTION_GOALS_DATABASE_ID'))
-    print("Current properties:", list(response['properties'].keys()))
+    for name, prop_type in property_types(response).items():
+        print(f"{name}: {prop_type}")
 except Exception as e:
     print(f"Error retrieving database schema: {e}")
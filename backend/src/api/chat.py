@@ -1,18 +1,17 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from ..services.notion_client import NotionClient
 from ..services.task_intelligence import TaskIntelligenceService
-from ..core.config import Settings
+from ..services.chat_sessions import ChatSession, ChatSessionStore
+from ..services.openai import BudgetExceededError
+from ..services.openai.prompt_builder import render_task
+from ..core.dependencies import get_chat_sessions, get_notion_client, get_task_service
 from pydantic import BaseModel
 import logging
+import json
 
 router = APIRouter()
-settings = Settings()
-notion_client = NotionClient(settings)
-task_service = TaskIntelligenceService(
-    notion_client=notion_client,
-    openai_api_key=settings.OPENAI_API_KEY
-)
 
 logger = logging.getLogger(__name__)
 
@@ -24,34 +23,126 @@ class ChatRequest(BaseModel):
     messages: List[Message]
     taskId: str = None
     context: str = ""
+    sessionId: Optional[str] = None
+
+async def _prepare_turn(
+    request: ChatRequest,
+    notion_client: NotionClient,
+    sessions: ChatSessionStore
+) -> Tuple[ChatSession, str, Optional[Dict[str, Any]]]:
+    """Add the new messages to the session and render what is sent to the model.
+
+    With a `sessionId`, only the new messages need to be sent; history,
+    summary and task context are kept server-side. Session IDs are issued
+    by the server, so an unknown or expired one is a 404.
+    """
+    if request.sessionId:
+        session = sessions.get(request.sessionId)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Chat session not found")
+    else:
+        session = sessions.create()
+
+    # Load task context once per task rather than on every turn
+    task_data = None
+    if request.taskId:
+        task = await notion_client.get_task_record(request.taskId)
+        task_data = task.to_dict()
+        if request.taskId != session.task_id:
+            session.task_id = request.taskId
+            session.task_context = render_task(task)
+
+    for msg in request.messages:
+        session.add(msg.role, msg.content)
+    return session, session.render(request.context), task_data
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 @router.post("/api/chat")
-async def chat(request: ChatRequest) -> Dict[str, Any]:
+async def chat(
+    request: ChatRequest,
+    notion_client: NotionClient = Depends(get_notion_client),
+    task_service: TaskIntelligenceService = Depends(get_task_service),
+    sessions: ChatSessionStore = Depends(get_chat_sessions)
+) -> Dict[str, Any]:
     """Process chat messages and return AI response with potential task updates."""
     try:
-        # Get task context if taskId is provided
-        task_context = ""
-        task_data = None
-        if request.taskId:
-            task_data = await notion_client.get_task(request.taskId)
-            task_context = f"\nTask Context: {task_data}"
-
-        # Prepare the conversation history
-        conversation = request.context + "\n" if request.context else ""
-        for msg in request.messages:
-            conversation += f"{msg.role}: {msg.content}\n"
+        session, conversation, task_data = await _prepare_turn(request, notion_client, sessions)
 
         # Get AI response and potential task updates
         response, task_updates = await task_service.process_chat(
             conversation=conversation,
             task_data=task_data
         )
+        sessions.record_reply(session, response)
 
         return {
             "response": response,
-            "taskUpdates": task_updates
+            "taskUpdates": task_updates,
+            "sessionId": session.session_id
         }
 
+    except (HTTPException, BudgetExceededError):
+        raise
     except Exception as e:
         logger.error(f"Error in chat endpoint: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/api/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    notion_client: NotionClient = Depends(get_notion_client),
+    task_service: TaskIntelligenceService = Depends(get_task_service),
+    sessions: ChatSessionStore = Depends(get_chat_sessions)
+) -> StreamingResponse:
+    """Stream the AI response as server-sent events while it is generated.
+
+    Emits `token` events with visible text, then one `task_updates` event
+    with any parsed property updates, then `done` carrying the session ID.
+    """
+    try:
+        session, conversation, task_data = await _prepare_turn(request, notion_client, sessions)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in chat stream endpoint: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            reply = ""
+            async for event in task_service.stream_chat(
+                conversation=conversation,
+                task_data=task_data
+            ):
+                if event["type"] == "token":
+                    reply += event["content"]
+                    yield _sse("token", {"content": event["content"]})
+                else:
+                    yield _sse("task_updates", {"taskUpdates": event["taskUpdates"]})
+            sessions.record_reply(session, reply.strip())
+            yield _sse("done", {"sessionId": session.session_id})
+        except BudgetExceededError as e:
+            logger.warning(f"Chat stream stopped by LLM budget: {str(e)}")
+            yield _sse("error", {"detail": str(e), "status": 429})
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error(f"Error streaming chat: {str(e)}", exc_info=True)
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.delete("/api/chat/sessions/{session_id}")
+async def delete_session(
+    session_id: str,
+    sessions: ChatSessionStore = Depends(get_chat_sessions)
+) -> Dict[str, Any]:
+    """Discard a server-side chat session."""
+    if not sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return {"status": "success"}
@@ -1,34 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Dict
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, List
 
-from ..services.insights.engine import InsightEngine
-from ..core.dependencies import get_notion_client, get_openai_client
+from ..services.insights.store import InsightStore
+from ..core.dependencies import get_insight_store
 
 router = APIRouter(prefix="/insights", tags=["insights"])
 
 @router.get("/generate")
 async def generate_insights(
-    insight_engine: InsightEngine = Depends(lambda: InsightEngine(
-        get_notion_client(),
-        get_openai_client()
-    ))
+    insight_store: InsightStore = Depends(get_insight_store)
 ) -> Dict:
-    """Generate comprehensive insights across goals, tasks, and projects."""
+    """Latest insights across goals, tasks, and projects.
+
+    Served from the precomputed result; stale results are returned as-is
+    (with `stale: true`) while a fresh one is generated in the background.
+    """
     try:
-        return await insight_engine.generate_insights()
+        return await insight_store.get()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/history")
 async def get_insight_history(
-    insight_engine: InsightEngine = Depends(lambda: InsightEngine(
-        get_notion_client(),
-        get_openai_client()
-    ))
-) -> Dict:
+    limit: int = Query(10, ge=1, le=50),
+    insight_store: InsightStore = Depends(get_insight_store)
+) -> List[Dict]:
     """Retrieve historical insights and track changes over time."""
     try:
-        return await insight_engine.get_insight_history()
+        return insight_store.history(limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
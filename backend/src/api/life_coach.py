@@ -1,17 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import Dict
 from ..services.life_coach.service import LifeCoachService
 from ..core.dependencies import get_notion_client, get_openai_client
 
+def get_life_coach(request: Request) -> LifeCoachService:
+    return LifeCoachService(get_notion_client(request), get_openai_client(request))
+
 router = APIRouter(prefix="/life-coach", tags=["life-coach"])
 
 @router.get("/insights/{user_id}")
 async def get_insights(
     user_id: str,
-    life_coach: LifeCoachService = Depends(lambda: LifeCoachService(
-        get_notion_client(),
-        get_openai_client()
-    ))
+    life_coach: LifeCoachService = Depends(get_life_coach)
 ) -> Dict:
     """Get personalized insights and recommendations."""
     try:
@@ -23,10 +23,7 @@ async def get_insights(
 async def set_goal(
     user_id: str,
     goal: Dict,
-    life_coach: LifeCoachService = Depends(lambda: LifeCoachService(
-        get_notion_client(),
-        get_openai_client()
-    ))
+    life_coach: LifeCoachService = Depends(get_life_coach)
 ):
     """Set a new goal for tracking."""
     try:
@@ -1,34 +1,120 @@
-from fastapi import APIRouter, HTTPException, Request
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Dict, Any, Optional
+from datetime import date
 from ..services.notion_client import NotionClient, NotionClientError
+from ..services.notion.query import TaskQuery
 from ..services.task_intelligence import TaskIntelligenceService
-from ..core.config import Settings
+from ..services.openai import BudgetExceededError
+from ..core.dependencies import get_notion_client, get_task_service
+from pydantic import BaseModel
 import logging
 import json
 
 router = APIRouter()
-settings = Settings()
-notion_client = NotionClient(settings)
-task_service = TaskIntelligenceService(
-    notion_client=notion_client,
-    openai_api_key=settings.OPENAI_API_KEY
-)
+
+class TaskPropertyUpdate(BaseModel):
+    task_id: str
+    properties: Dict[str, Any]
+
+class BulkUpdateRequest(BaseModel):
+    updates: List[TaskPropertyUpdate]
+
+class BatchAnalyzeRequest(BaseModel):
+    task_ids: Optional[List[str]] = None
 
 logger = logging.getLogger(__name__)
 
+def task_query(
+    fields: Optional[str] = Query(None, description="Comma-separated property names to return"),
+    status: Optional[str] = None,
+    due_before: Optional[date] = None,
+    due_after: Optional[date] = None,
+    project: Optional[str] = Query(None, description="Related project page ID"),
+    sort: Optional[str] = Query(None, description="due_date, -due_date, last_edited or -last_edited")
+) -> TaskQuery:
+    try:
+        return TaskQuery(
+            status=status,
+            due_before=due_before,
+            due_after=due_after,
+            project=project,
+            sort=sort,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/api/tasks")
-async def get_tasks(request: Request) -> List[Dict[str, Any]]:
-    """Fetch all tasks from Notion with their properties."""
+async def get_tasks(
+    request: Request,
+    query: TaskQuery = Depends(task_query),
+    notion_client: NotionClient = Depends(get_notion_client)
+) -> List[Dict[str, Any]]:
+    """Fetch tasks from Notion, optionally filtered and trimmed to some properties."""
     try:
         logger.info("Attempting to fetch tasks from Notion...")
-        # Simple fetch with no filters or processing
-        return await notion_client.get_tasks()
+        if not query.has_filters and not query.fields:
+            return await notion_client.get_tasks()
+        return [task async for task in notion_client.query_tasks(query)]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching tasks: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/api/tasks/stream")
+async def stream_tasks(
+    request: Request,
+    query: TaskQuery = Depends(task_query),
+    notion_client: NotionClient = Depends(get_notion_client)
+) -> StreamingResponse:
+    """Stream tasks as newline-delimited JSON while Notion is paged."""
+    # Reject unsatisfiable filters before the response starts
+    try:
+        await notion_client.check_task_query(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def task_lines() -> AsyncIterator[str]:
+        try:
+            async for task in notion_client.query_tasks(query):
+                yield json.dumps(task) + "\n"
+        except NotionClientError as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error(f"Error streaming tasks: {str(e)}", exc_info=True)
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(task_lines(), media_type="application/x-ndjson")
+
+@router.patch("/api/tasks/properties")
+async def update_tasks_properties(
+    request: Request,
+    body: BulkUpdateRequest,
+    notion_client: NotionClient = Depends(get_notion_client)
+) -> Dict[str, Any]:
+    """Update properties of many tasks in one call, reporting a result per task."""
+    try:
+        results = await notion_client.update_tasks(
+            [(update.task_id, update.properties) for update in body.updates],
+            concurrency=request.app.state.settings.NOTION_BULK_CONCURRENCY
+        )
+        failed = sum(1 for result in results.values() if result["status"] != "success")
+        return {
+            "updated": len(results) - failed,
+            "failed": failed,
+            "results": results
+        }
+    except Exception as e:
+        logger.error(f"Error updating tasks: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.patch("/api/tasks/{task_id}/properties")
-async def update_task_properties(task_id: str, properties: Dict[str, Any]):
+async def update_task_properties(
+    task_id: str,
+    properties: Dict[str, Any],
+    notion_client: NotionClient = Depends(get_notion_client)
+):
     """Update task properties in Notion."""
     try:
         await notion_client.update_task(task_id, properties)
@@ -37,15 +123,53 @@ async def update_task_properties(task_id: str, properties: Dict[str, Any]):
         logger.error(f"Error updating task: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/api/tasks/analyze")
+async def analyze_tasks(
+    request: Request,
+    body: BatchAnalyzeRequest,
+    notion_client: NotionClient = Depends(get_notion_client),
+    task_service: TaskIntelligenceService = Depends(get_task_service)
+) -> StreamingResponse:
+    """Analyze many tasks (all of them when no IDs are given), streaming NDJSON results."""
+    settings = request.app.state.settings
+    wanted = {task_id.replace("-", "") for task_id in body.task_ids} if body.task_ids else None
+
+    async def result_lines() -> AsyncIterator[str]:
+        try:
+            tasks = [
+                (task.id, task.Title)
+                async for task in notion_client.iter_records('tasks')
+                if task.Title and (wanted is None or task.id.replace("-", "") in wanted)
+            ]
+            async for result in task_service.analyze_tasks(
+                tasks,
+                batch_size=settings.ANALYSIS_BATCH_SIZE,
+                concurrency=settings.ANALYSIS_BATCH_CONCURRENCY
+            ):
+                yield json.dumps(result) + "\n"
+        except BudgetExceededError as e:
+            logger.warning(f"Task analysis stopped by LLM budget: {str(e)}")
+            yield json.dumps({"error": str(e), "status": 429}) + "\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error(f"Error analyzing tasks: {str(e)}", exc_info=True)
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+
 @router.post("/api/tasks/{task_id}/analyze")
-async def analyze_task(task_id: str):
+async def analyze_task(
+    task_id: str,
+    notion_client: NotionClient = Depends(get_notion_client),
+    task_service: TaskIntelligenceService = Depends(get_task_service)
+):
     """Get AI recommendations for task properties."""
     try:
-        task = await notion_client.get_task(task_id)
-        task_title = task['properties']['Name']['title'][0]['text']['content']
-
-        analysis = await task_service.analyze_task(task_title)
+        task = await notion_client.get_task_record(task_id)
+        analysis = await task_service.analyze_task(task.Title)
         return analysis
+    except BudgetExceededError:
+        raise
     except Exception as e:
         logger.error(f"Error analyzing task: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, Any
+from ..services.openai.ledger import GROUPS, LLMLedger
+from ..core.dependencies import get_llm_ledger
+import logging
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+@router.get("/api/usage")
+async def get_usage(
+    group_by: str = Query("endpoint", description="endpoint, user or model"),
+    days: int = Query(1, ge=1, le=90),
+    ledger: LLMLedger = Depends(get_llm_ledger)
+) -> Dict[str, Any]:
+    """LLM tokens, cost and latency per endpoint, user or model, with today's budgets."""
+    if group_by not in GROUPS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {', '.join(GROUPS)}")
+    try:
+        return {
+            "group_by": group_by,
+            "days": days,
+            "usage": ledger.rollup(group_by, days),
+            "budgets": ledger.budget_status()
+        }
+    except Exception as e:
+        logger.error(f"Error reading LLM usage: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from typing import Optional
+from typing import Dict, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +18,80 @@ class Settings(BaseSettings):
     NOTION_GOALS_DATABASE_ID: str
     NOTION_PARENT_PAGE_ID: Optional[str] = None
 
+    # Pooled keep-alive connections shared by every Notion call
+    NOTION_POOL_MAX_CONNECTIONS: int = 10
+    NOTION_POOL_MAX_KEEPALIVE: int = 10
+    NOTION_POOL_KEEPALIVE_SECONDS: float = 30.0
+    NOTION_TIMEOUT_SECONDS: float = 30.0
+
+    # Shared request budget; Notion allows about 3 requests/second per integration
+    NOTION_RATE_LIMIT_PER_SECOND: float = 3.0
+    NOTION_RATE_LIMIT_BURST: int = 3
+    NOTION_MAX_RETRIES: int = 5
+    NOTION_BULK_CONCURRENCY: int = 3
+
+    # Seconds a cached database schema stays valid; also how long a schema change takes to be seen
+    NOTION_SCHEMA_CACHE_SECONDS: int = 300
+
+    # Seconds a fetched page is reused by get_task
+    NOTION_PAGE_CACHE_SECONDS: float = 5.0
+
+    # Local mirror of the Notion databases (disabled when no path is set)
+    NOTION_MIRROR_PATH: Optional[str] = None
+    NOTION_MIRROR_SYNC_SECONDS: int = 300
+    # Seconds between full ID scans that drop pages deleted in Notion from the mirror
+    NOTION_MIRROR_RECONCILE_SECONDS: int = 3600
+
+    # LLM response cache; entries persist on disk when a path is set
+    LLM_CACHE_PATH: Optional[str] = "llm_cache.sqlite"
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # LLM usage ledger; daily token budgets per "METHOD /route" ("*" for any other),
+    # and whether calls past a budget are downgraded to the fallback model or rejected
+    LLM_LEDGER_PATH: Optional[str] = "llm_ledger.sqlite"
+    LLM_DAILY_TOKEN_BUDGETS: Dict[str, int] = {}
+    LLM_BUDGET_ACTION: str = "downgrade"
+    LLM_FALLBACK_MODEL: str = "gpt-3.5-turbo"
+
+    # Precomputed insights: regenerated on a schedule, served stale-while-revalidate
+    INSIGHTS_STORE_PATH: Optional[str] = "insights.sqlite"
+    INSIGHTS_REFRESH_SECONDS: int = 3600
+    INSIGHTS_STALE_SECONDS: int = 900
+    # Pattern aggregates update from changed pages; a full rebuild runs this often
+    INSIGHTS_AGGREGATE_REBUILD_SECONDS: int = 7 * 24 * 3600
+
+    # Reuse the analysis of a previously analyzed title at least this similar (0-1)
+    ANALYSIS_SIMILARITY_THRESHOLD: float = 0.7
+
+    # Background pre-analysis of new and retitled tasks; 0 analyses per hour disables it
+    PRE_ANALYSIS_PER_HOUR: int = 30
+    PRE_ANALYSIS_INTERVAL_SECONDS: int = 120
+
+    # Batch task analysis: titles packed per prompt and prompts in flight
+    ANALYSIS_BATCH_SIZE: int = 25
+    ANALYSIS_BATCH_CONCURRENCY: int = 4
+
+    # Server-side chat sessions; older turns are summarized past the token threshold
+    CHAT_HISTORY_TOKENS: int = 1500
+    CHAT_KEEP_RECENT_MESSAGES: int = 6
+    CHAT_SESSION_TTL_SECONDS: int = 3600
+    CHAT_MAX_SESSIONS: int = 1000
+
+    # Offline record/replay of Notion and OpenAI traffic: "record", "replay" or unset
+    REPLAY_MODE: Optional[str] = None
+    REPLAY_CASSETTE_PATH: str = "replay_cassette.jsonl"
+    REPLAY_LATENCY_MS: float = 0.0
+    REPLAY_LATENCY_SIGMA: float = 0.0
+    REPLAY_RATE_LIMIT_RATE: float = 0.0
+    REPLAY_TIMEOUT_RATE: float = 0.0
+    REPLAY_SEED: int = 0
+
+    # Logging: "json" for structured lines or "text"; DEBUG records are sampled
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_DEBUG_SAMPLE_RATE: float = 0.1
+
     # Environment-specific settings
     environment: str = "development"
     debug: bool = True
@@ -75,7 +149,7 @@ class Settings(BaseSettings):
                 raise ValueError(f"Missing required environment variable: {var_name}")
 
         # Log optional variables
-        optionals = ["NOTION_PARENT_PAGE_ID"]
+        optionals = ["NOTION_PARENT_PAGE_ID", "NOTION_MIRROR_PATH", "LLM_CACHE_PATH", "LLM_LEDGER_PATH", "INSIGHTS_STORE_PATH"]
         for var_name in optionals:
             value = getattr(self, var_name)
             if value:
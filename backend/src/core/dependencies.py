@@ -1,7 +1,8 @@
-from fastapi import Security, HTTPException, Depends
+from fastapi import Security, HTTPException, Depends, Request
 from fastapi.security.api_key import APIKeyHeader
 from typing import Annotated
 from .config import Settings
+from ..services.openai.ledger import llm_caller
 
 api_key_header = APIKeyHeader(name="X-API-Key")
 
@@ -19,5 +20,47 @@ async def verify_api_key(
 def get_settings():
     return Settings()
 
+def get_notion_client(request: Request):
+    """The app-wide NotionClient created in the lifespan."""
+    return request.app.state.notion_client
+
+def get_openai_client(request: Request):
+    """The app-wide AsyncAIClient created in the lifespan."""
+    return request.app.state.openai_client
+
+def get_chat_sessions(request: Request):
+    """The app-wide ChatSessionStore created in the lifespan."""
+    return request.app.state.chat_sessions
+
+def get_task_service(request: Request):
+    """The app-wide TaskIntelligenceService created in the lifespan."""
+    return request.app.state.task_service
+
+def get_insight_store(request: Request):
+    """The app-wide InsightStore created in the lifespan."""
+    return request.app.state.insight_store
+
+def get_llm_ledger(request: Request):
+    """The app-wide LLMLedger created in the lifespan."""
+    return request.app.state.llm_ledger
+
+async def track_llm_usage(request: Request):
+    """Attribute LLM calls made for this request to its route and user.
+
+    Rejects the request up front when the route's daily token budget is spent
+    and the ledger is configured to reject rather than downgrade.
+    """
+    route = request.scope.get("route")
+    endpoint = f"{request.method} {route.path if route else request.url.path}"
+    user = request.headers.get("X-User-Id") or (request.client.host if request.client else "anonymous")
+    llm_caller.set((endpoint, user))
+
+    ledger = getattr(request.app.state, "llm_ledger", None)
+    if ledger is not None and ledger.action == "reject" and ledger.remaining(endpoint) == 0:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Daily LLM token budget for {endpoint} is exhausted"
+        )
+
 # Example of how to use in routes:
 # @router.get("/protected-endpoint", dependencies=[Depends(verify_api_key)])
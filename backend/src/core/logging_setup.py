@@ -0,0 +1,127 @@
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
+from datetime import datetime, timezone
+import atexit
+import copy
+import json
+import logging
+import queue
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+_listener: Optional[QueueListener] = None
+_exception_formatter = logging.Formatter()
+
+
+class LazyJson:
+    """Defers `json.dumps` of a payload until a handler actually formats it.
+
+    Pass as a logging argument (`logger.debug("Task: %s", LazyJson(task))`)
+    so disabled or sampled-out records never serialize anything.
+    """
+    __slots__ = ('payload', 'indent')
+
+    def __init__(self, payload: Any, indent: Optional[int] = None):
+        self.payload = payload
+        self.indent = indent
+
+    def __str__(self) -> str:
+        return json.dumps(self.payload, indent=self.indent, default=str)
+
+
+class JsonFormatter(logging.Formatter):
+    """Render each record as a single JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Keep one in every `1 / rate` DEBUG records per call site."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(int(round(1 / rate)), 1) if rate > 0 else 0
+        self._seen: Dict[Tuple[str, int], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.DEBUG:
+            return True
+        if not self.every:
+            return False
+        site = (record.pathname, record.lineno)
+        count = self._seen.get(site, 0)
+        self._seen[site] = count + 1
+        return count % self.every == 0
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueue a snapshot of each record; rendering to text runs on the listener thread.
+
+    By the time `prepare` runs the level and sampling checks have passed, so
+    the message is merged with its arguments here, while they still hold the
+    values they had at the call site. Arguments such as page dicts may be
+    mutated by the event loop after the call returns.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(level: str = "INFO", fmt: str = "json", debug_sample_rate: float = 1.0):
+    """Route all logging through a queue drained by a background thread.
+
+    Callers only pay for merging the message of records that pass the level
+    and sampling checks; rendering and writing happen off the event loop. Safe to call again to reconfigure.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    stream = logging.StreamHandler()
+    if fmt == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(log_queue)
+    if debug_sample_rate < 1.0:
+        handler.addFilter(DebugSampler(debug_sample_rate))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
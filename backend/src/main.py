@@ -1,16 +1,34 @@
+import asyncio
 import logging
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from .core.config import validate_settings
+from .core.logging_setup import configure_logging
+from .core.dependencies import track_llm_usage
 from .api.tasks import router as tasks_router
+from .api.chat import router as chat_router
+from .api.usage import router as usage_router
+from .api.insights import router as insights_router
+from .services.notion_client import NotionClient, configure_notion
+from .services.notion.mirror import MirrorSync
+from .services.notion.transport import NotionTransport
+from .services.task_intelligence import TaskIntelligenceService
+from .services.llm_cache import ResponseCache
+from .services.chat_sessions import ChatSessionStore
+from .services.similarity_index import SimilarityIndex
+from .services.replay import configure_replay, replay_settings
+from .services.pre_analysis import PreAnalysisWorker
+from .services.insights.aggregates import PatternAggregates
+from .services.insights.engine import InsightEngine
+from .services.insights.store import InsightStore
+from .services.openai import AsyncAIClient, BudgetExceededError, LLMLedger, get_openai_settings
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,  # Changed to DEBUG level
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Log through a background queue; reconfigured from settings in create_app
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Configure rate limiting
@@ -21,16 +39,124 @@ def create_app() -> FastAPI:
 
     # Validate settings at startup
     try:
-        settings = validate_settings()
+        settings = replay_settings(validate_settings())
+        configure_logging(
+            level=settings.LOG_LEVEL,
+            fmt=settings.LOG_FORMAT,
+            debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE
+        )
         logger.info("Environment configuration validated successfully")
     except Exception as e:
         logger.error(f"Failed to validate environment configuration: {str(e)}")
         raise
 
-    app = FastAPI(title="AI Coach API")
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Optionally record or replay all Notion and OpenAI traffic
+        cassette, wrap_transport = configure_replay(settings)
+
+        # One pooled transport and client per API for every router and service
+        configure_notion(settings)
+        transport = NotionTransport.from_settings(settings, wrap_transport=wrap_transport)
+        notion_client = NotionClient(settings, http_client=transport.http_client)
+        app.state.notion_transport = transport
+        app.state.notion_client = notion_client
+        llm_ledger = LLMLedger(
+            path=settings.LLM_LEDGER_PATH,
+            budgets=settings.LLM_DAILY_TOKEN_BUDGETS,
+            action=settings.LLM_BUDGET_ACTION,
+            fallback_model=settings.LLM_FALLBACK_MODEL
+        )
+        app.state.llm_ledger = llm_ledger
+        openai_client = AsyncAIClient(get_openai_settings(), wrap_transport=wrap_transport, ledger=llm_ledger)
+        app.state.openai_client = openai_client
+        response_cache = ResponseCache(
+            path=settings.LLM_CACHE_PATH,
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+        )
+        app.state.task_service = TaskIntelligenceService(
+            notion_client=notion_client,
+            openai_client=openai_client,
+            response_cache=response_cache,
+            similarity_index=SimilarityIndex(
+                threshold=settings.ANALYSIS_SIMILARITY_THRESHOLD,
+                ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+            )
+        )
+        indexed = await asyncio.to_thread(app.state.task_service.load_similarity_index)
+        logger.info(f"Indexed {indexed} previous task analyses for reuse")
+        chat_sessions = ChatSessionStore(
+            summarize=app.state.task_service.summarize_conversation,
+            max_history_tokens=settings.CHAT_HISTORY_TOKENS,
+            keep_recent=settings.CHAT_KEEP_RECENT_MESSAGES,
+            ttl_seconds=settings.CHAT_SESSION_TTL_SECONDS,
+            max_sessions=settings.CHAT_MAX_SESSIONS
+        )
+        app.state.chat_sessions = chat_sessions
+
+        sync_task = None
+        if notion_client.mirror:
+            logger.info(f"Keeping Notion mirror at {settings.NOTION_MIRROR_PATH} in sync")
+            sync = MirrorSync(
+                notion_client,
+                notion_client.mirror,
+                reconcile_seconds=settings.NOTION_MIRROR_RECONCILE_SECONDS
+            )
+            sync_task = asyncio.create_task(sync.run(settings.NOTION_MIRROR_SYNC_SECONDS))
+
+        app.state.pre_analysis = None
+        pre_analysis_task = None
+        if settings.PRE_ANALYSIS_PER_HOUR > 0:
+            app.state.pre_analysis = PreAnalysisWorker(
+                notion_client, app.state.task_service, analyses_per_hour=settings.PRE_ANALYSIS_PER_HOUR
+            )
+            pre_analysis_task = asyncio.create_task(
+                app.state.pre_analysis.run(settings.PRE_ANALYSIS_INTERVAL_SECONDS)
+            )
+
+        pattern_aggregates = PatternAggregates(
+            path=settings.INSIGHTS_STORE_PATH,
+            rebuild_seconds=settings.INSIGHTS_AGGREGATE_REBUILD_SECONDS
+        )
+        insight_store = InsightStore(
+            InsightEngine(notion_client, openai_client, aggregates=pattern_aggregates),
+            path=settings.INSIGHTS_STORE_PATH,
+            stale_seconds=settings.INSIGHTS_STALE_SECONDS
+        )
+        app.state.insight_store = insight_store
+        insights_task = None
+        if settings.INSIGHTS_REFRESH_SECONDS > 0:
+            insights_task = asyncio.create_task(insight_store.run(settings.INSIGHTS_REFRESH_SECONDS))
+        background = [task for task in (sync_task, pre_analysis_task, insights_task) if task]
+        try:
+            yield
+        finally:
+            for task in background:
+                task.cancel()
+            # Workers must unwind before the connections they write to are closed
+            await asyncio.gather(*background, return_exceptions=True)
+            await chat_sessions.close()
+            await insight_store.close()
+            pattern_aggregates.close()
+            await notion_client.close()
+            await transport.aclose()
+            await openai_client.close()
+            response_cache.close()
+            llm_ledger.close()
+            if settings.REPLAY_MODE == "record":
+                cassette.save(settings.REPLAY_CASSETTE_PATH)
+
+    # Every request sets who its LLM calls are billed to
+    app = FastAPI(title="AI Coach API", lifespan=lifespan, dependencies=[Depends(track_llm_usage)])
     app.state.limiter = limiter
     app.state.settings = settings  # Store settings in app state
 
+    @app.exception_handler(BudgetExceededError)
+    async def budget_exceeded(request: Request, exc: BudgetExceededError):
+        # An exhausted LLM budget is the caller's limit, not a server fault
+        return JSONResponse(status_code=429, content={"detail": str(exc)})
+
     # Configure CORS
     app.add_middleware(
         CORSMiddleware,
@@ -45,15 +171,17 @@ def create_app() -> FastAPI:
 
     # Include routers
     app.include_router(tasks_router)
+    app.include_router(chat_router)
+    app.include_router(usage_router)
+    app.include_router(insights_router)
 
     @app.get("/health")
     @limiter.limit("5/minute")
     async def health_check(request: Request):
         try:
-            # Test Notion connectivity
-            from .services.notion_client import NotionClient
-            notion = NotionClient(request.app.state.settings)
-            await notion.client.users.me()
+            # Test Notion connectivity over the shared pool
+            notion = request.app.state.notion_client
+            await notion.call(notion.client.users.me)
             notion_status = "connected"
         except Exception as e:
             logger.error(f"Notion health check failed: {str(e)}")
@@ -65,6 +193,10 @@ def create_app() -> FastAPI:
                 "notion": notion_status,
                 "openai": "ready"
             },
+            "notion_pool": request.app.state.notion_transport.metrics(),
+            "llm_cache": request.app.state.task_service.response_cache.stats(),
+            "pre_analysis": request.app.state.pre_analysis.stats() if request.app.state.pre_analysis else None,
+            "insights": request.app.state.insight_store.stats(),
             "environment": request.app.state.settings.environment
         }
 
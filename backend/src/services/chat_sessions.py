@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+import asyncio
+import logging
+import time
+import uuid
+from .openai.prompt_builder import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# (previous summary, messages to fold in) -> new summary
+Summarizer = Callable[[str, List[Dict[str, str]]], Awaitable[str]]
+
+class ChatSession:
+    """Messages, rolling summary and task context of one conversation."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.summary = ""
+        self.messages: List[Dict[str, str]] = []
+        self.task_id: Optional[str] = None
+        self.task_context = ""
+        self.updated = time.monotonic()
+        self.compacting = False
+        self.replies = 0
+
+    def add(self, role: str, content: str):
+        self.messages.append({"role": role, "content": content})
+        self.updated = time.monotonic()
+
+    def tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(
+            estimate_tokens(message["content"]) + 2 for message in self.messages
+        )
+
+    def render(self, context: str = "") -> str:
+        """Flatten the session into the conversation text sent to the model."""
+        conversation = context + "\n" if context else ""
+        if self.summary:
+            conversation += f"Summary of earlier conversation: {self.summary}\n"
+        if self.task_context:
+            conversation += f"Task Context: {self.task_context}\n"
+        for message in self.messages:
+            conversation += f"{message['role']}: {message['content']}\n"
+        return conversation
+
+
+class ChatSessionStore:
+    """In-memory chat sessions with rolling summarization of older turns.
+
+    Once a session's history passes `max_history_tokens`, everything but the
+    last `keep_recent` messages is folded into its summary in the background,
+    so each turn sends a roughly constant amount of text.
+    """
+
+    def __init__(
+        self,
+        summarize: Summarizer,
+        max_history_tokens: int = 1500,
+        keep_recent: int = 6,
+        ttl_seconds: float = 3600,
+        max_sessions: int = 1000
+    ):
+        self.summarize = summarize
+        self.max_history_tokens = max_history_tokens
+        self.keep_recent = keep_recent
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._compactions: Set[asyncio.Task] = set()
+
+    def create(self) -> ChatSession:
+        """Start a session; IDs are only ever generated here, never taken from clients."""
+        self._prune()
+        session = ChatSession(uuid.uuid4().hex)
+        self._sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        """The live session with this ID, or None if it is unknown or expired."""
+        self._prune()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def record_reply(self, session: ChatSession, content: str):
+        """Store the assistant's reply and compact the session if it grew too long.
+
+        A session that has only answered one request is not compacted: clients
+        that resend their full history each time never come back to it, so
+        summarizing it would be wasted work.
+        """
+        session.add("assistant", content)
+        session.replies += 1
+        if session.replies > 1 and session.tokens() > self.max_history_tokens and not session.compacting:
+            task = asyncio.create_task(self.compact(session))
+            self._compactions.add(task)
+            task.add_done_callback(self._compactions.discard)
+
+    async def compact(self, session: ChatSession):
+        """Fold all but the most recent messages into the session summary."""
+        cut = len(session.messages) - self.keep_recent
+        if cut <= 0 or session.compacting:
+            return
+        session.compacting = True
+        try:
+            older = session.messages[:cut]
+            session.summary = await self.summarize(session.summary, older)
+            # Messages added while summarizing sit after `cut` and are kept
+            session.messages = session.messages[cut:]
+            logger.debug("Compacted %d messages of chat session %s", cut, session.session_id)
+        except Exception as e:
+            logger.error(f"Error summarizing chat session {session.session_id}: {str(e)}", exc_info=True)
+        finally:
+            session.compacting = False
+
+    async def close(self):
+        for task in list(self._compactions):
+            task.cancel()
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.updated >= cutoff and len(self._sessions) < self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
@@ -0,0 +1,357 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from ..notion.records import is_done
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Bump when entries change shape; stored aggregates of another format are rebuilt
+AGGREGATES_FORMAT = 1
+
+# Blockers listed in the prompt, most overdue first
+MAX_BLOCKERS = 10
+
+# Upper bounds (days) of the completion-duration histogram buckets
+DURATION_BUCKETS = ((1, '<1d'), (3, '1-3d'), (7, '3-7d'), (28, '1-4w'), (math.inf, '>4w'))
+
+
+class TaskEntry:
+    """What one task page contributes to the aggregates."""
+    __slots__ = ('done', 'category', 'weekday', 'duration', 'title', 'due', 'delayed', 'dependencies')
+
+    def __init__(self, done, category, weekday, duration, title, due, delayed, dependencies):
+        self.done = done
+        self.category = category
+        self.weekday = weekday
+        self.duration = duration
+        self.title = title
+        self.due = due
+        self.delayed = delayed
+        self.dependencies = dependencies
+
+    @classmethod
+    def from_record(cls, task: Any) -> "TaskEntry":
+        done = is_done(task)
+        completed = task.get('CompletionDate')
+        weekday = duration = None
+        if done and isinstance(completed, datetime):
+            weekday = completed.strftime('%A')
+            started = task.get('StartDate') or task.get('CreatedDate')
+            if isinstance(started, datetime) and started <= completed:
+                duration = (completed - started).total_seconds() / 86400
+        due = task.get('DueDate')
+        return cls(
+            done=done,
+            category=task.get('Category'),
+            weekday=weekday,
+            duration=duration,
+            title=task.get('Title') or task.get('id'),
+            due=due if isinstance(due, datetime) else None,
+            delayed=bool(task.get('Delayed') or task.get('Status') == 'Delayed'),
+            dependencies=tuple(task.get('Dependencies', ()))
+        )
+
+    def to_json(self) -> List:
+        return [
+            self.done, self.category, self.weekday, self.duration, self.title,
+            self.due.isoformat() if self.due else None, self.delayed, list(self.dependencies)
+        ]
+
+    @classmethod
+    def from_json(cls, values: List) -> "TaskEntry":
+        done, category, weekday, duration, title, due, delayed, dependencies = values
+        return cls(
+            done, category, weekday, duration, title,
+            datetime.fromisoformat(due) if due else None, delayed, tuple(dependencies)
+        )
+
+
+class GoalEntry:
+    """What one goal page contributes to the aggregates."""
+    __slots__ = ('title', 'status', 'progress', 'related')
+
+    def __init__(self, title, status, progress, related):
+        self.title = title
+        self.status = status
+        self.progress = progress
+        self.related = related
+
+    @classmethod
+    def from_record(cls, goal: Any) -> "GoalEntry":
+        return cls(
+            goal.get('Title') or goal.get('id'), goal.get('Status'),
+            goal.get('Progress'), tuple(goal.get('RelatedTasks', ()))
+        )
+
+    def to_json(self) -> List:
+        return [self.title, self.status, self.progress, list(self.related)]
+
+    @classmethod
+    def from_json(cls, values: List) -> "GoalEntry":
+        title, status, progress, related = values
+        return cls(title, status, progress, tuple(related))
+
+
+ENTRY_TYPES = {'tasks': TaskEntry, 'goals': GoalEntry}
+
+
+class PatternAggregates:
+    """Running totals behind the insight engine's base patterns.
+
+    Every task and goal page leaves a small entry, and the totals (completion
+    counts, category, weekday and duration histograms, per-category duration
+    sums) move by removing a page's old entry and adding its new one. An
+    update is given only the pages edited since `checkpoint` and the IDs of
+    pages that disappeared, and touches nothing else. Open tasks are indexed
+    on their own so blockers come from the active set, not the whole
+    history. Entries persist in SQLite; `rebuild` walks every page and is
+    due (`needs_rebuild`) on first use, when the stored format is outdated,
+    and every `rebuild_seconds` to shed any drift.
+    """
+
+    def __init__(self, path: Optional[str] = None, rebuild_seconds: float = 7 * 24 * 3600):
+        self.rebuild_seconds = rebuild_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS aggregate_pages ("
+            "kind TEXT NOT NULL, id TEXT NOT NULL, edited TEXT, entry TEXT NOT NULL, PRIMARY KEY (kind, id))"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS aggregate_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._reset()
+        self.rebuilt_at = self._load()
+        self.last_update = {'changed': 0, 'removed': 0, 'full': False}
+
+    @property
+    def needs_rebuild(self) -> bool:
+        return self.rebuilt_at is None or time.time() - self.rebuilt_at > self.rebuild_seconds
+
+    @property
+    def checkpoint(self) -> Optional[datetime]:
+        """Latest edit time among folded pages; later edits are what `update` needs."""
+        return self._checkpoint
+
+    def page_ids(self, kind: str) -> Set[str]:
+        return set(self._pages[kind])
+
+    def update(
+        self,
+        changed: Mapping[str, Iterable],
+        removed: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> Dict[str, Any]:
+        """Fold edited or new pages into the totals and take removed ones out.
+
+        Pages whose edit time matches their stored entry are skipped, so the
+        delta may overlap the previous one.
+        """
+        folded = self._fold_pages(changed)
+        gone: List[Tuple[str, str]] = []
+        for kind, page_ids in (removed or {}).items():
+            pages = self._pages[kind]
+            kept = {record.get('id') for record in changed.get(kind, ())}
+            for page_id in page_ids:
+                if page_id in pages and page_id not in kept:
+                    self._replace(kind, page_id, None)
+                    del pages[page_id]
+                    gone.append((kind, page_id))
+        return self._finish(folded, gone, full=False)
+
+    def rebuild(self, data: Mapping) -> Dict[str, Any]:
+        """Recompute the totals from every page of `data`."""
+        self._reset()
+        return self._finish(self._fold_pages(data), [], full=True)
+
+    def _fold_pages(self, data: Mapping) -> List[Tuple[str, str, Optional[str], Any]]:
+        changed = []
+        for kind, entry_cls in ENTRY_TYPES.items():
+            pages = self._pages[kind]
+            for record in data.get(kind, ()):
+                page_id = record.get('id')
+                last_edited = record.get('LastEdited')
+                edited = _iso(last_edited)
+                # Pages without an edit time cannot be compared, so they are always refolded
+                if edited is not None and page_id in pages and pages[page_id][0] == edited:
+                    continue
+                entry = entry_cls.from_record(record)
+                self._replace(kind, page_id, entry)
+                pages[page_id] = (edited, entry)
+                changed.append((kind, page_id, edited, entry))
+                self._advance(last_edited)
+        return changed
+
+    def _finish(self, changed: List, removed: List, full: bool) -> Dict[str, Any]:
+        self._persist(changed, removed, full)
+        self.last_update = {'changed': len(changed), 'removed': len(removed), 'full': full}
+        logger.info(f"Updated insight aggregates: {self.last_update}")
+        return self.last_update
+
+    def _advance(self, edited: Any):
+        if isinstance(edited, datetime) and (self._checkpoint is None or edited > self._checkpoint):
+            self._checkpoint = edited
+
+    def patterns(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """The base patterns, read off the totals."""
+        return {
+            'completion_patterns': {
+                'total_tasks': self.total,
+                'completed_tasks': self.completed,
+                'completion_rate': round(self.completed / self.total, 3) if self.total else 0,
+                'completed_by_category': _positive(self.completed_by_category)
+            },
+            'goal_progress': self._goal_progress(),
+            'blockers': self._blockers(now or datetime.utcnow()),
+            'productivity_patterns': {
+                'completions_by_weekday': _positive(self.completions_by_weekday),
+                'average_days_to_complete': (
+                    round(self.duration_sum / self.duration_count, 1) if self.duration_count else None
+                ),
+                'duration_histogram': _positive(self.duration_histogram),
+                'duration_by_category': {
+                    category: _duration_stats(*stats)
+                    for category, stats in self.duration_by_category.items() if stats[0]
+                }
+            }
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _reset(self):
+        self._pages: Dict[str, Dict[str, Tuple[Optional[str], Any]]] = {kind: {} for kind in ENTRY_TYPES}
+        self.total = 0
+        self.completed = 0
+        self.completed_by_category: Counter = Counter()
+        self.completions_by_weekday: Counter = Counter()
+        self.duration_histogram: Counter = Counter()
+        self.duration_count = 0
+        self.duration_sum = 0.0
+        # category -> [count, sum, sum of squares]
+        self.duration_by_category: Dict[str, List[float]] = {}
+        self.done_ids = set()
+        self.open_tasks: Dict[str, TaskEntry] = {}
+        self._checkpoint: Optional[datetime] = None
+
+    def _replace(self, kind: str, page_id: str, entry: Any):
+        """Swap a page's current contribution for `entry` (None removes it)."""
+        if kind == 'goals':
+            return
+        current = self._pages[kind].get(page_id)
+        if current is not None:
+            self._fold(page_id, current[1], -1)
+        if entry is not None:
+            self._fold(page_id, entry, 1)
+
+    def _fold(self, page_id: str, task: TaskEntry, sign: int):
+        self.total += sign
+        if not task.done:
+            if sign > 0:
+                self.open_tasks[page_id] = task
+            else:
+                self.open_tasks.pop(page_id, None)
+            return
+        self.completed += sign
+        if sign > 0:
+            self.done_ids.add(page_id)
+        else:
+            self.done_ids.discard(page_id)
+        if task.category:
+            self.completed_by_category[task.category] += sign
+        if task.weekday:
+            self.completions_by_weekday[task.weekday] += sign
+        if task.duration is not None:
+            self.duration_count += sign
+            self.duration_sum += sign * task.duration
+            self.duration_histogram[_bucket(task.duration)] += sign
+            if task.category:
+                stats = self.duration_by_category.setdefault(task.category, [0, 0.0, 0.0])
+                stats[0] += sign
+                stats[1] += sign * task.duration
+                stats[2] += sign * task.duration ** 2
+
+    def _goal_progress(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                'goal': goal.title,
+                'status': goal.status,
+                'progress': goal.progress,
+                'related_tasks': len(goal.related),
+                'completed_tasks': sum(1 for task_id in goal.related if task_id in self.done_ids)
+            }
+            for _, goal in self._pages['goals'].values()
+        ]
+
+    def _blockers(self, now: datetime) -> List[Dict[str, Any]]:
+        """Open tasks that are delayed, overdue or waiting on unfinished dependencies."""
+        blockers = []
+        for task in self.open_tasks.values():
+            reasons = []
+            if task.delayed:
+                reasons.append('delayed')
+            if task.due and task.due < now:
+                reasons.append('overdue')
+            waiting = [dep for dep in task.dependencies if dep in self.open_tasks]
+            if waiting:
+                reasons.append(f"waiting on {len(waiting)} open tasks")
+            if reasons:
+                blockers.append((task.due or datetime.max, {'task': task.title, 'reasons': reasons}))
+        blockers.sort(key=lambda item: item[0])
+        return [blocker for _, blocker in blockers[:MAX_BLOCKERS]]
+
+    def _load(self) -> Optional[float]:
+        """Restore stored entries; returns when they were last fully rebuilt."""
+        with self._lock:
+            meta = dict(self._conn.execute("SELECT key, value FROM aggregate_meta").fetchall())
+            if meta.get('format') != str(AGGREGATES_FORMAT) or 'rebuilt_at' not in meta:
+                return None
+            rows = self._conn.execute("SELECT kind, id, edited, entry FROM aggregate_pages").fetchall()
+        for kind, page_id, edited, entry in rows:
+            if kind not in ENTRY_TYPES:
+                continue
+            entry = ENTRY_TYPES[kind].from_json(json.loads(entry))
+            self._replace(kind, page_id, entry)
+            self._pages[kind][page_id] = (edited, entry)
+            try:
+                self._advance(datetime.fromisoformat(edited))
+            except (TypeError, ValueError):
+                pass
+        logger.info(f"Loaded {len(rows)} insight aggregate entries")
+        return float(meta['rebuilt_at'])
+
+    def _persist(self, changed: Iterable, removed: Iterable, full: bool):
+        with self._lock, self._conn:
+            if full:
+                self._conn.execute("DELETE FROM aggregate_pages")
+                self.rebuilt_at = time.time()
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO aggregate_meta VALUES (?, ?)",
+                    [('format', str(AGGREGATES_FORMAT)), ('rebuilt_at', str(self.rebuilt_at))]
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO aggregate_pages VALUES (?, ?, ?, ?)",
+                [(kind, page_id, edited, json.dumps(entry.to_json())) for kind, page_id, edited, entry in changed]
+            )
+            self._conn.executemany("DELETE FROM aggregate_pages WHERE kind = ? AND id = ?", removed)
+
+
+def _iso(value: Any) -> Optional[str]:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value) if value else None
+
+def _bucket(days: float) -> str:
+    return next(label for bound, label in DURATION_BUCKETS if days < bound)
+
+def _positive(counts: Counter) -> Dict[str, int]:
+    return {key: count for key, count in counts.items() if count > 0}
+
+def _duration_stats(count: float, total: float, squares: float) -> Dict[str, float]:
+    mean = total / count
+    variance = max(squares / count - mean ** 2, 0.0)
+    return {'count': int(count), 'mean_days': round(mean, 2), 'stdev_days': round(math.sqrt(variance), 2)}
@@ -1,37 +1,71 @@
+import asyncio
 import json
-from typing import Dict, List
-from datetime import datetime
-import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Mapping, Optional, Tuple
+from .aggregates import ENTRY_TYPES, PatternAggregates
 from .ml_patterns import MLPatternAnalyzer
+from .snapshot import WorkspaceSnapshot, load_snapshot
+from ..notion.scheduler import Priority
+
+# Re-read pages edited shortly before the aggregates' checkpoint, since
+# Notion rounds edit times to the minute
+CHECKPOINT_OVERLAP = timedelta(minutes=2)
+
+Changes = Tuple[Dict[str, List], Dict[str, List[str]]]
 
 class InsightEngine:
-    def __init__(self, notion_client, openai_client):
+    def __init__(self, notion_client, openai_client, aggregates: Optional[PatternAggregates] = None):
         self.notion = notion_client
         self.openai = openai_client
         self.ml_analyzer = MLPatternAnalyzer()
+        # Base patterns are kept as running totals, refreshed from changed pages only
+        self.aggregates = aggregates or PatternAggregates()
 
     async def generate_insights(self) -> Dict:
-        data = await self._gather_data()
-        base_patterns = self._analyze_patterns(data)
-        ml_patterns = self.ml_analyzer.analyze_patterns(data)
-        return await self._synthesize_insights({**base_patterns, 'ml_patterns': ml_patterns})
-
-    async def _gather_data(self) -> Dict:
-        goals = await self.notion.get_database(os.getenv('NOTION_GOALS_DATABASE_ID'))
-        tasks = await self.notion.get_database(os.getenv('NOTION_TASKS_DATABASE_ID'))
-        projects = await self.notion.get_database(os.getenv('NOTION_PROJECTS_DATABASE_ID'))
-        return {'goals': goals, 'tasks': tasks, 'projects': projects}
-
-    def _analyze_patterns(self, data: Dict) -> Dict:
-        return {
-            'completion_patterns': self._analyze_completion_patterns(data),
-            'goal_progress': self._analyze_goal_progress(data),
-            'blockers': self._identify_blockers(data),
-            'productivity_patterns': self._analyze_productivity(data)
-        }
+        return await self.insights_for(await self.gather_data())
+
+    async def insights_for(self, data: Mapping) -> Dict:
+        """Run the pattern analyzers off the event loop, then synthesize insights."""
+        changes = await self._changes(data)
+        patterns = await asyncio.to_thread(self._all_patterns, data, changes)
+        return await self._synthesize_insights(patterns)
+
+    async def _changes(self, data: Mapping) -> Optional[Changes]:
+        """Pages edited since the aggregates' checkpoint and IDs gone from `data`.
+
+        Returns None when the aggregates are due a full rebuild instead.
+        """
+        checkpoint = self.aggregates.checkpoint
+        if self.aggregates.needs_rebuild or checkpoint is None:
+            return None
+        since = checkpoint - CHECKPOINT_OVERLAP
+        kinds = list(ENTRY_TYPES)
+        edited = await asyncio.gather(*(self._records_since(kind, since) for kind in kinds))
+        removed = {}
+        for kind in kinds:
+            live = {record.get('id') for record in data.get(kind, ())}
+            removed[kind] = [page_id for page_id in self.aggregates.page_ids(kind) if page_id not in live]
+        return dict(zip(kinds, edited)), removed
+
+    async def _records_since(self, kind: str, since: datetime) -> List:
+        return [record async for record in self.notion.iter_records_since(kind, since, priority=Priority.ANALYTICS)]
+
+    def _all_patterns(self, data: Mapping, changes: Optional[Changes] = None) -> Dict:
+        return {**self._analyze_patterns(data, changes), 'ml_patterns': self.ml_analyzer.analyze_patterns(data)}
+
+    async def gather_data(self) -> WorkspaceSnapshot:
+        return await load_snapshot(self.notion)
+
+    def _analyze_patterns(self, data: Mapping, changes: Optional[Changes] = None) -> Dict:
+        if changes is None:
+            self.aggregates.rebuild(data)
+        else:
+            self.aggregates.update(*changes)
+        return self.aggregates.patterns()
 
     def _create_insight_prompt(self, patterns: Dict) -> str:
         ml_insights = patterns.get('ml_patterns', {})
+        focus = ml_insights.get('behavior', {}).get('focus_periods', {})
         return f"""Analyze the following patterns and provide strategic insights:
 
 Task Completion:
@@ -46,7 +80,8 @@ Success Factors:
 {json.dumps(ml_insights.get('success_factors', {}), indent=2)}
 
 Behavior Patterns:
-- Focus Periods: {ml_insights.get('behavior', {}).get('focus_periods', [])}
+- Peak Focus Slots: {focus.get('peak_slots', [])}
+- Sustained Focus Windows: {focus.get('top_windows', [])}
 - Adaptability: {ml_insights.get('behavior', {}).get('adaptability_score', 0)}
 
 Provide insights formatted as JSON with keys: summary, patterns, recommendations, priorities"""
@@ -61,7 +96,5 @@ Provide insights formatted as JSON with keys: summary, patterns, recommendations
             ],
             temperature=0.7
         )
-        content = response.get('choices', [{}])[0].get('content', '{}')
+        content = response.choices[0].message.content or '{}'
         return json.loads(content)
-
-    # Previous methods remain unchanged
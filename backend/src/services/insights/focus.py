@@ -0,0 +1,114 @@
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+HOURS_PER_WEEK = 7 * 24
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+# Sustained focus windows and busiest hour-of-week slots reported
+TOP_WINDOWS = 5
+PEAK_SLOTS = 3
+
+# Longer start-to-completion spans are tasks left open, not focus sessions
+MAX_SESSION_HOURS = 24
+
+class FocusAccumulator:
+    """Fixed-size summary of focus sessions, built in one streaming pass.
+
+    A session is a task with both a start and a completion date at most
+    `MAX_SESSION_HOURS` apart; completions before the start are skipped.
+    Sessions are binned by the hour of the week they started in, so memory
+    and output size do not depend on how many tasks are added.
+    """
+
+    def __init__(self):
+        self.sessions = [0] * HOURS_PER_WEEK
+        self.hours = [0.0] * HOURS_PER_WEEK
+        self.scores = [0.0] * HOURS_PER_WEEK
+        self.focus = [0.0] * HOURS_PER_WEEK
+
+    def add(self, start: datetime, end: datetime, score: float):
+        hours = (end - start).total_seconds() / 3600
+        if not 0 <= hours <= MAX_SESSION_HOURS:
+            return
+        slot = start.weekday() * 24 + start.hour
+        self.sessions[slot] += 1
+        self.hours[slot] += hours
+        self.scores[slot] += score
+        self.focus[slot] += hours * score
+
+    def result(self) -> Dict[str, Any]:
+        return summarize_focus(self.sessions, self.hours, self.scores, self.focus)
+
+
+def summarize_focus(
+    sessions: List[int],
+    hours: List[float],
+    scores: List[float],
+    focus: List[float]
+) -> Dict[str, Any]:
+    """Render per-slot totals, peak slots and focus windows into the focus summary.
+
+    `focus` is each slot's focused time, the sum of hours times focus score.
+    """
+    mean_scores = [round(total / count, 3) if count else 0.0 for total, count in zip(scores, sessions)]
+    busiest = sorted(range(HOURS_PER_WEEK), key=lambda slot: sessions[slot], reverse=True)[:PEAK_SLOTS]
+    return {
+        'sessions': sum(sessions),
+        'focused_hours': round(sum(hours), 1),
+        'hour_of_week': {
+            'sessions': sessions,
+            'hours': [round(value, 2) for value in hours],
+            'mean_score': mean_scores
+        },
+        'peak_slots': [
+            {'slot': slot_name(slot), 'sessions': sessions[slot], 'mean_score': mean_scores[slot]}
+            for slot in busiest if sessions[slot]
+        ],
+        'top_windows': [
+            {
+                'start': slot_name(first),
+                'end': slot_name((first + length) % HOURS_PER_WEEK),
+                'hours': length,
+                'sessions': sum(sessions[slot] for slot in run),
+                'focused_hours': round(sum(focus[slot] for slot in run), 2),
+                'mean_score': round(sum(scores[slot] for slot in run) / sum(sessions[slot] for slot in run), 3)
+            }
+            for first, length, run in focus_windows(sessions, focus)
+        ]
+    }
+
+
+def focus_windows(
+    sessions: List[int],
+    focus: List[float],
+    top_n: int = TOP_WINDOWS
+) -> List[Tuple[int, int, List[int]]]:
+    """The `top_n` runs of adjacent busy hour-of-week slots with the most focused time.
+
+    Runs wrap from Sunday night into Monday morning. Returns (first slot,
+    length in hours, slots) per window; ties keep the earlier window.
+    """
+    busy = [count > 0 for count in sessions]
+    if not any(busy):
+        return []
+    if all(busy):
+        runs = [list(range(HOURS_PER_WEEK))]
+    else:
+        # Start scanning just after an idle slot so no run is split at the week boundary
+        origin = busy.index(False) + 1
+        runs, run = [], []
+        for offset in range(HOURS_PER_WEEK):
+            slot = (origin + offset) % HOURS_PER_WEEK
+            if busy[slot]:
+                run.append(slot)
+            elif run:
+                runs.append(run)
+                run = []
+        if run:
+            runs.append(run)
+    runs.sort(key=lambda run: (-sum(focus[slot] for slot in run), run[0]))
+    return [(run[0], len(run), run) for run in runs[:top_n]]
+
+
+def slot_name(slot: int) -> str:
+    return f"{WEEKDAYS[slot // 24]} {slot % 24:02d}:00"
@@ -2,9 +2,25 @@ from typing import Dict, List
 import numpy as np
 from datetime import datetime, time
 from collections import defaultdict
+from .focus import FocusAccumulator, HOURS_PER_WEEK, MAX_SESSION_HOURS, summarize_focus
+from .task_columns import TaskColumns, ordered_counts
 
 class MLPatternAnalyzer:
+    """Productivity, success and behavior patterns over task history.
+
+    Row-wise methods are the default and the reference. With `columnar=True`
+    tasks are converted once into NumPy columns and every metric is computed
+    with array operations, giving identical results. Building the columns
+    still walks each task's Python datetimes, so on 100k tasks this is only
+    about 1.5x faster end to end; it stays opt-in until that improves.
+    """
+
+    def __init__(self, columnar: bool = False):
+        self.columnar = columnar
+
     def analyze_patterns(self, historical_data: Dict) -> Dict:
+        if self.columnar:
+            return self._analyze_columnar(historical_data)
         productivity_patterns = self._analyze_productivity_cycles(historical_data)
         success_patterns = self._analyze_success_factors(historical_data)
         behavior_patterns = self._analyze_behavior_patterns(historical_data)
@@ -94,16 +110,15 @@ class MLPatternAnalyzer:
             'adaptability_score': self._calculate_adaptability(tasks)
         }
 
-    def _identify_focus_periods(self, tasks: List) -> List[Dict]:
-        focus_periods = []
+    def _identify_focus_periods(self, tasks: List) -> Dict:
+        focus = FocusAccumulator()
         for task in tasks:
             if (start := task.get('StartDate')) and (end := task.get('CompletionDate')):
-                focus_periods.append({
-                    'start': start,
-                    'end': end,
-                    'focus_score': self._calculate_focus_score([task])
-                })
-        return focus_periods
+                # A single task's focus score, as _calculate_focus_score([task]) gives it
+                quality = task.get('Quality')
+                completed = 1.0 if task.get('Status') == 'Completed' else 0.0
+                focus.add(start, end, completed * 0.6 + (float(quality) if quality is not None else 0) * 0.4)
+        return focus.result()
 
     def _identify_procrastination_triggers(self, tasks: List) -> List[str]:
         delayed_tasks = [t for t in tasks if t.get('Status') == 'Delayed']
@@ -147,3 +162,97 @@ class MLPatternAnalyzer:
         avg_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0
 
         return (completion_rate * 0.6) + (avg_quality * 0.4)
+
+    def _analyze_columnar(self, data: Dict) -> Dict:
+        tasks = TaskColumns(data.get('tasks', []))
+        goals = data.get('goals', [])
+        completed = tasks.status_is('Completed')
+        successful_goals = [g for g in goals if g.get('Status') == 'Completed']
+
+        return {
+            'productivity': {
+                'peak_hours': self._columnar_peak_hours(tasks, completed),
+                'task_velocity': self._columnar_task_velocity(tasks, completed),
+                'optimal_duration': self._columnar_optimal_duration(tasks, completed)
+            },
+            'success_factors': {
+                'task_success_patterns': {
+                    'categories': self._columnar_category_counts(tasks, completed),
+                    'completion_times': dict(ordered_counts(tasks.start_hour[completed & tasks.start_present])),
+                    'quality_factors': self._columnar_quality_factors(tasks, completed)
+                },
+                'goal_success_patterns': {
+                    'categories': self._extract_common_categories(successful_goals),
+                    'success_rate': len(successful_goals) / len(goals) if goals else 0
+                }
+            },
+            'behavior': {
+                'focus_periods': self._columnar_focus_periods(tasks, completed),
+                'procrastination_triggers': self._columnar_procrastination_triggers(tasks),
+                'adaptability_score': self._columnar_adaptability(tasks, completed)
+            }
+        }
+
+    def _columnar_peak_hours(self, tasks: TaskColumns, completed: np.ndarray) -> List[int]:
+        counts = ordered_counts(tasks.completion_hour[completed & tasks.completion_present])
+        return [hour for hour, _ in sorted(counts, key=lambda x: x[1], reverse=True)[:3]]
+
+    def _columnar_task_velocity(self, tasks: TaskColumns, completed: np.ndarray) -> float:
+        # Gaps between consecutive completed tasks, as listed, where both have a completion date
+        present = tasks.completion_present[completed]
+        if not present.size:
+            return 0.0
+        completion = tasks.completion[completed]
+        gaps = np.diff(completion)[present[1:] & present[:-1]] / 1e6 / 3600
+        return np.mean(gaps) if gaps.size else 0.0
+
+    def _columnar_optimal_duration(self, tasks: TaskColumns, completed: np.ndarray) -> Dict:
+        timed = completed & tasks.start_present & tasks.completion_present & (tasks.category >= 0)
+        durations = tasks.hours_between(timed)
+        categories = tasks.category[timed]
+        return {
+            tasks.categories[code]: float(np.median(durations[categories == code]))
+            for code, _ in ordered_counts(categories)
+        }
+
+    def _columnar_category_counts(self, tasks: TaskColumns, mask: np.ndarray) -> Dict:
+        codes = tasks.category[mask]
+        return {tasks.categories[code]: count for code, count in ordered_counts(codes[codes >= 0])}
+
+    def _columnar_quality_factors(self, tasks: TaskColumns, completed: np.ndarray) -> Dict:
+        scores = np.nan_to_num(tasks.quality[completed], nan=0.0)
+        return {
+            'average': np.mean(scores) if scores.size else 0,
+            'high_quality_count': int(np.count_nonzero(scores > 0.8))
+        }
+
+    def _columnar_focus_periods(self, tasks: TaskColumns, completed: np.ndarray) -> Dict:
+        timed = np.flatnonzero(tasks.start_present & tasks.completion_present)
+        hours = (tasks.completion[timed] - tasks.start[timed]) / 1e6 / 3600
+        # Same session bounds as FocusAccumulator.add
+        bounded = (hours >= 0) & (hours <= MAX_SESSION_HOURS)
+        sessions, hours = timed[bounded], hours[bounded]
+        # Each session scores its single task, as _calculate_focus_score([task]) does
+        scores = completed[sessions] * 0.6 + np.nan_to_num(tasks.quality[sessions], nan=0.0) * 0.4
+        slots = tasks.start_slot[sessions]
+
+        # bincount adds weights in input order, matching FocusAccumulator's running sums
+        def per_slot(weights: np.ndarray) -> List[float]:
+            return np.bincount(slots, weights=weights, minlength=HOURS_PER_WEEK).astype(np.float64).tolist()
+
+        return summarize_focus(
+            np.bincount(slots, minlength=HOURS_PER_WEEK).tolist(),
+            per_slot(hours),
+            per_slot(scores),
+            per_slot(hours * scores)
+        )
+
+    def _columnar_procrastination_triggers(self, tasks: TaskColumns) -> List[str]:
+        codes = tasks.category[tasks.status_is('Delayed') & (tasks.category >= 0)]
+        counts = sorted(ordered_counts(codes), key=lambda x: x[1], reverse=True)
+        return [tasks.categories[code] for code, _ in counts]
+
+    def _columnar_adaptability(self, tasks: TaskColumns, completed: np.ndarray) -> float:
+        if not tasks.size:
+            return 0.0
+        return int(np.count_nonzero(completed & ~tasks.delayed)) / tasks.size
@@ -0,0 +1,83 @@
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from ..notion.records import Record
+from ..notion.scheduler import Priority
+import asyncio
+import hashlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DATABASES = ('goals', 'tasks', 'projects')
+
+class WorkspaceSnapshot(Mapping):
+    """Read-only view of the goals, tasks and projects one insight run works on.
+
+    Records are decoded once and held in tuples, so every analyzer shares the
+    same data. It reads like the `{'goals': [...], 'tasks': [...], ...}` dict
+    the analyzers were written against.
+    """
+    __slots__ = ('_data', 'loaded_at', '_version')
+
+    def __init__(self, loaded_at: datetime, **databases: Tuple[Record, ...]):
+        object.__setattr__(self, '_data', {name: tuple(records) for name, records in databases.items()})
+        object.__setattr__(self, 'loaded_at', loaded_at)
+        object.__setattr__(self, '_version', None)
+
+    @property
+    def version(self) -> str:
+        """Digest of every page's id and last edit; changes whenever the inputs do."""
+        if self._version is None:
+            digest = hashlib.sha256()
+            for name in sorted(self._data):
+                pages = sorted(
+                    f"{record.get('id')}@{_edited(record.get('LastEdited'))}" for record in self._data[name]
+                )
+                digest.update(f"{name}:{len(pages)}\n".encode())
+                digest.update('\n'.join(pages).encode())
+            object.__setattr__(self, '_version', digest.hexdigest()[:16])
+        return self._version
+
+    def __setattr__(self, name, value):
+        raise AttributeError("WorkspaceSnapshot is read-only")
+
+    def __getitem__(self, key: str) -> Tuple[Record, ...]:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        counts = ', '.join(f"{name}={len(records)}" for name, records in self._data.items())
+        return f"WorkspaceSnapshot({counts}, loaded_at={self.loaded_at.isoformat()})"
+
+
+async def load_snapshot(
+    notion_client,
+    databases: Tuple[str, ...] = DATABASES,
+    priority: Priority = Priority.ANALYTICS
+) -> WorkspaceSnapshot:
+    """Fetch every page of each database concurrently and decode it once.
+
+    Each database is paginated in full; the databases are read side by side,
+    so loading takes about as long as the slowest one.
+    """
+    started = time.perf_counter()
+    loaded_at = datetime.utcnow()
+
+    async def collect(database: str) -> List[Record]:
+        return [record async for record in notion_client.iter_records(database, priority=priority)]
+
+    results = await asyncio.gather(*(collect(database) for database in databases))
+    snapshot = WorkspaceSnapshot(loaded_at, **dict(zip(databases, results)))
+    logger.info(f"Loaded {snapshot!r} in {time.perf_counter() - started:.2f}s")
+    return snapshot
+
+
+def _edited(value: Optional[datetime]) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value or '')
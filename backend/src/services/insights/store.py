@@ -0,0 +1,157 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import asyncio
+import contextvars
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class InsightStore:
+    """Precomputed insights, served at once and regenerated in the background.
+
+    Every result is stored with the version of the workspace snapshot it was
+    generated from, and a refresh only re-runs the analyzers and the GPT call
+    when that version changed. Requests always get the latest stored result;
+    once it is older than `stale_seconds` they also start a revalidation
+    (one at a time), which later requests pick up.
+    """
+
+    def __init__(self, engine, path: Optional[str] = None, stale_seconds: float = 900, history_size: int = 50):
+        self.engine = engine
+        self.stale_seconds = stale_seconds
+        self.history_size = history_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS insights ("
+            "version TEXT NOT NULL, generated_at REAL NOT NULL, value TEXT NOT NULL)"
+        )
+        self._latest = self._read_latest()
+        # Freshness counts from the last refresh that confirmed the inputs, not from generation
+        self._checked_at = self._latest['generated_at'] if self._latest else 0.0
+        self._refresh: Optional[asyncio.Task] = None
+        self.last_error: Optional[str] = None
+        self.refreshes = 0
+        self.regenerations = 0
+
+    async def get(self) -> Dict[str, Any]:
+        """Latest insights, revalidating in the background when they are stale."""
+        if self._latest is None:
+            # Nothing to serve yet, so the first caller has to wait for a result
+            await self.revalidate()
+            if self._latest is None:
+                raise RuntimeError(f"No insights available yet: {self.last_error}")
+        stale = self.is_stale()
+        if stale:
+            self.revalidate()
+        return self._serve(self._latest, stale)
+
+    def is_stale(self) -> bool:
+        return time.time() - self._checked_at > self.stale_seconds
+
+    def revalidate(self) -> asyncio.Task:
+        """Start a refresh unless one is already running; returns the running one.
+
+        The refresh runs in a fresh context, so its LLM calls are billed to
+        background work rather than to the request that happened to start it.
+        """
+        if self._refresh is None or self._refresh.done():
+            self._refresh = contextvars.Context().run(asyncio.create_task, self.refresh())
+        return self._refresh
+
+    async def refresh(self) -> bool:
+        """Reload the workspace and regenerate insights if it changed.
+
+        Returns True when new insights were stored. Errors are logged and
+        leave the previous result in place.
+        """
+        self.refreshes += 1
+        try:
+            snapshot = await self.engine.gather_data()
+            if self._latest and self._latest['version'] == snapshot.version:
+                self._checked_at = time.time()
+                logger.info(f"Insights {snapshot.version} are current")
+                return False
+
+            insights = await self.engine.insights_for(snapshot)
+            entry = {'version': snapshot.version, 'generated_at': time.time(), 'insights': insights}
+            await asyncio.to_thread(self._write, entry)
+            self._latest = entry
+            self._checked_at = entry['generated_at']
+            self.regenerations += 1
+            self.last_error = None
+            logger.info(f"Generated insights {snapshot.version}")
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Error refreshing insights: {str(e)}", exc_info=True)
+            return False
+
+    async def run(self, interval_seconds: int):
+        """Refresh forever, sleeping `interval_seconds` between rounds."""
+        while True:
+            await self.revalidate()
+            await asyncio.sleep(interval_seconds)
+
+    def history(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most recent stored insights, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT version, generated_at, value FROM insights ORDER BY generated_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [
+            self._serve({'version': version, 'generated_at': generated_at, 'insights': json.loads(value)})
+            for version, generated_at, value in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'version': self._latest['version'] if self._latest else None,
+            'stale': self.is_stale() if self._latest else None,
+            'refreshes': self.refreshes,
+            'regenerations': self.regenerations,
+            'last_error': self.last_error
+        }
+
+    async def close(self):
+        if self._refresh is not None:
+            self._refresh.cancel()
+            await asyncio.gather(self._refresh, return_exceptions=True)
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _serve(entry: Dict[str, Any], stale: bool = False) -> Dict[str, Any]:
+        return {
+            **entry['insights'],
+            'version': entry['version'],
+            'generated_at': datetime.utcfromtimestamp(entry['generated_at']).isoformat() + 'Z',
+            'stale': stale
+        }
+
+    def _read_latest(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, generated_at, value FROM insights ORDER BY generated_at DESC LIMIT 1"
+            ).fetchone()
+        if row is None:
+            return None
+        return {'version': row[0], 'generated_at': row[1], 'insights': json.loads(row[2])}
+
+    def _write(self, entry: Dict[str, Any]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO insights VALUES (?, ?, ?)",
+                (entry['version'], entry['generated_at'], json.dumps(entry['insights'], default=str))
+            )
+            # Keep only the most recent results as history
+            self._conn.execute(
+                "DELETE FROM insights WHERE rowid NOT IN "
+                "(SELECT rowid FROM insights ORDER BY generated_at DESC LIMIT ?)",
+                (self.history_size,)
+            )
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from ..notion.records import Record
+import numpy as np
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+MICROS_PER_HOUR = 3_600_000_000
+MICROS_PER_DAY = 24 * MICROS_PER_HOUR
+# 1970-01-01 was a Thursday
+_EPOCH_WEEKDAY = 3
+
+class TaskColumns:
+    """Tasks as NumPy columns, extracted in a single pass over the records.
+
+    Status and category are integer codes numbered in order of first
+    appearance (-1 when unset); `categories[code]` is the category name.
+    Dates are exact integer microseconds since the epoch with a presence mask
+    and the hour of the week (Monday 00:00 is 0), so durations match
+    `timedelta` arithmetic bit for bit. Missing quality is NaN.
+    """
+    __slots__ = (
+        'size', 'status', 'statuses', 'category', 'categories', 'delayed', 'quality',
+        'start', 'start_present', 'start_slot', 'start_values',
+        'completion', 'completion_present', 'completion_slot', 'completion_values'
+    )
+
+    def __init__(self, tasks: Sequence[Any]):
+        self.size = len(tasks)
+        column = _column_reader(tasks)
+        self.status, self.statuses = _encode(column('Status'))
+        self.category, category_codes = _encode(column('Category'))
+        self.categories = list(category_codes)
+        self.delayed = np.fromiter(map(bool, column('Delayed')), dtype=bool, count=self.size)
+        self.quality = np.array(
+            [np.nan if value is None else value for value in column('Quality')], dtype=np.float64
+        )
+        self.start_values = column('StartDate')
+        self.start, self.start_present, self.start_slot = _datetimes(self.start_values)
+        self.completion_values = column('CompletionDate')
+        self.completion, self.completion_present, self.completion_slot = _datetimes(self.completion_values)
+
+    @property
+    def start_hour(self) -> np.ndarray:
+        return self.start_slot % 24
+
+    @property
+    def completion_hour(self) -> np.ndarray:
+        return self.completion_slot % 24
+
+    def status_is(self, status: str) -> np.ndarray:
+        code = self.statuses.get(status, -2)
+        return self.status == code
+
+    def hours_between(self, mask: np.ndarray) -> np.ndarray:
+        """Hours from start to completion for the masked tasks."""
+        return (self.completion[mask] - self.start[mask]) / 1e6 / 3600
+
+
+def ordered_counts(codes: np.ndarray) -> List[Tuple[int, int]]:
+    """(code, count) pairs in order of each code's first appearance."""
+    if not codes.size:
+        return []
+    unique, first, counts = np.unique(codes, return_index=True, return_counts=True)
+    order = np.argsort(first, kind='stable')
+    return list(zip(unique[order].tolist(), counts[order].tolist()))
+
+
+def _column_reader(tasks: Sequence[Any]) -> Callable[[str], List[Any]]:
+    """Read one field of every task; unset fields come back as None."""
+    if all(issubclass(cls, Record) for cls in set(map(type, tasks))):
+        # Unset record slots are None, which `get` would turn into the same default
+        return lambda name: list(map(attrgetter(name), tasks))
+    return lambda name: [task.get(name) for task in tasks]
+
+
+def _encode(values: List[Any]) -> Tuple[np.ndarray, Dict[Any, int]]:
+    index: Dict[Any, int] = {}
+    codes = np.fromiter(
+        (index.setdefault(value, len(index)) if value else -1 for value in values),
+        dtype=np.int32,
+        count=len(values)
+    )
+    return codes, index
+
+
+def _datetimes(values: List[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    count = len(values)
+    present = np.fromiter((bool(value) for value in values), dtype=bool, count=count)
+    try:
+        micros = np.fromiter(
+            ((value - _EPOCH) // _MICROSECOND if value else 0 for value in values), dtype=np.int64, count=count
+        )
+        weekdays = (micros // MICROS_PER_DAY + _EPOCH_WEEKDAY) % 7
+        slots = weekdays * 24 + (micros // MICROS_PER_HOUR) % 24
+    except TypeError:
+        # Timezone-aware dates: exact instants for durations, local hours and days as the datetimes give them
+        micros = np.fromiter(
+            ((value - (_EPOCH_UTC if value.tzinfo else _EPOCH)) // _MICROSECOND if value else 0 for value in values),
+            dtype=np.int64,
+            count=count
+        )
+        slots = np.fromiter(
+            (value.weekday() * 24 + value.hour if value else 0 for value in values), dtype=np.int64, count=count
+        )
+    return micros, present, slots
@@ -1,10 +1,10 @@
 from typing import List, Dict
 from datetime import datetime
-from ..notion.client import NotionClient
-from ..openai.client import OpenAIClient
+from ..notion_client import NotionClient
+from ..openai.client import AsyncAIClient
 
 class LifeCoachService:
-    def __init__(self, notion_client: NotionClient, openai_client: OpenAIClient):
+    def __init__(self, notion_client: NotionClient, openai_client: AsyncAIClient):
         self.notion = notion_client
         self.openai = openai_client
 
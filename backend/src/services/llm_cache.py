@@ -0,0 +1,126 @@
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """Two-tier cache of LLM responses.
+
+    Lookups hit an in-memory LRU first and fall back to SQLite, so cached
+    analyses survive restarts. Entries older than `ttl_seconds` are ignored
+    in both tiers.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = 1024,
+        ttl_seconds: float = 7 * 24 * 3600
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, title TEXT, value TEXT NOT NULL, created_at REAL NOT NULL, tag TEXT)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+            if 'tag' not in columns:
+                self._conn.execute("ALTER TABLE responses ADD COLUMN tag TEXT")
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(title: str, model: str, temperature: float, prompt_version: str) -> str:
+        """Key a response by normalized title and everything that shapes the answer."""
+        normalized = re.sub(r'\s+', ' ', title).strip().casefold()
+        raw = json.dumps([normalized, model, temperature, prompt_version])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry and now - entry[0] < self.ttl_seconds:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return entry[1]
+
+        if self._conn is not None:
+            row = await asyncio.to_thread(self._read, key)
+            if row and now - row[0] < self.ttl_seconds:
+                self._remember(key, row[0], row[1])
+                self.disk_hits += 1
+                logger.debug("LLM response cache disk hit for %s", key[:12])
+                return row[1]
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, value: Dict, title: Optional[str] = None, tag: Optional[str] = None):
+        created_at = time.time()
+        self._remember(key, created_at, value)
+        if self._conn is not None:
+            await asyncio.to_thread(self._write, key, title, value, created_at, tag)
+
+    def items(self, tags: Iterable[str]) -> Iterator[Tuple[str, Dict, float]]:
+        """Yield (title, value, created_at) for unexpired entries on disk stored under any of `tags`."""
+        if self._conn is None:
+            return
+        tags = list(tags)
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT title, value, created_at FROM responses WHERE created_at >= ? AND title IS NOT NULL "
+                f"AND tag IN ({', '.join('?' * len(tags))}) ORDER BY created_at",
+                (cutoff, *tags)
+            ).fetchall()
+        for title, value, created_at in rows:
+            yield title, json.loads(value), created_at
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round((lookups - self.misses) / lookups, 3) if lookups else 0.0,
+            'memory_entries': len(self._memory)
+        }
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+
+    def _remember(self, key: str, created_at: float, value: Dict):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read(self, key: str) -> Optional[Tuple[float, Dict]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _write(self, key: str, title: Optional[str], value: Dict, created_at: float, tag: Optional[str]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, title, value, created_at, tag) VALUES (?, ?, ?, ?, ?)",
+                (key, title, json.dumps(value), created_at, tag)
+            )
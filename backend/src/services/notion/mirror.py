@@ -0,0 +1,230 @@
+from typing import Dict, List, Optional, Set
+from datetime import datetime, timezone
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from .scheduler import Priority
+
+logger = logging.getLogger(__name__)
+
+MIRROR_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    page_id TEXT PRIMARY KEY,
+    database_id TEXT NOT NULL,
+    last_edited_time TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_by_database
+    ON pages (database_id, last_edited_time);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    database_id TEXT PRIMARY KEY,
+    last_edited_time TEXT,
+    schema_hash TEXT,
+    synced_at TEXT NOT NULL
+);
+"""
+
+class NotionMirror:
+    """SQLite-backed local copy of the configured Notion databases."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(MIRROR_SCHEMA)
+        self._checkpoints = {
+            row[0]: {'last_edited_time': row[1], 'schema_hash': row[2], 'synced_at': row[3]}
+            for row in self._conn.execute(
+                "SELECT database_id, last_edited_time, schema_hash, synced_at FROM checkpoints"
+            )
+        }
+
+    def is_synced(self, database_id: str) -> bool:
+        """Whether the database has completed at least one full sync."""
+        return database_id in self._checkpoints
+
+    def get_checkpoint(self, database_id: str) -> Optional[Dict]:
+        return self._checkpoints.get(database_id)
+
+    def set_checkpoint(self, database_id: str, last_edited_time: Optional[str], schema_hash: str):
+        synced_at = datetime.now(timezone.utc).isoformat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+                (database_id, last_edited_time, schema_hash, synced_at)
+            )
+        self._checkpoints[database_id] = {
+            'last_edited_time': last_edited_time,
+            'schema_hash': schema_hash,
+            'synced_at': synced_at
+        }
+
+    def read_batch(
+        self,
+        database_id: str,
+        after: Optional[Dict] = None,
+        limit: int = 500,
+        since: Optional[str] = None
+    ) -> List[Dict]:
+        """Read up to `limit` mirrored pages ordered newest first, resuming after `after`.
+
+        `since` limits the read to pages edited at or after that ISO timestamp.
+        """
+        sql = "SELECT data FROM pages WHERE database_id = ?"
+        params = [database_id]
+        if since is not None:
+            sql += " AND last_edited_time >= ?"
+            params.append(since)
+        if after is not None:
+            edited = after.get('last_edited_time', '')
+            sql += " AND (last_edited_time < ? OR (last_edited_time = ? AND page_id > ?))"
+            params += [edited, edited, after['id']]
+        sql += " ORDER BY last_edited_time DESC, page_id LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_page(self, page_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM pages WHERE page_id = ?", (page_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def upsert_pages(self, database_id: str, pages: List[Dict]):
+        """Store pages, dropping any that Notion reports as archived."""
+        live = [p for p in pages if not p.get('archived') and not p.get('in_trash')]
+        gone = [(p['id'],) for p in pages if p.get('archived') or p.get('in_trash')]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                [(p['id'], database_id, p.get('last_edited_time', ''), json.dumps(p)) for p in live]
+            )
+            self._conn.executemany("DELETE FROM pages WHERE page_id = ?", gone)
+
+    def remove_missing(self, database_id: str, live_ids: Set[str]) -> int:
+        """Delete mirrored pages of a database that are not in `live_ids`."""
+        with self._lock, self._conn:
+            stored = self._conn.execute(
+                "SELECT page_id FROM pages WHERE database_id = ?", (database_id,)
+            ).fetchall()
+            gone = [(page_id,) for page_id, in stored if page_id not in live_ids]
+            self._conn.executemany("DELETE FROM pages WHERE page_id = ?", gone)
+        return len(gone)
+
+    def clear(self, database_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pages WHERE database_id = ?", (database_id,))
+            self._conn.execute("DELETE FROM checkpoints WHERE database_id = ?", (database_id,))
+        self._checkpoints.pop(database_id, None)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def schema_fingerprint(database: Dict) -> str:
+    """Hash the property names and types of a database schema."""
+    properties = database.get('properties', {})
+    signature = sorted((name, prop.get('type', '')) for name, prop in properties.items())
+    return hashlib.sha256(json.dumps(signature).encode()).hexdigest()
+
+
+class MirrorSync:
+    """Keeps a NotionMirror fresh by pulling only pages edited since the last checkpoint.
+
+    Database queries never return archived or trashed pages, so a delta sync
+    cannot see deletions. Every `reconcile_seconds` the IDs of all live pages
+    are listed and mirrored pages missing from them are dropped.
+    """
+
+    def __init__(
+        self,
+        notion_client,
+        mirror: NotionMirror,
+        batch_size: int = 100,
+        reconcile_seconds: float = 3600
+    ):
+        self.notion = notion_client
+        self.mirror = mirror
+        self.batch_size = batch_size
+        self.reconcile_seconds = reconcile_seconds
+        self._reconciled_at: Dict[str, float] = {}
+
+    async def sync_database(self, database_id: str) -> int:
+        """Sync one database and return the number of pages pulled."""
+        database = await self.notion.get_schema(database_id, refresh=True, priority=Priority.BACKGROUND)
+        schema_hash = schema_fingerprint(database)
+        checkpoint = self.mirror.get_checkpoint(database_id)
+
+        query = {}
+        if checkpoint and checkpoint['schema_hash'] != schema_hash:
+            logger.info(f"Schema of database {database_id} changed, running full resync")
+            await asyncio.to_thread(self.mirror.clear, database_id)
+            checkpoint = None
+        if checkpoint and checkpoint['last_edited_time']:
+            # Notion rounds edit times to the minute, so re-pull the boundary minute
+            query['filter'] = {
+                'timestamp': 'last_edited_time',
+                'last_edited_time': {'on_or_after': checkpoint['last_edited_time']}
+            }
+        query['sorts'] = [{'timestamp': 'last_edited_time', 'direction': 'ascending'}]
+
+        latest = checkpoint['last_edited_time'] if checkpoint else None
+        pulled = 0
+        batch = []
+        async for page in self.notion.iter_remote_pages(database_id, priority=Priority.BACKGROUND, **query):
+            batch.append(page)
+            latest = max(latest or '', page.get('last_edited_time', ''))
+            if len(batch) >= self.batch_size:
+                await asyncio.to_thread(self.mirror.upsert_pages, database_id, batch)
+                pulled += len(batch)
+                batch = []
+        if batch:
+            await asyncio.to_thread(self.mirror.upsert_pages, database_id, batch)
+            pulled += len(batch)
+
+        await asyncio.to_thread(self.mirror.set_checkpoint, database_id, latest or None, schema_hash)
+        logger.info(f"Synced {pulled} pages from database {database_id}")
+
+        if checkpoint is None:
+            # A full sync starts from an empty mirror, so nothing is stale
+            self._reconciled_at[database_id] = time.monotonic()
+        elif time.monotonic() - self._reconciled_at.get(database_id, float('-inf')) > self.reconcile_seconds:
+            await self.reconcile(database_id)
+        return pulled
+
+    async def reconcile(self, database_id: str) -> int:
+        """Drop mirrored pages that were deleted, archived or trashed in Notion."""
+        started = time.monotonic()
+        live_ids = set()
+        # Only the title property is requested, since only the IDs are needed
+        async for page in self.notion.iter_remote_pages(
+            database_id, priority=Priority.BACKGROUND, filter_properties=['title']
+        ):
+            live_ids.add(page['id'])
+        removed = await asyncio.to_thread(self.mirror.remove_missing, database_id, live_ids)
+        self._reconciled_at[database_id] = started
+        logger.info(f"Removed {removed} deleted pages from the mirror of database {database_id}")
+        return removed
+
+    async def sync_all(self) -> Dict[str, int]:
+        """Sync every database the client knows about."""
+        results = {}
+        for name, database_id in self.notion.database_ids.items():
+            try:
+                results[name] = await self.sync_database(database_id)
+            except Exception as e:
+                logger.error(f"Mirror sync failed for {name} database: {str(e)}", exc_info=True)
+        return results
+
+    async def run(self, interval_seconds: int):
+        """Sync all databases forever, sleeping `interval_seconds` between rounds."""
+        while True:
+            await self.sync_all()
+            await asyncio.sleep(interval_seconds)
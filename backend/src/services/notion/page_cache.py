@@ -0,0 +1,86 @@
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import time
+
+class PageCache:
+    """Short-lived page cache with single-flight retrieval.
+
+    Concurrent reads of a page that is not cached share one in-flight
+    request, and the result is reused for `ttl_seconds` afterwards. The
+    request belongs to the cache, not its first reader, so cancelling a
+    reader does not stop the others' result from being cached. Each page has
+    a generation that `invalidate` bumps; a fetch started before a write
+    does not cache what it read.
+    """
+
+    def __init__(self, ttl_seconds: float = 5, max_entries: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: Dict[str, Tuple[float, Dict]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._generations: Dict[str, int] = {}
+
+    def peek(self, page_id: str) -> Optional[Dict]:
+        entry = self._entries.get(page_id)
+        if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+            return entry[1]
+        return None
+
+    def put(self, page_id: str, page: Dict):
+        if len(self._entries) >= self.max_entries:
+            self._evict_expired()
+        if len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[page_id] = (time.monotonic(), page)
+
+    def invalidate(self, page_id: str):
+        self._entries.pop(page_id, None)
+        # Later readers start a fresh fetch instead of joining one that may predate the write
+        self._inflight.pop(page_id, None)
+        self._generations[page_id] = self._generations.get(page_id, 0) + 1
+
+    def replace(self, page_id: str, page: Dict):
+        """Cache a page we just wrote, superseding any read still in flight."""
+        self.invalidate(page_id)
+        self.put(page_id, page)
+
+    def _evict_expired(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        for page_id in [k for k, (stored, _) in self._entries.items() if stored < cutoff]:
+            del self._entries[page_id]
+
+    async def get(self, page_id: str, fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        if (page := self.peek(page_id)) is not None:
+            self.hits += 1
+            return page
+        if page_id in self._inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self._inflight[page_id])
+
+        self.misses += 1
+        generation = self._generations.get(page_id, 0)
+        future = asyncio.ensure_future(fetch())
+        self._inflight[page_id] = future
+        future.add_done_callback(lambda done: self._settle(page_id, generation, done))
+        return await asyncio.shield(future)
+
+    def _settle(self, page_id: str, generation: int, future: asyncio.Future):
+        """Cache a finished fetch unless the page was invalidated while it ran."""
+        if self._inflight.get(page_id) is future:
+            del self._inflight[page_id]
+        if future.cancelled() or future.exception() is not None:
+            return
+        page = future.result()
+        if page and self._generations.get(page_id, 0) == generation:
+            self.put(page_id, page)
+
+    def stats(self) -> Dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'size': len(self._entries)
+        }
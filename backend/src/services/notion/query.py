@@ -0,0 +1,132 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import date
+from .records import RecordDecoder, TaskRecord
+
+SORTS = ('due_date', '-due_date', 'last_edited', '-last_edited')
+
+# Result type a formula property is filtered as when it stands in for a field
+FORMULA_RESULTS = {'Status': 'string', 'DueDate': 'date'}
+
+class TaskQuery:
+    """Filters, ordering and field projection for task listings.
+
+    The same query is either pushed down to Notion as `filter`/`sorts` or
+    applied locally to decoded records when tasks are read from the mirror.
+    Both paths require the schema to have every property the query uses.
+    """
+
+    def __init__(
+        self,
+        status: Optional[str] = None,
+        due_before: Optional[date] = None,
+        due_after: Optional[date] = None,
+        project: Optional[str] = None,
+        sort: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ):
+        if sort is not None and sort not in SORTS:
+            raise ValueError(f"Unsupported sort '{sort}', expected one of {', '.join(SORTS)}")
+        self.status = status
+        self.due_before = due_before
+        self.due_after = due_after
+        self.project = _normalize_id(project) if project else None
+        self.sort = sort
+        self.fields = fields
+
+    @property
+    def has_filters(self) -> bool:
+        return any(v is not None for v in (self.status, self.due_before, self.due_after, self.project, self.sort))
+
+    def check(self, decoder: RecordDecoder):
+        """Raise ValueError if the schema lacks a property the query filters or sorts on.
+
+        Otherwise Notion would ignore the filter and return every task, while
+        the mirror would match none.
+        """
+        needed = {
+            'Status': self.status is not None,
+            'DueDate': (
+                self.due_before is not None or self.due_after is not None
+                or (self.sort is not None and self.sort.lstrip('-') == 'due_date')
+            ),
+            'Project': self.project is not None
+        }
+        missing = [field for field, used in needed.items() if used and not decoder.property_for(field)]
+        if missing:
+            raise ValueError(f"Tasks database has no property for {', '.join(missing)}")
+
+    def to_notion(self, decoder: RecordDecoder) -> Dict:
+        """Translate the query into Notion `filter` and `sorts` arguments."""
+        self.check(decoder)
+        conditions = []
+        if self.status is not None:
+            conditions.append(_condition(decoder, 'Status', {'equals': self.status}))
+        if self.due_before is not None:
+            conditions.append(_condition(decoder, 'DueDate', {'on_or_before': self.due_before.isoformat()}))
+        if self.due_after is not None:
+            conditions.append(_condition(decoder, 'DueDate', {'on_or_after': self.due_after.isoformat()}))
+        if self.project is not None:
+            conditions.append({'property': decoder.property_for('Project')[0], 'relation': {'contains': self.project}})
+
+        query = {}
+        if len(conditions) == 1:
+            query['filter'] = conditions[0]
+        elif conditions:
+            query['filter'] = {'and': conditions}
+        if self.sort:
+            direction = 'descending' if self.sort.startswith('-') else 'ascending'
+            if self.sort.lstrip('-') == 'last_edited':
+                query['sorts'] = [{'timestamp': 'last_edited_time', 'direction': direction}]
+            else:
+                query['sorts'] = [{'property': decoder.property_for('DueDate')[0], 'direction': direction}]
+        return query
+
+    def matches(self, record: TaskRecord, page: Dict, decoder: RecordDecoder) -> bool:
+        """Apply the filters locally to a decoded task."""
+        if self.status is not None and record.Status != self.status:
+            return False
+        due = record.DueDate.date() if record.DueDate else None
+        if self.due_before is not None and (due is None or due > self.due_before):
+            return False
+        if self.due_after is not None and (due is None or due < self.due_after):
+            return False
+        if self.project is not None:
+            relation = page.get('properties', {}).get(decoder.property_for('Project')[0], {}).get('relation') or []
+            if self.project not in {_normalize_id(item['id']) for item in relation}:
+                return False
+        return True
+
+    def sort_key(self):
+        """Key for ordering (record, page) pairs locally, empty due dates last."""
+        field = self.sort.lstrip('-')
+        descending = self.sort.startswith('-')
+
+        def key(item: Tuple[TaskRecord, Dict]):
+            value = item[0].DueDate if field == 'due_date' else item[0].LastEdited
+            if value is None:
+                return (1, 0.0)
+            timestamp = value.timestamp()
+            return (0, -timestamp if descending else timestamp)
+        return key
+
+    def project_page(self, page: Dict) -> Dict:
+        """Trim a page down to its ID and the requested properties."""
+        if not self.fields:
+            return page
+        properties = page.get('properties', {})
+        return {
+            'id': page.get('id'),
+            'properties': {name: properties[name] for name in self.fields if name in properties}
+        }
+
+
+def _condition(decoder: RecordDecoder, field: str, condition: Dict) -> Dict:
+    """Filter `field`'s property, keyed by its type; formulas are filtered on their result."""
+    name, prop_type = decoder.property_for(field)
+    if prop_type == 'formula':
+        return {'property': name, 'formula': {FORMULA_RESULTS[field]: condition}}
+    return {'property': name, prop_type: condition}
+
+
+def _normalize_id(page_id: str) -> str:
+    return page_id.replace('-', '')
@@ -0,0 +1,215 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from datetime import datetime, timezone
+from .mirror import schema_fingerprint
+from .schema_cache import property_types
+import sys
+
+class Record:
+    """Compact decoded Notion page.
+
+    Subclasses declare their fields in `__slots__` and the Notion property
+    names each field may be stored under in `PROPERTIES`. Records answer
+    `get`/`[]` like the flat task dicts the analyzers were written against,
+    with unset fields treated as missing keys.
+    """
+    __slots__ = ('id', 'CreatedDate', 'LastEdited')
+    PROPERTIES: Dict[str, Tuple[str, ...]] = {}
+    FIELDS: Tuple[str, ...] = __slots__
+    _FIELD_SET = frozenset(__slots__)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = cls.__base__.FIELDS + cls.__dict__.get('__slots__', ())
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+
+    def __init__(self, **values):
+        for name in self.FIELDS:
+            setattr(self, name, values.get(name))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key) if key in self._FIELD_SET else None
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS if getattr(self, name) is not None}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def finalize(self, page: Dict):
+        """Fill fields that are derived rather than read from one property."""
+
+
+class TaskRecord(Record):
+    __slots__ = (
+        'Title', 'Status', 'Category', 'Type', 'Importance', 'Urgency',
+        'StartDate', 'CompletionDate', 'DueDate', 'PlannedCompletionDate',
+        'Project', 'Dependencies', 'Quality', 'TimeEstimate', 'Delayed', 'Complete'
+    )
+    PROPERTIES = {
+        'Title': ('Name', 'Title', 'Task'),
+        'Status': ('Status',),
+        'Category': ('Category', 'Area'),
+        'Type': ('Type',),
+        'Importance': ('Importance',),
+        'Urgency': ('Urgency',),
+        'StartDate': ('Start Date', 'Start', 'StartDate'),
+        'CompletionDate': ('Completion Date', 'Done Date', 'CompletionDate'),
+        'DueDate': ('Due Date', 'Due', 'DueDate'),
+        'PlannedCompletionDate': ('Planned Completion', 'Planned Completion Date'),
+        'Project': ('Project', 'Projects'),
+        'Dependencies': ('Dependencies', 'Blocked By'),
+        'Quality': ('Quality',),
+        'TimeEstimate': ('Time Estimate', 'TimeEstimate'),
+        'Delayed': ('Delayed',),
+        'Complete': ('Complete', 'Done')
+    }
+
+    def finalize(self, page: Dict):
+        # Tasks ticked complete without a completion date finished at their last edit
+        if self.CompletionDate is None and self.Complete:
+            self.CompletionDate = self.LastEdited
+        if isinstance(self.Project, tuple):
+            self.Project = self.Project[0] if self.Project else None
+
+
+class GoalRecord(Record):
+    __slots__ = (
+        'Title', 'Description', 'Status', 'Category', 'Progress',
+        'TargetDate', 'Effort', 'RelatedTasks'
+    )
+    PROPERTIES = {
+        'Title': ('Title', 'Name'),
+        'Description': ('Description',),
+        'Status': ('Status',),
+        'Category': ('Category',),
+        'Progress': ('Progress',),
+        'TargetDate': ('Target Date', 'Due Date'),
+        'Effort': ('Effort',),
+        'RelatedTasks': ('Related Tasks', 'Tasks')
+    }
+
+
+class ProjectRecord(Record):
+    __slots__ = ('Title', 'Status', 'Category', 'StartDate', 'DueDate', 'Tasks')
+    PROPERTIES = {
+        'Title': ('Name', 'Title', 'Project name'),
+        'Status': ('Status',),
+        'Category': ('Category', 'Area'),
+        'StartDate': ('Start Date', 'Start'),
+        'DueDate': ('Due Date', 'Deadline', 'End Date'),
+        'Tasks': ('Tasks',)
+    }
+
+
+# Statuses, lowercased, that mark a task or goal as finished
+DONE_STATUSES = {'completed', 'done', 'archived'}
+
+def is_done(item: Any) -> bool:
+    """Whether a task or goal is completed, by checkbox or status."""
+    status = item.get('Status')
+    return bool(item.get('Complete')) or (isinstance(status, str) and status.lower() in DONE_STATUSES)
+
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse a Notion timestamp or date into a naive UTC datetime."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _text(items: List[Dict]) -> str:
+    return ''.join(
+        item.get('plain_text') or item.get('text', {}).get('content', '')
+        for item in items or []
+    )
+
+def _name(option: Optional[Dict]) -> Optional[str]:
+    # Option names repeat across thousands of pages, so share one string each
+    return sys.intern(option['name']) if option and option.get('name') else None
+
+def _date(value: Optional[Dict]) -> Optional[datetime]:
+    return parse_datetime(value.get('start')) if value else None
+
+def _formula(value: Optional[Dict]) -> Any:
+    value = value or {}
+    kind = value.get('type')
+    result = value.get(kind)
+    return _date(result) if kind == 'date' else result
+
+EXTRACTORS: Dict[str, Callable[[Any], Any]] = {
+    'title': _text,
+    'rich_text': _text,
+    'select': _name,
+    'status': _name,
+    'multi_select': lambda options: tuple(_name(o) for o in options or ()),
+    'date': _date,
+    'number': lambda value: value,
+    'checkbox': bool,
+    'relation': lambda items: tuple(item['id'] for item in items or ()),
+    'created_time': parse_datetime,
+    'last_edited_time': parse_datetime,
+    'formula': _formula,
+    'url': lambda value: value
+}
+
+
+class RecordDecoder:
+    """Turns raw pages of one database into records.
+
+    The property lookups and type dispatch are resolved once from the
+    database schema, so decoding a page is a flat loop over a fixed plan.
+    """
+
+    def __init__(self, record_cls: Type[Record], property_types: Dict[str, str]):
+        self.record_cls = record_cls
+        self._plan: List[Tuple[str, str, str, Callable]] = []
+        for field, candidates in record_cls.PROPERTIES.items():
+            for prop_name in candidates:
+                prop_type = property_types.get(prop_name)
+                if prop_type in EXTRACTORS:
+                    self._plan.append((field, prop_name, prop_type, EXTRACTORS[prop_type]))
+                    break
+
+    def property_for(self, field: str) -> Optional[Tuple[str, str]]:
+        """The (property name, Notion type) a field is read from, if present."""
+        for planned_field, prop_name, prop_type, _ in self._plan:
+            if planned_field == field:
+                return prop_name, prop_type
+        return None
+
+    def decode(self, page: Dict) -> Record:
+        record = self.record_cls()
+        record.id = page.get('id')
+        record.CreatedDate = parse_datetime(page.get('created_time'))
+        record.LastEdited = parse_datetime(page.get('last_edited_time'))
+        properties = page.get('properties', {})
+        for field, prop_name, prop_type, extract in self._plan:
+            prop = properties.get(prop_name)
+            if prop is not None:
+                setattr(record, field, extract(prop.get(prop_type)))
+        record.finalize(page)
+        return record
+
+    def decode_all(self, pages: List[Dict]) -> List[Record]:
+        return [self.decode(page) for page in pages]
+
+
+_decoders: Dict[Tuple[type, str], RecordDecoder] = {}
+
+def get_decoder(record_cls: Type[Record], schema: Dict) -> RecordDecoder:
+    """Return the decoder for a record type and schema, building it on first use."""
+    key = (record_cls, schema_fingerprint(schema))
+    if key not in _decoders:
+        _decoders[key] = RecordDecoder(record_cls, property_types(schema))
+    return _decoders[key]
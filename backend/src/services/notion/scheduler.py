@@ -0,0 +1,142 @@
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from enum import IntEnum
+from notion_client.errors import RequestTimeoutError
+from ..rate_limit import TokenBucket
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class Priority(IntEnum):
+    """Scheduling lanes; lower values are served first."""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+    ANALYTICS = 2
+
+class RequestScheduler:
+    """Process-wide gate in front of every Notion API call.
+
+    Requests wait for a token from a shared bucket, highest priority lane
+    first. A 429 pauses the whole bucket for its `Retry-After` so concurrent
+    callers back off together instead of piling on more 429s, and retryable
+    failures are retried with exponential backoff and full jitter.
+    """
+
+    def __init__(
+        self,
+        rate: float = 3.0,
+        burst: int = 3,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def configure(self, rate: float, burst: int, max_retries: int):
+        self.bucket.rate = rate
+        self.bucket.capacity = burst
+        self.max_retries = max_retries
+
+    def pause(self, seconds: float):
+        """Hold every lane for `seconds`, e.g. after Notion asks us to back off."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE):
+        """Wait for this request's turn to hit Notion."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), future))
+        if (
+            self._dispatcher is None
+            or self._dispatcher.done()
+            or self._dispatcher.get_loop() is not loop
+        ):
+            self._dispatcher = loop.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self):
+        while self._waiters:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            wait = self.bucket.try_acquire()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            # Hand the token to the most urgent caller that is still waiting
+            while self._waiters:
+                _, _, future = heapq.heappop(self._waiters)
+                if not future.done():
+                    future.set_result(None)
+                    break
+            else:
+                self.bucket.refund()
+
+    async def run(
+        self,
+        fn: Callable[..., Awaitable[Any]],
+        *args,
+        priority: Priority = Priority.INTERACTIVE,
+        idempotent: bool = True,
+        **kwargs
+    ) -> Any:
+        """Call `fn` once a token is available, retrying transient failures.
+
+        Non-idempotent calls (e.g. page creation) are only retried on 429,
+        which Notion rejects before doing any work; a timeout or 5xx may
+        have been applied already, so resending could duplicate the write.
+        """
+        attempt = 0
+        while True:
+            await self.acquire(priority)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, idempotent)
+                if delay is None or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                logger.warning(
+                    f"Notion request failed ({str(e)}), retry {attempt}/{self.max_retries} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    def _retry_delay(self, error: Exception, attempt: int, idempotent: bool = True) -> Optional[float]:
+        status = getattr(error, 'status', None)
+        if not isinstance(error, RequestTimeoutError) and status not in RETRYABLE_STATUSES:
+            return None
+        if not idempotent and status != 429:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if status == 429:
+            retry_after = _retry_after_seconds(error)
+            if retry_after is not None:
+                self.pause(retry_after)
+                delay = max(delay, retry_after)
+        return delay
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+# One scheduler per process so every NotionClient shares the rate budget
+notion_scheduler = RequestScheduler()
@@ -0,0 +1,79 @@
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class SchemaCache:
+    """Process-wide cache of Notion database schemas with a TTL.
+
+    The cache lives in the server's memory only, so a schema changed from
+    elsewhere (in Notion or by the schema scripts) reaches the server when
+    the cached copy expires, after at most `ttl_seconds`.
+    """
+
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, Dict]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def peek(self, database_id: str) -> Optional[Dict]:
+        """Return the cached schema if it is still fresh."""
+        with self._lock:
+            entry = self._entries.get(database_id)
+        if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+            return entry[1]
+        return None
+
+    def put(self, database_id: str, schema: Dict):
+        with self._lock:
+            self._entries[database_id] = (time.monotonic(), schema)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cached schema for database %s: %s", database_id, property_types(schema))
+
+    def invalidate(self, database_id: Optional[str] = None):
+        """Drop one database's schema, or every schema when no ID is given."""
+        with self._lock:
+            if database_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(database_id, None)
+
+    async def get(
+        self,
+        database_id: str,
+        fetch: Callable[[], Awaitable[Dict]],
+        refresh: bool = False
+    ) -> Dict:
+        """Return a schema, awaiting `fetch()` to retrieve it on a miss.
+
+        Concurrent misses for the same database share one retrieve call.
+        """
+        if not refresh and (schema := self.peek(database_id)) is not None:
+            return schema
+        if database_id in self._inflight:
+            return await asyncio.shield(self._inflight[database_id])
+
+        future = asyncio.ensure_future(fetch())
+        self._inflight[database_id] = future
+        try:
+            schema = await asyncio.shield(future)
+        finally:
+            self._inflight.pop(database_id, None)
+        self.put(database_id, schema)
+        return schema
+
+
+def property_types(schema: Dict) -> Dict[str, str]:
+    """Map each property name of a database schema to its Notion type."""
+    return {
+        name: prop.get('type', '')
+        for name, prop in schema.get('properties', {}).items()
+    }
+
+
+# Shared by every NotionClient in the process
+schema_cache = SchemaCache()
@@ -0,0 +1,66 @@
+from typing import Callable, Dict, Optional
+import httpx
+import logging
+
+logger = logging.getLogger(__name__)
+
+class NotionTransport:
+    """Pooled keep-alive HTTP client shared by every Notion API call.
+
+    Counts requests against newly opened TCP connections so the health
+    check can report how often pooled connections are reused.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        wrap_transport: Optional[Callable[[httpx.AsyncBaseTransport], httpx.AsyncBaseTransport]] = None
+    ):
+        self.requests = 0
+        self.new_connections = 0
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            )
+        )
+        self.http_client = httpx.AsyncClient(
+            transport=wrap_transport(transport) if wrap_transport else transport,
+            event_hooks={'request': [self._on_request]}
+        )
+        logger.info(
+            f"Notion connection pool ready (max={max_connections}, "
+            f"keepalive={max_keepalive_connections}, expiry={keepalive_expiry}s)"
+        )
+
+    @classmethod
+    def from_settings(cls, settings, wrap_transport=None) -> "NotionTransport":
+        return cls(
+            max_connections=settings.NOTION_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.NOTION_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.NOTION_POOL_KEEPALIVE_SECONDS,
+            wrap_transport=wrap_transport
+        )
+
+    async def _on_request(self, request: httpx.Request):
+        self.requests += 1
+        request.extensions['trace'] = self._trace
+
+    async def _trace(self, event_name: str, info: Dict):
+        if event_name == 'connection.connect_tcp.complete':
+            self.new_connections += 1
+
+    def metrics(self) -> Dict:
+        reused = max(self.requests - self.new_connections, 0)
+        return {
+            'requests': self.requests,
+            'new_connections': self.new_connections,
+            'reused_connections': reused,
+            'reuse_ratio': round(reused / self.requests, 3) if self.requests else 0.0
+        }
+
+    async def aclose(self):
+        await self.http_client.aclose()
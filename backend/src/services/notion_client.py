@@ -1,18 +1,44 @@
-from typing import Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from notion_client import Client as SyncClient
 from notion_client import AsyncClient
 from datetime import datetime
+import httpx
+from .notion.mirror import NotionMirror
+from .notion.schema_cache import property_types, schema_cache
+from .notion.scheduler import Priority, notion_scheduler
+from .notion.page_cache import PageCache
+from .notion.records import GoalRecord, ProjectRecord, Record, RecordDecoder, TaskRecord, get_decoder
+from .notion.query import TaskQuery
+from ..core.logging_setup import LazyJson
+import asyncio
 import logging
-import json
 
 logger = logging.getLogger(__name__)
 
+# Notion caps database queries at 100 results per request
+MAX_PAGE_SIZE = 100
+
+RECORD_TYPES = {
+    'tasks': TaskRecord,
+    'goals': GoalRecord,
+    'projects': ProjectRecord
+}
+
+def configure_notion(settings):
+    """Apply settings to the process-wide Notion scheduler and schema cache."""
+    schema_cache.ttl_seconds = settings.NOTION_SCHEMA_CACHE_SECONDS
+    notion_scheduler.configure(
+        rate=settings.NOTION_RATE_LIMIT_PER_SECOND,
+        burst=settings.NOTION_RATE_LIMIT_BURST,
+        max_retries=settings.NOTION_MAX_RETRIES
+    )
+
 class NotionClientError(Exception):
     """Custom exception for Notion client errors"""
     pass
 
 class NotionClient:
-    def __init__(self, settings):
+    def __init__(self, settings, http_client: Optional[httpx.AsyncClient] = None):
         try:
             if not settings.NOTION_API_KEY:
                 raise NotionClientError("Notion API key is missing")
@@ -20,47 +46,78 @@ class NotionClient:
                 raise NotionClientError("Notion tasks database ID is missing")
 
             logger.info(f"Initializing Notion client with database ID: {settings.NOTION_TASKS_DATABASE_ID}")
-            self.client = AsyncClient(auth=settings.NOTION_API_KEY)
-            self.sync_client = SyncClient(auth=settings.NOTION_API_KEY)
+            # Reuse the app's pooled connections when given, otherwise own a pool
+            self.client = AsyncClient(
+                auth=settings.NOTION_API_KEY,
+                client=http_client,
+                timeout_ms=int(settings.NOTION_TIMEOUT_SECONDS * 1000)
+            )
+            self._api_key = settings.NOTION_API_KEY
+            self._sync_client = None
             self.tasks_db_id = settings.NOTION_TASKS_DATABASE_ID
             self.projects_db_id = settings.NOTION_PROJECTS_DATABASE_ID
+            self.database_ids = {
+                'tasks': settings.NOTION_TASKS_DATABASE_ID,
+                'areas': settings.NOTION_AREAS_DATABASE_ID,
+                'projects': settings.NOTION_PROJECTS_DATABASE_ID,
+                'insights': settings.NOTION_INSIGHTS_DATABASE_ID,
+                'goals': settings.NOTION_GOALS_DATABASE_ID
+            }
+            # Process-wide state, configured once at startup by configure_notion
+            self.schema_cache = schema_cache
+            self.scheduler = notion_scheduler
+            self.page_cache = PageCache(ttl_seconds=settings.NOTION_PAGE_CACHE_SECONDS)
+            self.mirror = NotionMirror(settings.NOTION_MIRROR_PATH) if settings.NOTION_MIRROR_PATH else None
 
             logger.info("NotionClient initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize NotionClient: {str(e)}", exc_info=True)
             raise NotionClientError(f"Initialization failed: {str(e)}")
 
+    @property
+    def sync_client(self) -> SyncClient:
+        """Blocking client, only built for callers that need one."""
+        if self._sync_client is None:
+            self._sync_client = SyncClient(auth=self._api_key)
+        return self._sync_client
+
+    async def close(self):
+        """Release the mirror connection; the pooled transport is closed by its owner."""
+        if self.mirror:
+            self.mirror.close()
+
+    async def call(
+        self,
+        fn: Callable[..., Awaitable[Any]],
+        *args,
+        priority: Priority = Priority.INTERACTIVE,
+        idempotent: bool = True,
+        **kwargs
+    ) -> Any:
+        """Run a raw Notion API call through the shared rate-limit scheduler."""
+        return await self.scheduler.run(fn, *args, priority=priority, idempotent=idempotent, **kwargs)
+
     async def get_tasks(self) -> List[Dict]:
         """Get tasks with extra debugging."""
         try:
-            # 1. Verify database access and get schema
-            logger.info(f"Attempting to retrieve database info for ID: {self.tasks_db_id}")
-            db_info = await self.client.databases.retrieve(self.tasks_db_id)
-
-            # 2. Log database properties
-            logger.info("Database properties:")
-            properties = db_info.get('properties', {})
-            for prop_name, prop_info in properties.items():
-                logger.info(f"Property '{prop_name}': type={prop_info.get('type')}")
+            # 1. Verify database access (the schema is cached after the first call)
+            await self.get_schema(self.tasks_db_id)
 
-            # 3. Attempt the simplest possible query
+            # 2. Walk every page of the query, not just the first 100 results
             logger.info("Attempting to query database with no filters...")
             try:
-                response = await self.client.databases.query(
-                    database_id=self.tasks_db_id
-                )
-                logger.info(f"Successfully retrieved {len(response.get('results', []))} results")
-
-                # 4. Log first result if available
-                if response.get('results'):
-                    first_result = response['results'][0]
-                    logger.info("First result structure:")
-                    logger.info(json.dumps({
+                tasks = [task async for task in self.iter_tasks()]
+                logger.info(f"Successfully retrieved {len(tasks)} results")
+
+                # 3. Log first result if available
+                if tasks:
+                    first_result = tasks[0]
+                    logger.debug("First result structure: %s", LazyJson({
                         'id': first_result.get('id'),
                         'properties': first_result.get('properties')
-                    }, indent=2))
+                    }))
 
-                return response.get('results', [])
+                return tasks
 
             except Exception as query_error:
                 logger.error("Error during database query:", exc_info=True)
@@ -71,32 +128,221 @@ class NotionClient:
             logger.error(f"Error in get_tasks: {str(e)}", exc_info=True)
             raise NotionClientError(f"Failed to fetch tasks: {str(e)}")
 
+    async def get_schema(
+        self,
+        database_id: Optional[str] = None,
+        refresh: bool = False,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Dict:
+        """Get a database schema, defaulting to the tasks database."""
+        database_id = database_id or self.tasks_db_id
+        try:
+            return await self.schema_cache.get(
+                database_id,
+                lambda: self.call(self.client.databases.retrieve, database_id=database_id, priority=priority),
+                refresh=refresh
+            )
+        except Exception as e:
+            logger.error(f"Error retrieving schema for {database_id}: {str(e)}", exc_info=True)
+            raise NotionClientError(f"Failed to retrieve database schema: {str(e)}")
+
+    async def get_property_types(self, database_id: Optional[str] = None) -> Dict[str, str]:
+        """Get the property name to Notion type map of a database."""
+        return property_types(await self.get_schema(database_id))
+
+    def invalidate_schema(self, database_id: Optional[str] = None):
+        """Forget cached schemas so the next lookup hits Notion."""
+        self.schema_cache.invalidate(database_id)
+
+    async def iter_records(
+        self,
+        database: str = 'tasks',
+        priority: Priority = Priority.INTERACTIVE,
+        **query
+    ) -> AsyncIterator[Record]:
+        """Stream a database as typed records decoded once per page."""
+        database_id = self.database_ids[database]
+        schema = await self.get_schema(database_id, priority=priority)
+        decoder = get_decoder(RECORD_TYPES[database], schema)
+        async for page in self.iter_pages(database_id, priority=priority, **query):
+            yield decoder.decode(page)
+
+    async def iter_records_since(
+        self,
+        database: str,
+        since: datetime,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[Record]:
+        """Stream the records of a database edited at or after `since` (naive UTC)."""
+        database_id = self.database_ids[database]
+        schema = await self.get_schema(database_id, priority=priority)
+        decoder = get_decoder(RECORD_TYPES[database], schema)
+        edited_since = since.isoformat(timespec='milliseconds') + 'Z'
+        if self.mirror and self.mirror.is_synced(database_id):
+            pages = self._iter_mirror_pages(database_id, since=edited_since)
+        else:
+            pages = self.iter_remote_pages(
+                database_id,
+                priority=priority,
+                filter={'timestamp': 'last_edited_time', 'last_edited_time': {'on_or_after': edited_since}}
+            )
+        async for page in pages:
+            yield decoder.decode(page)
+
+    async def get_task_record(self, task_id: str) -> TaskRecord:
+        """Get a single task decoded into a TaskRecord."""
+        schema = await self.get_schema(self.tasks_db_id)
+        return get_decoder(TaskRecord, schema).decode(await self.get_task(task_id))
+
+    async def query_tasks(self, task_query: TaskQuery) -> AsyncIterator[Dict]:
+        """Stream tasks matching a query, trimmed to the requested fields.
+
+        Filters and sorts are pushed down to Notion, or applied locally when
+        the tasks database is served from the mirror. Raises ValueError if
+        the schema cannot satisfy the query.
+        """
+        decoder = await self.check_task_query(task_query)
+        if not task_query.has_filters:
+            pages = self.iter_pages(self.tasks_db_id)
+        elif self.mirror and self.mirror.is_synced(self.tasks_db_id):
+            pages = self._query_mirror(task_query, decoder)
+        else:
+            pages = self.iter_remote_pages(self.tasks_db_id, **task_query.to_notion(decoder))
+        async for page in pages:
+            yield task_query.project_page(page)
+
+    async def check_task_query(self, task_query: TaskQuery) -> RecordDecoder:
+        """Check a query against the tasks schema; returns the decoder it runs with."""
+        schema = await self.get_schema(self.tasks_db_id)
+        decoder = get_decoder(TaskRecord, schema)
+        task_query.check(decoder)
+        return decoder
+
+    async def _query_mirror(self, task_query: TaskQuery, decoder: RecordDecoder) -> AsyncIterator[Dict]:
+        matched = []
+        async for page in self._iter_mirror_pages(self.tasks_db_id):
+            record = decoder.decode(page)
+            if not task_query.matches(record, page, decoder):
+                continue
+            if task_query.sort:
+                matched.append((record, page))
+            else:
+                yield page
+        if task_query.sort:
+            matched.sort(key=task_query.sort_key())
+            for _, page in matched:
+                yield page
+
+    def iter_tasks(self, **query) -> AsyncIterator[Dict]:
+        """Stream every task in the tasks database."""
+        return self.iter_pages(self.tasks_db_id, **query)
+
+    async def iter_pages(
+        self,
+        database_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        priority: Priority = Priority.INTERACTIVE,
+        **query
+    ) -> AsyncIterator[Dict]:
+        """Yield every page of a database, from the local mirror when it is synced."""
+        if self.mirror and not query and self.mirror.is_synced(database_id):
+            pages = self._iter_mirror_pages(database_id)
+        else:
+            pages = self.iter_remote_pages(database_id, page_size, priority, **query)
+        async for page in pages:
+            yield page
+
+    async def _iter_mirror_pages(self, database_id: str, since: Optional[str] = None) -> AsyncIterator[Dict]:
+        """Yield mirrored pages in batches read off the event loop."""
+        after = None
+        while True:
+            batch = await asyncio.to_thread(self.mirror.read_batch, database_id, after, since=since)
+            if not batch:
+                return
+            for page in batch:
+                yield page
+            after = batch[-1]
+
+    async def iter_remote_pages(
+        self,
+        database_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        priority: Priority = Priority.INTERACTIVE,
+        **query
+    ) -> AsyncIterator[Dict]:
+        """Yield every page of a live database query, following `next_cursor`.
+
+        The next batch is requested while the current one is being consumed,
+        so only two batches are ever held in memory.
+        """
+        next_batch = asyncio.ensure_future(
+            self._query_batch(database_id, None, page_size, priority, query)
+        )
+        try:
+            while next_batch is not None:
+                response = await next_batch
+                next_batch = None
+                cursor = response.get('next_cursor')
+                if response.get('has_more') and cursor:
+                    next_batch = asyncio.ensure_future(
+                        self._query_batch(database_id, cursor, page_size, priority, query)
+                    )
+                for page in response.get('results', []):
+                    yield page
+        finally:
+            if next_batch is not None and not next_batch.done():
+                next_batch.cancel()
+
+    async def _query_batch(
+        self,
+        database_id: str,
+        cursor: Optional[str],
+        page_size: int,
+        priority: Priority,
+        query: Dict
+    ) -> Dict:
+        """Fetch a single batch of query results starting at `cursor`."""
+        try:
+            params = dict(query, database_id=database_id, page_size=min(page_size, MAX_PAGE_SIZE))
+            if cursor:
+                params['start_cursor'] = cursor
+            return await self.call(self.client.databases.query, priority=priority, **params)
+        except Exception as e:
+            logger.error(f"Error querying database {database_id}: {str(e)}", exc_info=True)
+            raise NotionClientError(f"Database query failed: {str(e)}")
+
     async def get_task(self, task_id: str) -> Dict:
         """Get a single task by ID."""
         try:
             if not task_id:
                 raise NotionClientError("Task ID is required")
 
-            logger.info(f"Retrieving task with ID: {task_id}")
-            result = await self.client.pages.retrieve(page_id=task_id)
+            if self.mirror:
+                mirrored = await asyncio.to_thread(self.mirror.get_page, task_id)
+                if mirrored:
+                    return mirrored
 
-            if result:
-                logger.info("Successfully retrieved task")
-                logger.debug(f"Task data: {json.dumps(result, indent=2)}")
-            return result
+            # Concurrent callers for the same task share one pages.retrieve
+            return await self.page_cache.get(task_id, lambda: self._retrieve_task(task_id))
 
         except Exception as e:
             logger.error(f"Error fetching task {task_id}: {str(e)}", exc_info=True)
             raise NotionClientError(f"Failed to fetch task: {str(e)}")
 
+    async def _retrieve_task(self, task_id: str) -> Dict:
+        logger.info(f"Retrieving task with ID: {task_id}")
+        result = await self.call(self.client.pages.retrieve, page_id=task_id)
+
+        if result:
+            logger.info("Successfully retrieved task")
+            logger.debug("Task data: %s", LazyJson(result))
+        return result
+
     async def get_projects(self) -> List[Dict]:
         """Get projects with error handling."""
         try:
             logger.info(f"Querying projects database: {self.projects_db_id}")
-            response = await self.client.databases.query(
-                database_id=self.projects_db_id
-            )
-            return response.get("results", [])
+            return [project async for project in self.iter_pages(self.projects_db_id)]
         except Exception as e:
             logger.error(f"Error fetching projects: {str(e)}", exc_info=True)
             raise NotionClientError(f"Failed to fetch projects: {str(e)}")
@@ -106,25 +352,70 @@ class NotionClient:
         try:
             if not task_id:
                 raise NotionClientError("Task ID is required")
-            logger.info(f"Updating task {task_id} with properties: {json.dumps(properties, indent=2)}")
-            return await self.client.pages.update(
+            logger.info(f"Updating task {task_id} properties: {', '.join(properties)}")
+            logger.debug("Update payload for %s: %s", task_id, LazyJson(properties))
+            self.page_cache.invalidate(task_id)
+            page = await self.call(
+                self.client.pages.update,
                 page_id=task_id,
                 properties=properties
             )
+            await self._write_through(page)
+            return page
         except Exception as e:
             logger.error(f"Error updating task {task_id}: {str(e)}", exc_info=True)
             raise NotionClientError(f"Failed to update task: {str(e)}")
 
+    async def update_tasks(
+        self,
+        updates: List[Tuple[str, Dict]],
+        concurrency: int = 3
+    ) -> Dict[str, Dict]:
+        """Apply many property updates with at most `concurrency` writes in flight.
+
+        Repeated updates to the same task are merged into a single write, with
+        later values winning per property. Returns a result per task ID.
+        """
+        merged: Dict[str, Dict] = {}
+        for task_id, properties in updates:
+            merged.setdefault(task_id, {}).update(properties)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def apply(task_id: str, properties: Dict) -> Tuple[str, Dict]:
+            async with semaphore:
+                try:
+                    await self.update_task(task_id, properties)
+                    return task_id, {"status": "success"}
+                except NotionClientError as e:
+                    return task_id, {"status": "error", "detail": str(e)}
+
+        logger.info(f"Applying {len(updates)} updates as {len(merged)} task writes")
+        return dict(await asyncio.gather(*(apply(t, p) for t, p in merged.items())))
+
     async def create_task(self, properties: Dict) -> Dict:
         """Create task with validation."""
         try:
             if not properties:
                 raise NotionClientError("Properties are required")
-            logger.info(f"Creating task with properties: {json.dumps(properties, indent=2)}")
-            return await self.client.pages.create(
+            logger.info(f"Creating task with properties: {', '.join(properties)}")
+            logger.debug("Create payload: %s", LazyJson(properties))
+            page = await self.call(
+                self.client.pages.create,
+                idempotent=False,
                 parent={"database_id": self.tasks_db_id},
                 properties=properties
             )
+            await self._write_through(page)
+            return page
         except Exception as e:
             logger.error(f"Error creating task: {str(e)}", exc_info=True)
             raise NotionClientError(f"Failed to create task: {str(e)}")
+
+    async def _write_through(self, page: Dict):
+        """Cache and mirror a task we just wrote so local reads see it immediately."""
+        if not isinstance(page, dict) or 'id' not in page:
+            return
+        self.page_cache.replace(page['id'], page)
+        if self.mirror:
+            await asyncio.to_thread(self.mirror.upsert_pages, self.tasks_db_id, [page])
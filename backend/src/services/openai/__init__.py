@@ -1,4 +1,8 @@
 from .client import AsyncAIClient
 from .config import OpenAISettings, get_openai_settings
+from .ledger import BudgetExceededError, LLMLedger, llm_caller
 
-__all__ = ['AsyncAIClient', 'OpenAISettings', 'get_openai_settings']
+__all__ = [
+    'AsyncAIClient', 'OpenAISettings', 'get_openai_settings',
+    'BudgetExceededError', 'LLMLedger', 'llm_caller'
+]
@@ -1,16 +1,140 @@
-import openai
-from typing import Dict
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from openai import AsyncOpenAI
+import httpx
+import logging
+import time
+from .config import OpenAISettings
 from .prompts import create_insight_prompt, create_goal_alignment_prompt
+from .prompt_builder import estimate_tokens
+from .ledger import LLMLedger
+from ..rate_limit import TokenBucket
 
-class OpenAIClient:
-    def __init__(self, api_key: str):
-        openai.api_key = api_key
+logger = logging.getLogger(__name__)
+
+class AsyncAIClient:
+    """App-wide async OpenAI client.
+
+    Wraps one `AsyncOpenAI` over a pooled httpx client, with the retry and
+    timeout policy from `OpenAISettings`, and makes every call wait for room
+    in shared requests-per-minute and tokens-per-minute buckets.
+    `chat.completions.create` mirrors the OpenAI SDK so call sites read the same.
+    With a ledger, every call is checked against its budget and recorded.
+    """
+
+    def __init__(
+        self,
+        settings: OpenAISettings,
+        http_client: Optional[httpx.AsyncClient] = None,
+        wrap_transport: Optional[Callable[[httpx.AsyncBaseTransport], httpx.AsyncBaseTransport]] = None,
+        ledger: Optional[LLMLedger] = None
+    ):
+        self.settings = settings
+        self.ledger = ledger
+        if http_client is None:
+            transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=settings.max_connections,
+                    max_keepalive_connections=settings.max_connections
+                )
+            )
+            http_client = httpx.AsyncClient(
+                transport=wrap_transport(transport) if wrap_transport else transport,
+                timeout=settings.timeout
+            )
+        self.http_client = http_client
+        # The SDK retries 429s, 5xx and connection errors with exponential backoff
+        self.client = AsyncOpenAI(
+            api_key=settings.api_key,
+            timeout=settings.timeout,
+            max_retries=settings.max_retries,
+            http_client=self.http_client
+        )
+        self.request_bucket = TokenBucket(rate=settings.rate_limit_rpm / 60, capacity=settings.rate_limit_rpm)
+        self.token_bucket = TokenBucket(rate=settings.rate_limit_tpm / 60, capacity=settings.rate_limit_tpm)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create_chat_completion))
+
+    async def create_chat_completion(self, **kwargs) -> Any:
+        """Rate-limited `chat.completions.create`; accepts a per-call `timeout`."""
+        if self.ledger is not None:
+            kwargs['model'] = self.ledger.admit(kwargs['model'])
+        # The bucket never hands out more than its capacity, so never settle against more
+        reserved = min(
+            self.estimate_tokens(kwargs.get('messages', []), kwargs.get('max_tokens')),
+            self.token_bucket.capacity
+        )
+        await self.request_bucket.acquire()
+        await self.token_bucket.acquire(reserved)
+
+        started = time.perf_counter()
+        response = await self.client.chat.completions.create(**kwargs)
+        if kwargs.get('stream'):
+            return self._metered_stream(response, kwargs, started, reserved)
+
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            self._settle(reserved, usage.total_tokens)
+        if self.ledger is not None and usage is not None:
+            self.ledger.record(
+                kwargs['model'], usage.prompt_tokens, usage.completion_tokens,
+                (time.perf_counter() - started) * 1000
+            )
+        return response
+
+    async def _metered_stream(
+        self,
+        stream: Any,
+        kwargs: Dict,
+        started: float,
+        reserved: float
+    ) -> AsyncIterator[Any]:
+        """Pass a streamed completion through, settling estimated usage at the end.
+
+        Usage is settled however the stream ends, including when the client
+        disconnects and the stream is closed early: the prompt and the tokens
+        generated so far are billed either way.
+        """
+        completion = ""
+        try:
+            async for chunk in stream:
+                if chunk.choices:
+                    completion += getattr(chunk.choices[0].delta, 'content', None) or ""
+                yield chunk
+        finally:
+            # Streams carry no usage block, so both sides are estimated
+            prompt_tokens = self.estimate_prompt_tokens(kwargs.get('messages', []))
+            completion_tokens = estimate_tokens(completion)
+            self._settle(reserved, prompt_tokens + completion_tokens)
+            if self.ledger is not None:
+                self.ledger.record(
+                    kwargs['model'], prompt_tokens, completion_tokens, (time.perf_counter() - started) * 1000
+                )
+
+    def _settle(self, reserved: float, used: float):
+        """Give back whatever the token reservation overestimated."""
+        if used < reserved:
+            self.token_bucket.refund(reserved - used)
+
+    def record_cache_hit(self, model: str):
+        """Account for an answer served from a cache instead of the API."""
+        if self.ledger is not None:
+            self.ledger.record(model, 0, 0, 0.0, cached=True)
+
+    def estimate_prompt_tokens(self, messages: List[Dict]) -> int:
+        return sum(estimate_tokens(message.get('content') or '') + 4 for message in messages)
+
+    def estimate_tokens(self, messages: List[Dict], max_tokens: Optional[int] = None) -> int:
+        """Rough token count for a request, including the completion."""
+        return self.estimate_prompt_tokens(messages) + (max_tokens or self.settings.expected_completion_tokens)
+
+    async def close(self):
+        await self.client.close()
 
     async def generate_insights(self, data: Dict) -> Dict:
         """Generate insights using OpenAI's GPT model."""
-        prompt = create_insight_prompt(data)
+        prompt = create_insight_prompt(data, self.settings.prompt_token_budget)
 
-        response = await openai.ChatCompletion.create(
+        response = await self.chat.completions.create(
             model="gpt-4",
             messages=[{
                 "role": "system",
@@ -25,11 +149,11 @@ class OpenAIClient:
 
         return response.choices[0].message.content
 
-    async def analyze_goal_alignment(self, goals: Dict, tasks: Dict) -> Dict:
+    async def analyze_goal_alignment(self, goals: List, tasks: List) -> Dict:
         """Analyze alignment between goals and tasks."""
-        prompt = create_goal_alignment_prompt(goals, tasks)
+        prompt = create_goal_alignment_prompt(goals, tasks, self.settings.prompt_token_budget)
 
-        response = await openai.ChatCompletion.create(
+        response = await self.chat.completions.create(
             model="gpt-4",
             messages=[{
                 "role": "system",
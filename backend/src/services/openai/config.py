@@ -1,4 +1,4 @@
-from pydantic import BaseSettings
+from pydantic_settings import BaseSettings
 from functools import lru_cache
 
 class OpenAISettings(BaseSettings):
@@ -7,10 +7,17 @@ class OpenAISettings(BaseSettings):
     max_retries: int = 3
     timeout: int = 30
     rate_limit_rpm: int = 50
+    rate_limit_tpm: int = 10000
+    max_connections: int = 20
+    # Completion tokens reserved against the TPM budget when max_tokens is not given
+    expected_completion_tokens: int = 500
+    # Upper bound on generated prompt size; larger workspaces are summarized
+    prompt_token_budget: int = 3000
 
     class Config:
         env_prefix = "OPENAI_"
         env_file = ".env"
+        extra = "ignore"
 
 @lru_cache()
 def get_openai_settings() -> OpenAISettings:
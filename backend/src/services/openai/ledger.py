@@ -0,0 +1,160 @@
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# (endpoint, user) the current LLM call is made for; set per request
+llm_caller: ContextVar[Tuple[str, str]] = ContextVar('llm_caller', default=('background', 'system'))
+
+# USD per 1K (prompt, completion) tokens
+MODEL_PRICES = {
+    'gpt-4': (0.03, 0.06),
+    'gpt-4-turbo-preview': (0.01, 0.03),
+    'gpt-3.5-turbo': (0.0005, 0.0015)
+}
+
+GROUPS = ('endpoint', 'user', 'model')
+
+class BudgetExceededError(Exception):
+    """Raised when an endpoint's daily token budget is spent and requests are rejected."""
+    pass
+
+
+class LLMLedger:
+    """Per-call accounting of LLM tokens, cost and latency, with daily budgets.
+
+    Every call is recorded against the endpoint and user in `llm_caller`.
+    Budgets are daily token limits per endpoint (`*` for any other endpoint);
+    once spent, calls are either downgraded to `fallback_model` or rejected.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        budgets: Optional[Dict[str, int]] = None,
+        action: str = "downgrade",
+        fallback_model: str = "gpt-3.5-turbo"
+    ):
+        if action not in ("downgrade", "reject"):
+            raise ValueError(f"Unknown budget action '{action}', expected 'downgrade' or 'reject'")
+        self.budgets = budgets or {}
+        self.action = action
+        self.fallback_model = fallback_model
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        # WAL without per-commit fsync keeps each insert cheap enough for the event loop
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_calls ("
+            "ts REAL NOT NULL, endpoint TEXT NOT NULL, user TEXT NOT NULL, model TEXT NOT NULL, "
+            "prompt_tokens INTEGER NOT NULL, completion_tokens INTEGER NOT NULL, "
+            "latency_ms REAL NOT NULL, cached INTEGER NOT NULL, cost_usd REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_calls_ts ON llm_calls (ts)")
+        self._day = _today()
+        self._spent: Dict[str, int] = self._load_spent(self._day)
+
+    def budget_for(self, endpoint: str) -> Optional[int]:
+        return self.budgets.get(endpoint, self.budgets.get('*'))
+
+    def remaining(self, endpoint: str) -> Optional[int]:
+        budget = self.budget_for(endpoint)
+        if budget is None:
+            return None
+        self._roll_day()
+        return max(budget - self._spent.get(endpoint, 0), 0)
+
+    def admit(self, model: str) -> str:
+        """Model to use for the current caller, or raise once its budget is spent."""
+        endpoint, _ = llm_caller.get()
+        if self.remaining(endpoint) != 0:
+            return model
+        if self.action == "reject":
+            raise BudgetExceededError(f"Daily LLM token budget for {endpoint} is exhausted")
+        if model != self.fallback_model:
+            logger.warning(f"LLM budget for {endpoint} exhausted, downgrading {model} to {self.fallback_model}")
+        return self.fallback_model
+
+    def record(
+        self,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency_ms: float,
+        cached: bool = False
+    ):
+        endpoint, user = llm_caller.get()
+        self._roll_day()
+        if not cached:
+            self._spent[endpoint] = self._spent.get(endpoint, 0) + prompt_tokens + completion_tokens
+        prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+        cost = 0.0 if cached else (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+        row = (time.time(), endpoint, user, model, prompt_tokens, completion_tokens, latency_ms, int(cached), cost)
+        self._insert(row)
+
+    def rollup(self, group_by: str = "endpoint", days: int = 1) -> List[Dict]:
+        """Totals per endpoint, user or model over the last `days` days."""
+        if group_by not in GROUPS:
+            raise ValueError(f"Unsupported group_by '{group_by}', expected one of {', '.join(GROUPS)}")
+        since = time.time() - days * 86400
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {group_by}, COUNT(*), SUM(cached), SUM(prompt_tokens), SUM(completion_tokens), "
+                "SUM(cost_usd), AVG(CASE WHEN cached = 0 THEN latency_ms END), MAX(latency_ms) "
+                f"FROM llm_calls WHERE ts >= ? GROUP BY {group_by} ORDER BY SUM(cost_usd) DESC",
+                (since,)
+            ).fetchall()
+        return [
+            {
+                group_by: key,
+                'calls': calls,
+                'cache_hits': hits,
+                'prompt_tokens': prompt,
+                'completion_tokens': completion,
+                'cost_usd': round(cost, 4),
+                'avg_latency_ms': round(avg_latency, 1) if avg_latency is not None else None,
+                'max_latency_ms': round(max_latency, 1)
+            }
+            for key, calls, hits, prompt, completion, cost, avg_latency, max_latency in rows
+        ]
+
+    def budget_status(self) -> Dict[str, Dict[str, int]]:
+        return {
+            endpoint: {'budget': budget, 'spent': self._spent.get(endpoint, 0), 'remaining': self.remaining(endpoint)}
+            for endpoint, budget in self.budgets.items()
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _insert(self, row: Tuple):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO llm_calls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def _roll_day(self):
+        today = _today()
+        if today != self._day:
+            self._day = today
+            self._spent = {}
+
+    def _load_spent(self, day: datetime) -> Dict[str, int]:
+        """Today's spend per endpoint, so budgets survive restarts."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT endpoint, SUM(prompt_tokens + completion_tokens) FROM llm_calls "
+                "WHERE ts >= ? AND ts < ? AND cached = 0 GROUP BY endpoint",
+                (day.timestamp(), (day + timedelta(days=1)).timestamp())
+            ).fetchall()
+        return {endpoint: tokens for endpoint, tokens in rows}
+
+
+def _today() -> datetime:
+    now = datetime.now(timezone.utc)
+    return datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
@@ -0,0 +1,164 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import json
+from ..notion.records import is_done
+
+# Averaged over English prose and the compact listings below
+CHARS_PER_TOKEN = 4
+
+LEVELS = {'high': 2, 'medium': 1, 'low': 0}
+# Tokens held back in each section for its "... N more" line
+SUMMARY_TOKENS = 24
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the token count of `text` without a tokenizer."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def render_section(
+    items: Iterable[Any],
+    render: Callable[[Any], str],
+    budget_tokens: int,
+    score: Optional[Callable[[Any], float]] = None,
+    summarize: Optional[Callable[[List[Any]], str]] = None
+) -> str:
+    """Render items one line each, most relevant first, within a token budget.
+
+    Identical lines are folded into one with a count. Items that do not fit
+    are described by a single `summarize` line instead of being dropped silently.
+    """
+    ranked = sorted(items, key=score, reverse=True) if score else list(items)
+    groups: Dict[str, List[Any]] = {}
+    for item in ranked:
+        groups.setdefault(render(item), []).append(item)
+
+    # Leave room for the summary line whenever something might not fit
+    available = budget_tokens - SUMMARY_TOKENS
+    lines: List[str] = []
+    omitted: List[Any] = []
+    for line, group in groups.items():
+        text = f"- {line}" + (f" (x{len(group)})" if len(group) > 1 else "")
+        cost = estimate_tokens(text) + 1
+        if omitted or cost > available:
+            omitted.extend(group)
+            continue
+        lines.append(text)
+        available -= cost
+
+    if omitted:
+        detail = f": {summarize(omitted)}" if summarize else ""
+        lines.append(f"- ... {len(omitted)} more{detail}")
+    return "\n".join(lines) if lines else "- none"
+
+
+def compact_value(value: Any, max_items: int = 5) -> str:
+    """Compact JSON for prompt interpolation, with long lists trimmed to `max_items`."""
+    return json.dumps(_trim(value, max_items), separators=(',', ':'), default=str)
+
+
+def _trim(value: Any, max_items: int) -> Any:
+    if isinstance(value, dict):
+        limit = max_items * 4
+        trimmed = {key: _trim(item, max_items) for key, item in list(value.items())[:limit]}
+        if len(value) > limit:
+            trimmed['+more'] = len(value) - limit
+        return trimmed
+    if isinstance(value, (list, tuple)):
+        trimmed = [_trim(item, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            trimmed.append(f"+{len(value) - max_items} more")
+        return trimmed
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def item_id(item: Any) -> Optional[str]:
+    raw = item.get('id') if isinstance(item, dict) else getattr(item, 'id', None)
+    return raw.replace('-', '') if raw else None
+
+
+def field(item: Any, *names: str) -> Any:
+    """First non-empty field among `names` on a decoded record or a flat dict."""
+    for name in names:
+        value = item.get(name)
+        if value not in (None, '', []):
+            return value
+    return None
+
+
+def _date(value: Any) -> Optional[str]:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return str(value)[:10] if value else None
+
+
+def render_goal(goal: Any) -> str:
+    parts = [str(field(goal, 'Title', 'Name') or 'Untitled')]
+    for label, value in (
+        ('status', field(goal, 'Status')),
+        ('progress', field(goal, 'Progress')),
+        ('target', _date(field(goal, 'TargetDate', 'Target Date')))
+    ):
+        if value is not None:
+            parts.append(f"{label} {value}")
+    return " | ".join(parts)
+
+
+def render_task(task: Any) -> str:
+    parts = [str(field(task, 'Title', 'Name') or 'Untitled')]
+    for label, value in (
+        ('status', field(task, 'Status')),
+        ('importance', field(task, 'Importance')),
+        ('urgency', field(task, 'Urgency')),
+        ('due', _date(field(task, 'DueDate', 'Due Date')))
+    ):
+        if value is not None:
+            parts.append(f"{label} {value}")
+    return " | ".join(parts)
+
+
+def score_goal(goal: Any) -> float:
+    """Active goals first, least progressed first."""
+    progress = field(goal, 'Progress')
+    if not isinstance(progress, (int, float)):
+        progress = 0
+    if progress > 1:
+        progress /= 100
+    return (0 if is_done(goal) else 10) - progress
+
+
+def task_scorer(goals: List[Any]) -> Callable[[Any], float]:
+    """Rank open, important, urgent tasks linked to the listed goals first."""
+    linked = set()
+    for goal in goals:
+        for related in field(goal, 'RelatedTasks', 'Related Tasks') or []:
+            linked.add(str(related).replace('-', ''))
+
+    def score(task: Any) -> float:
+        value = 0.0 if is_done(task) else 8.0
+        value += LEVELS.get(str(field(task, 'Importance') or '').lower(), 0)
+        value += LEVELS.get(str(field(task, 'Urgency') or '').lower(), 0)
+        if item_id(task) in linked:
+            value += 4.0
+        if field(task, 'DueDate', 'Due Date'):
+            value += 1.0
+        return value
+    return score
+
+
+def summarize_by_status(items: List[Any]) -> str:
+    counts = Counter(str(field(item, 'Status') or 'No status') for item in items)
+    return ", ".join(f"{status} {count}" for status, count in counts.most_common())
+
+
+def fit_to_budget(render: Callable[[int], str], budget_tokens: int, steps=(8, 5, 3, 1)) -> str:
+    """Render with progressively fewer list items until the text fits the budget."""
+    text = ""
+    for max_items in steps:
+        text = render(max_items)
+        if estimate_tokens(text) <= budget_tokens:
+            break
+    return text
@@ -1,20 +1,29 @@
-from typing import Dict, List
+from typing import Any, Dict, List
+from .prompt_builder import (
+    compact_value, estimate_tokens, fit_to_budget, render_goal, render_section,
+    render_task, score_goal, summarize_by_status, task_scorer
+)
 
-def create_insight_prompt(data: Dict) -> str:
-    return f"""Analyze the following user data and provide actionable insights:
+# Default prompt budget, leaving room for the answer in an 8K context
+DEFAULT_PROMPT_TOKENS = 3000
+
+def create_insight_prompt(data: Dict, budget_tokens: int = DEFAULT_PROMPT_TOKENS) -> str:
+    def render(max_items: int) -> str:
+        value = lambda section, key: compact_value(data[section][key], max_items)
+        return f"""Analyze the following user data and provide actionable insights:
 
 Task Patterns:
-- Completion Rate: {data['tasks']['completion_rate']}
-- Peak Productivity: {data['tasks']['peak_productivity_times']}
-- Blockers: {data['tasks']['common_blockers']}
+- Completion Rate: {value('tasks', 'completion_rate')}
+- Peak Productivity: {value('tasks', 'peak_productivity_times')}
+- Blockers: {value('tasks', 'common_blockers')}
 
 Goal Progress:
-- Progress Metrics: {data['goals']['goal_progress']}
-- Goal Alignment: {data['goals']['goal_alignment']}
+- Progress Metrics: {value('goals', 'goal_progress')}
+- Goal Alignment: {value('goals', 'goal_alignment')}
 
 Behavioral Patterns:
-- Consistency Score: {data['behavior']['consistency']}
-- Adaptation Level: {data['behavior']['adaptation']}
+- Consistency Score: {value('behavior', 'consistency')}
+- Adaptation Level: {value('behavior', 'adaptation')}
 
 Generate:
 1. Key patterns and correlations
@@ -25,11 +34,20 @@ Generate:
 
 Format response as JSON with keys: summary, recommendations, action_items"""
 
-def create_goal_alignment_prompt(goals: List[Dict], tasks: List[Dict]) -> str:
-    return f"""Analyze goal-task alignment for the following:
+    return fit_to_budget(render, budget_tokens)
+
+def create_goal_alignment_prompt(
+    goals: List[Any],
+    tasks: List[Any],
+    budget_tokens: int = DEFAULT_PROMPT_TOKENS
+) -> str:
+    template = """Analyze goal-task alignment for the following:
 
-Goals: {goals}
-Tasks: {tasks}
+Goals:
+{goals}
+
+Tasks:
+{tasks}
 
 Evaluate:
 1. Task-goal alignment strength
@@ -39,3 +57,12 @@ Evaluate:
 5. Resource allocation efficiency
 
 Format response as JSON with keys: alignment_score, gaps, recommendations"""
+
+    # Goals get a third of what the template leaves; tasks get whatever goals do not use
+    available = budget_tokens - estimate_tokens(template)
+    goal_lines = render_section(goals, render_goal, available // 3, score_goal, summarize_by_status)
+    task_lines = render_section(
+        tasks, render_task, available - estimate_tokens(goal_lines),
+        task_scorer(goals), summarize_by_status
+    )
+    return template.format(goals=goal_lines, tasks=task_lines)
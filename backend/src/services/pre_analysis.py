@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+from .notion_client import NotionClient
+from .notion.records import TaskRecord
+from .notion.scheduler import Priority
+from .rate_limit import TokenBucket
+from .similarity_index import normalize_title
+from .task_intelligence import TaskIntelligenceService
+
+logger = logging.getLogger(__name__)
+
+# Tasks due this soon jump ahead of the Eisenhower ordering
+DUE_SOON = timedelta(days=3)
+# Re-read a little before the checkpoint; Notion timestamps are minute-granular
+CHECKPOINT_OVERLAP = timedelta(minutes=2)
+# Delta polls cannot see deleted tasks, so every so often all tasks are re-read
+FULL_POLL_INTERVAL = timedelta(days=1)
+
+class PreAnalysisWorker:
+    """Analyze new and retitled tasks before anyone asks, within an hourly LLM budget.
+
+    Each round picks up tasks edited since the last checkpoint, keeps the
+    open ones whose title has not been analyzed yet, and analyzes them most
+    pressing first. Anything the budget does not cover stays queued for the
+    next round. Results land in the service's response cache, so the analyze
+    endpoint becomes a cache hit. Titles are only remembered for tasks that
+    are still open: closed tasks are forgotten as polls see them, and a full
+    poll once a day drops tasks that were deleted.
+    """
+
+    def __init__(
+        self,
+        notion_client: NotionClient,
+        task_service: TaskIntelligenceService,
+        analyses_per_hour: int = 30
+    ):
+        self.notion = notion_client
+        self.task_service = task_service
+        self.budget = TokenBucket(rate=analyses_per_hour / 3600, capacity=max(analyses_per_hour, 1))
+        self.checkpoint: Optional[datetime] = None
+        self.full_poll_at: Optional[datetime] = None
+        self.pending: Dict[str, TaskRecord] = {}
+        self._analyzed_titles: Dict[str, str] = {}
+        self.analyzed = 0
+        self.reused = 0
+
+    async def poll(self) -> List[TaskRecord]:
+        """Queue open tasks created or retitled since the last checkpoint."""
+        started = datetime.now(timezone.utc)
+        full = self.checkpoint is None or started - self.full_poll_at > FULL_POLL_INTERVAL
+        query = {}
+        if not full:
+            since = (self.checkpoint - CHECKPOINT_OVERLAP).isoformat()
+            query['filter'] = {'timestamp': 'last_edited_time', 'last_edited_time': {'on_or_after': since}}
+
+        open_ids = set()
+        async for task in self.notion.iter_records('tasks', priority=Priority.BACKGROUND, **query):
+            if not task.Title or task.Complete or task.Status == 'Completed':
+                self.pending.pop(task.id, None)
+                self._analyzed_titles.pop(task.id, None)
+                continue
+            open_ids.add(task.id)
+            if self._analyzed_titles.get(task.id) != normalize_title(task.Title):
+                self.pending[task.id] = task
+        if full:
+            # Anything a full poll did not list as open has been closed or deleted
+            self._analyzed_titles = {
+                task_id: title for task_id, title in self._analyzed_titles.items() if task_id in open_ids
+            }
+            self.pending = {task_id: task for task_id, task in self.pending.items() if task_id in open_ids}
+            self.full_poll_at = started
+        self.checkpoint = started
+        return self.prioritized()
+
+    def prioritized(self) -> List[TaskRecord]:
+        """Pending tasks ordered by due date urgency, then Eisenhower quadrant."""
+        # Record dates are naive UTC
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return sorted(self.pending.values(), key=lambda task: _priority_key(task, now))
+
+    async def run_once(self) -> int:
+        """Poll and analyze as many queued tasks as the budget allows."""
+        analyzed = 0
+        for task in await self.poll():
+            cached = await self.task_service.cached_analysis(task.Title)
+            if cached is None:
+                if self.budget.try_acquire() > 0:
+                    break
+                try:
+                    await self.task_service.analyze_task(task.Title)
+                except Exception as e:
+                    # Leave it queued; the next round tries again
+                    logger.error(f"Pre-analysis of task {task.id} failed: {str(e)}")
+                    continue
+                self.analyzed += 1
+                analyzed += 1
+            else:
+                self.reused += 1
+            self._analyzed_titles[task.id] = normalize_title(task.Title)
+            self.pending.pop(task.id, None)
+        if self.pending:
+            logger.info(f"Pre-analysis budget spent; {len(self.pending)} tasks queued for later")
+        return analyzed
+
+    async def run(self, interval_seconds: int):
+        """Pre-analyze forever, sleeping `interval_seconds` between rounds."""
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Pre-analysis round failed: {str(e)}", exc_info=True)
+            await asyncio.sleep(interval_seconds)
+
+    def stats(self) -> Dict[str, int]:
+        self.budget.try_acquire(0)  # refill before reporting
+        return {
+            'analyzed': self.analyzed,
+            'reused': self.reused,
+            'pending': len(self.pending),
+            'budget_remaining': int(self.budget.tokens)
+        }
+
+
+def quadrant(task: TaskRecord) -> int:
+    """Eisenhower quadrant: 0 important and urgent, 1 important, 2 urgent, 3 neither."""
+    important = (task.Importance or '').strip().lower() == 'high'
+    urgent = (task.Urgency or '').strip().lower() == 'high'
+    return {(True, True): 0, (True, False): 1, (False, True): 2, (False, False): 3}[(important, urgent)]
+
+
+def _priority_key(task: TaskRecord, now: datetime) -> Tuple:
+    due = task.DueDate
+    due_soon = due is not None and due - now <= DUE_SOON
+    return (0 if due_soon else 1, quadrant(task), due or datetime.max)
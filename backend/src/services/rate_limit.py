@@ -0,0 +1,34 @@
+import asyncio
+import time
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, amount: float = 1.0) -> float:
+        """Take `amount` tokens if available; otherwise return the seconds until they are."""
+        self._refill()
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def refund(self, amount: float = 1.0):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until `amount` tokens can be taken."""
+        # Requests larger than the bucket would never fit, so cap them at capacity
+        amount = min(amount, self.capacity)
+        while (wait := self.try_acquire(amount)) > 0:
+            await asyncio.sleep(wait)
@@ -0,0 +1,8 @@
+from .cassette import Cassette
+from .faults import FaultInjector, LatencyModel
+from .transport import RecordingTransport, ReplayTransport, configure_replay, replay_settings
+
+__all__ = [
+    'Cassette', 'FaultInjector', 'LatencyModel',
+    'RecordingTransport', 'ReplayTransport', 'configure_replay', 'replay_settings'
+]
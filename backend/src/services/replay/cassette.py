@@ -0,0 +1,93 @@
+from typing import Dict, List, Optional, Tuple
+import base64
+import hashlib
+import json
+import logging
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Recomputed by httpx for the decoded body we store
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+Key = Tuple[str, str, str, str]
+
+def request_key(request: httpx.Request) -> Key:
+    """Identify a request by method, host, path with query, and canonical JSON body."""
+    body = request.content or b''
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(',', ':')).encode()
+    except ValueError:
+        pass
+    digest = hashlib.sha256(body).hexdigest()[:16] if body else ''
+    return (request.method, request.url.host, request.url.raw_path.decode(), digest)
+
+
+class Cassette:
+    """Recorded request/response pairs, replayed in recording order per request.
+
+    Only the response status, headers and body are kept; request headers
+    (and with them API keys) are never written to disk.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Key, List[Dict]] = {}
+        self._positions: Dict[Key, int] = {}
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def record(self, request: httpx.Request, response: httpx.Response, content: bytes):
+        try:
+            body = {'body': content.decode('utf-8')}
+        except UnicodeDecodeError:
+            body = {'body_b64': base64.b64encode(content).decode()}
+        self._entries.setdefault(request_key(request), []).append({
+            'status': response.status_code,
+            'headers': _kept_headers(response.headers),
+            **body
+        })
+
+    @staticmethod
+    def replayable(response: httpx.Response, content: bytes, request: httpx.Request) -> httpx.Response:
+        """A copy of `response` carrying the already-decoded `content`."""
+        return httpx.Response(
+            response.status_code, headers=_kept_headers(response.headers), content=content, request=request
+        )
+
+    def next_response(self, request: httpx.Request) -> Optional[httpx.Response]:
+        """The next recorded response for this request, cycling when exhausted."""
+        key = request_key(request)
+        entries = self._entries.get(key)
+        if not entries:
+            return None
+        position = self._positions.get(key, 0)
+        self._positions[key] = position + 1
+        entry = entries[position % len(entries)]
+        content = entry['body'].encode() if 'body' in entry else base64.b64decode(entry['body_b64'])
+        return httpx.Response(entry['status'], headers=entry['headers'], content=content, request=request)
+
+    def rewind(self):
+        self._positions.clear()
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for key, entries in self._entries.items():
+                for entry in entries:
+                    f.write(json.dumps({'key': key, **entry}) + '\n')
+        logger.info(f"Saved {len(self)} recorded responses to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        cassette = cls()
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    cassette._entries.setdefault(tuple(entry.pop('key')), []).append(entry)
+        logger.info(f"Loaded {len(cassette)} recorded responses from {path}")
+        return cassette
+
+
+def _kept_headers(headers: httpx.Headers) -> List[Tuple[str, str]]:
+    return [(name, value) for name, value in headers.multi_items() if name.lower() not in _DROPPED_HEADERS]
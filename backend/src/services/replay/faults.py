@@ -0,0 +1,52 @@
+from typing import Optional
+import json
+import math
+import random
+import httpx
+
+class LatencyModel:
+    """Log-normal response latency around `median_ms`; `sigma=0` gives a fixed delay."""
+
+    def __init__(self, median_ms: float = 0.0, sigma: float = 0.0, seed: int = 0):
+        self.median = median_ms / 1000
+        self.sigma = sigma
+        self._random = random.Random(seed)
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        if self.sigma <= 0:
+            return self.median
+        return self.median * math.exp(self.sigma * self._random.gauss(0, 1))
+
+
+class FaultInjector:
+    """Turn a seeded fraction of replayed calls into 429s or timeouts."""
+
+    def __init__(self, rate_limit_rate: float = 0.0, timeout_rate: float = 0.0,
+                 retry_after: float = 1.0, seed: int = 0):
+        self.rate_limit_rate = rate_limit_rate
+        self.timeout_rate = timeout_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+
+    def inject(self, request: httpx.Request) -> Optional[httpx.Response]:
+        """Return a 429 response or raise a timeout for the chosen calls, else None."""
+        roll = self._random.random()
+        if roll < self.timeout_rate:
+            raise httpx.ReadTimeout("Injected timeout", request=request)
+        if roll < self.timeout_rate + self.rate_limit_rate:
+            body = {
+                'object': 'error',
+                'status': 429,
+                'code': 'rate_limited',
+                'message': 'Injected rate limit',
+                'error': {'message': 'Injected rate limit', 'type': 'rate_limit_exceeded'}
+            }
+            return httpx.Response(
+                429,
+                headers={'retry-after': str(self.retry_after), 'content-type': 'application/json'},
+                content=json.dumps(body).encode(),
+                request=request
+            )
+        return None
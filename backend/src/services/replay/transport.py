@@ -0,0 +1,98 @@
+from typing import Callable, Optional, Tuple
+import asyncio
+import json
+import logging
+import httpx
+from .cassette import Cassette, request_key
+from .faults import FaultInjector, LatencyModel
+
+logger = logging.getLogger(__name__)
+
+TransportWrapper = Callable[[httpx.AsyncBaseTransport], httpx.AsyncBaseTransport]
+
+# Settings forced while replaying: background workers would consume cassette
+# entries, and the ledger, caches and stores must not touch the real files
+REPLAY_OVERRIDES = {
+    'PRE_ANALYSIS_PER_HOUR': 0,
+    'INSIGHTS_REFRESH_SECONDS': 0,
+    'NOTION_MIRROR_PATH': None,
+    'LLM_CACHE_PATH': None,
+    'LLM_LEDGER_PATH': None,
+    'INSIGHTS_STORE_PATH': None
+}
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forward requests to the real transport and record every response."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, cassette: Cassette):
+        self.transport = transport
+        self.cassette = cassette
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        # Read the decoded body; streamed responses are buffered while recording
+        content = await response.aread()
+        await response.aclose()
+        self.cassette.record(request, response, content)
+        return self.cassette.replayable(response, content, request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serve recorded responses with simulated latency and injected faults.
+
+    Unrecorded requests get a 404 error body so gaps in a cassette show up
+    as ordinary API errors instead of hanging a benchmark.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency: Optional[LatencyModel] = None,
+        faults: Optional[FaultInjector] = None
+    ):
+        self.cassette = cassette
+        self.latency = latency or LatencyModel()
+        self.faults = faults or FaultInjector()
+        self.misses = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency.sample())
+        injected = self.faults.inject(request)
+        if injected is not None:
+            return injected
+        response = self.cassette.next_response(request)
+        if response is None:
+            self.misses += 1
+            logger.warning(f"No recorded response for {request.method} {request.url} ({request_key(request)[3]})")
+            body = {'object': 'error', 'status': 404, 'code': 'replay_miss',
+                    'message': 'No recorded response', 'error': {'message': 'No recorded response'}}
+            return httpx.Response(404, json=body, request=request)
+        return response
+
+
+def configure_replay(settings) -> Tuple[Optional[Cassette], Optional[TransportWrapper]]:
+    """Build the cassette and transport wrapper for REPLAY_MODE, if enabled."""
+    mode = settings.REPLAY_MODE
+    if not mode:
+        return None, None
+    if mode == 'record':
+        cassette = Cassette()
+        logger.info(f"Recording Notion and OpenAI responses to {settings.REPLAY_CASSETTE_PATH}")
+        return cassette, lambda transport: RecordingTransport(transport, cassette)
+    if mode == 'replay':
+        cassette = Cassette.load(settings.REPLAY_CASSETTE_PATH)
+        latency = LatencyModel(settings.REPLAY_LATENCY_MS, settings.REPLAY_LATENCY_SIGMA, settings.REPLAY_SEED)
+        faults = FaultInjector(settings.REPLAY_RATE_LIMIT_RATE, settings.REPLAY_TIMEOUT_RATE, seed=settings.REPLAY_SEED)
+        return cassette, lambda transport: ReplayTransport(cassette, latency, faults)
+    raise ValueError(f"Unknown REPLAY_MODE '{mode}', expected 'record' or 'replay'")
+
+
+def replay_settings(settings):
+    """Settings to run the app with; replays run without workers and with in-memory stores."""
+    if settings.REPLAY_MODE != 'replay':
+        return settings
+    logger.info(f"Replaying without background workers or on-disk stores: {', '.join(REPLAY_OVERRIDES)}")
+    return settings.model_copy(update=REPLAY_OVERRIDES)
@@ -0,0 +1,129 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import hashlib
+import re
+import time
+import numpy as np
+
+# Smallest prime above 2**32; with a, b and h below 2**32, a * h + b fits in uint64
+_PRIME = np.uint64(4294967311)
+_MAX32 = 2 ** 32
+_SHINGLE = 3
+
+class SimilarityIndex:
+    """MinHash/LSH index of analyzed task titles.
+
+    Titles are normalized and split into character trigrams. LSH buckets
+    narrow the search to likely matches, which are then scored by exact
+    Jaccard similarity of their trigram sets, so the reported score does not
+    depend on hashing noise. Entries older than `ttl_seconds` are never
+    returned and are evicted when a lookup comes across them.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.7,
+        num_perm: int = 64,
+        bands: int = 16,
+        seed: int = 1,
+        ttl_seconds: float = 7 * 24 * 3600
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MAX32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MAX32, size=num_perm, dtype=np.uint64)
+        # Evicted entries leave None behind so bucket indexes stay valid
+        self._entries: List[Optional[Tuple[str, Set[str], Dict[str, Any], float]]] = []
+        self._titles: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def add(self, title: str, value: Dict[str, Any], created_at: Optional[float] = None):
+        """Index `value` under `title`, replacing any entry for the same normalized title.
+
+        `created_at` defaults to now; pass the original time when reloading.
+        """
+        normalized = normalize_title(title)
+        shingles = _shingles(normalized)
+        if not shingles:
+            return
+        entry = (title, shingles, value, time.time() if created_at is None else created_at)
+        if normalized in self._titles:
+            self._entries[self._titles[normalized]] = entry
+            return
+        index = len(self._entries)
+        self._entries.append(entry)
+        self._titles[normalized] = index
+        for band in self._bands(shingles):
+            self._buckets.setdefault(band, []).append(index)
+
+    def add_all(self, items: Iterable[Tuple[str, Dict[str, Any], float]]) -> int:
+        """Index (title, value, created_at) items."""
+        count = 0
+        for title, value, created_at in items:
+            self.add(title, value, created_at)
+            count += 1
+        return count
+
+    def lookup(self, title: str) -> Optional[Tuple[str, float, Dict[str, Any]]]:
+        """Best (title, score, value) at or above the threshold, if any."""
+        shingles = _shingles(normalize_title(title))
+        if not shingles or not self._entries:
+            return None
+        candidates = set()
+        for band in self._bands(shingles):
+            candidates.update(self._buckets.get(band, ()))
+
+        cutoff = time.time() - self.ttl_seconds
+        best = None
+        for index in candidates:
+            entry = self._entries[index]
+            if entry is None:
+                continue
+            other_title, other, value, created_at = entry
+            if created_at < cutoff:
+                self._evict(index)
+                continue
+            score = len(shingles & other) / len(shingles | other)
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (other_title, round(score, 3), value)
+        return best
+
+    def _evict(self, index: int):
+        title, shingles, _, _ = self._entries[index]
+        self._entries[index] = None
+        del self._titles[normalize_title(title)]
+        for band in self._bands(shingles):
+            bucket = self._buckets[band]
+            bucket.remove(index)
+            if not bucket:
+                del self._buckets[band]
+
+    def _bands(self, shingles: Set[str]) -> List[Tuple[int, bytes]]:
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), 'little') for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        signature = ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', ' ', title.casefold())).strip()
+
+
+def _shingles(normalized: str) -> Set[str]:
+    if len(normalized) <= _SHINGLE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + _SHINGLE] for i in range(len(normalized) - _SHINGLE + 1)}
@@ -1,40 +1,265 @@
-from typing import Dict, Any, Tuple, Optional
-import openai
+from typing import AsyncIterator, Dict, Any, List, Tuple, Optional
 from .notion_client import NotionClient
+from .openai.client import AsyncAIClient
+from .openai.ledger import BudgetExceededError
+from .llm_cache import ResponseCache
+from .similarity_index import SimilarityIndex
+import asyncio
 import logging
 import re
 
 logger = logging.getLogger(__name__)
 
+ANALYSIS_MODEL = "gpt-4"
+ANALYSIS_TEMPERATURE = 0.7
+# Bump whenever the analysis prompt changes so cached answers are not reused
+ANALYSIS_PROMPT_VERSION = "1"
+ANALYSIS_SYSTEM_PROMPT = """You are an AI task analyst.
+                    Analyze tasks and suggest appropriate importance, urgency,
+                    and other relevant properties."""
+
+BATCH_PROMPT_VERSION = "batch-1"
+BATCH_SYSTEM_PROMPT = """You are an AI task analyst. You will receive a numbered
+list of tasks. For every task, suggest importance, urgency and status.
+Answer with one section per task, in order, formatted exactly as:
+[TASK n]
+importance: High/Medium/Low
+urgency: High/Medium/Low
+status: Not Started/In Progress/Completed
+reason: one short sentence"""
+# Completion tokens budgeted per task in a batch prompt
+BATCH_TOKENS_PER_TASK = 60
+
+SUMMARY_MODEL = "gpt-3.5-turbo"
+SUMMARY_MAX_TOKENS = 300
+SUMMARY_SYSTEM_PROMPT = """Summarize this conversation between a user and a task
+management assistant for the assistant's own future reference. Keep decisions,
+task details, preferences and open questions. Be brief and factual."""
+
+CHAT_SYSTEM_PROMPT = """You are an AI task management assistant with access
+            to the user's Notion tasks. You can provide insights, suggestions,
+            and help optimize task properties. When discussing tasks:
+            1. Provide clear, actionable advice
+            2. Consider context and priorities
+            3. Suggest property updates when appropriate
+            4. Explain your reasoning
+
+            If suggesting task property updates, format them as:
+            [TASK_UPDATE]
+            importance: High/Medium/Low
+            urgency: High/Medium/Low
+            status: Not Started/In Progress/Completed
+            [/TASK_UPDATE]
+            """
+
+UPDATE_START = "[TASK_UPDATE]"
+UPDATE_END = "[/TASK_UPDATE]"
+
+class TaskUpdateStreamFilter:
+    """Split streamed text into visible output and [TASK_UPDATE] blocks.
+
+    Text that could be the beginning of a block marker is held back until
+    the next chunk settles it, so no part of a block is ever emitted.
+    """
+
+    def __init__(self):
+        self.block = ""
+        self._pending = ""
+        self._in_block = False
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk and return the text that is safe to show."""
+        self._pending += chunk
+        visible = ""
+        while True:
+            if self._in_block:
+                end = self._pending.find(UPDATE_END)
+                if end < 0:
+                    return visible
+                end += len(UPDATE_END)
+                self.block += self._pending[:end]
+                self._pending = self._pending[end:]
+                self._in_block = False
+                continue
+
+            start = self._pending.find(UPDATE_START)
+            if start >= 0:
+                visible += self._pending[:start]
+                self._pending = self._pending[start:]
+                self._in_block = True
+                continue
+
+            held = _marker_prefix_length(self._pending)
+            visible += self._pending[:len(self._pending) - held]
+            self._pending = self._pending[len(self._pending) - held:]
+            return visible
+
+    def finish(self) -> str:
+        """Flush held-back text once the stream ends; unterminated blocks are dropped."""
+        if self._in_block:
+            logger.warning("Chat stream ended inside an unterminated task update block")
+            return ""
+        visible, self._pending = self._pending, ""
+        return visible
+
+
+def _marker_prefix_length(text: str) -> int:
+    """Length of the longest suffix of `text` that starts an update marker."""
+    for length in range(min(len(text), len(UPDATE_START) - 1), 0, -1):
+        if UPDATE_START.startswith(text[-length:]):
+            return length
+    return 0
+
 class TaskIntelligenceService:
-    def __init__(self, notion_client: NotionClient, openai_api_key: str):
+    def __init__(
+        self,
+        notion_client: NotionClient,
+        openai_client: AsyncAIClient,
+        response_cache: Optional[ResponseCache] = None,
+        similarity_index: Optional[SimilarityIndex] = None
+    ):
         self.notion_client = notion_client
-        openai.api_key = openai_api_key
+        self.openai = openai_client
+        self.response_cache = response_cache or ResponseCache()
+        self.similarity_index = similarity_index or SimilarityIndex(ttl_seconds=self.response_cache.ttl_seconds)
+
+    def load_similarity_index(self) -> int:
+        """Index every analysis on disk; blocking, run it off the event loop."""
+        return self.similarity_index.add_all(
+            self.response_cache.items((ANALYSIS_PROMPT_VERSION, BATCH_PROMPT_VERSION))
+        )
 
     async def analyze_task(self, task_title: str) -> Dict[str, Any]:
-        """Analyze a task and suggest properties."""
+        """Analyze a task and suggest properties, reusing cached or near-duplicate analyses."""
         try:
-            response = await openai.ChatCompletion.create(
-                model="gpt-4",
+            cached = await self.cached_analysis(task_title)
+            if cached is not None:
+                return cached
+
+            response = await self.openai.chat.completions.create(
+                model=ANALYSIS_MODEL,
                 messages=[
-                    {"role": "system", "content": """You are an AI task analyst.
-                    Analyze tasks and suggest appropriate importance, urgency,
-                    and other relevant properties."""},
+                    {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
                     {"role": "user", "content": f"Analyze this task: {task_title}"}
                 ],
-                temperature=0.7,
+                temperature=ANALYSIS_TEMPERATURE,
             )
 
-            return {
+            result = {
                 "analysis": response.choices[0].message.content,
                 "suggested_properties": self._extract_properties(
                     response.choices[0].message.content
                 )
             }
+            await self._remember(task_title, ANALYSIS_PROMPT_VERSION, result)
+            return {**result, "cached": False}
         except Exception as e:
             logger.error(f"Error analyzing task: {str(e)}", exc_info=True)
             raise
 
+    async def analyze_tasks(
+        self,
+        tasks: List[Tuple[str, str]],
+        batch_size: int = 25,
+        concurrency: int = 4
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Analyze many (task_id, title) pairs, yielding results as they complete.
+
+        Cached analyses are yielded first; the rest are packed `batch_size`
+        titles per prompt and sent with at most `concurrency` prompts in flight.
+        A failed prompt yields an error result for each of its tasks.
+        """
+        pending = []
+        for task_id, title in tasks:
+            cached = await self.cached_analysis(title)
+            if cached is not None:
+                yield {"task_id": task_id, "title": title, **cached}
+            else:
+                pending.append((task_id, title))
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(batch: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self._analyze_batch(batch)
+                except BudgetExceededError:
+                    # Every remaining batch would fail the same way, so stop the run
+                    raise
+                except Exception as e:
+                    logger.error(f"Error analyzing batch of {len(batch)} tasks: {str(e)}", exc_info=True)
+                    return [
+                        {"task_id": task_id, "title": title, "error": str(e)}
+                        for task_id, title in batch
+                    ]
+
+        jobs = [
+            asyncio.create_task(run(pending[i:i + batch_size]))
+            for i in range(0, len(pending), batch_size)
+        ]
+        try:
+            for job in asyncio.as_completed(jobs):
+                for result in await job:
+                    yield result
+        finally:
+            for job in jobs:
+                job.cancel()
+
+    async def cached_analysis(self, title: str) -> Optional[Dict[str, Any]]:
+        """A previous analysis of the same title, or else of a near-duplicate one."""
+        for prompt_version in (ANALYSIS_PROMPT_VERSION, BATCH_PROMPT_VERSION):
+            key = ResponseCache.make_key(title, ANALYSIS_MODEL, ANALYSIS_TEMPERATURE, prompt_version)
+            cached = await self.response_cache.get(key)
+            if cached is not None:
+                self.openai.record_cache_hit(ANALYSIS_MODEL)
+                return {**cached, "cached": True}
+
+        match = self.similarity_index.lookup(title)
+        if match is None:
+            return None
+        similar_title, score, analysis = match
+        self.openai.record_cache_hit(ANALYSIS_MODEL)
+        logger.debug("Reusing analysis of '%s' for '%s' (similarity %s)", similar_title, title, score)
+        return {**analysis, "cached": True, "similar_to": similar_title, "similarity": score}
+
+    async def _remember(self, title: str, prompt_version: str, result: Dict[str, Any]):
+        key = ResponseCache.make_key(title, ANALYSIS_MODEL, ANALYSIS_TEMPERATURE, prompt_version)
+        await self.response_cache.put(key, result, title=title, tag=prompt_version)
+        self.similarity_index.add(title, result)
+
+    async def _analyze_batch(self, batch: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Send one prompt for a batch of tasks and split the answer per task."""
+        listing = "\n".join(f"{n}. {title}" for n, (_, title) in enumerate(batch, 1))
+        response = await self.openai.chat.completions.create(
+            model=ANALYSIS_MODEL,
+            messages=[
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Analyze these tasks:\n{listing}"}
+            ],
+            temperature=ANALYSIS_TEMPERATURE,
+            max_tokens=BATCH_TOKENS_PER_TASK * len(batch),
+        )
+        sections = self._split_batch_sections(response.choices[0].message.content)
+
+        results = []
+        for n, (task_id, title) in enumerate(batch, 1):
+            section = sections.get(n)
+            if section is None:
+                results.append({"task_id": task_id, "title": title, "error": "No analysis returned"})
+                continue
+            result = {
+                "analysis": section,
+                "suggested_properties": self._extract_properties(section)
+            }
+            await self._remember(title, BATCH_PROMPT_VERSION, result)
+            results.append({"task_id": task_id, "title": title, **result, "cached": False})
+        return results
+
+    def _split_batch_sections(self, text: str) -> Dict[int, str]:
+        """Map each task number to its [TASK n] section of a batch answer."""
+        parts = re.split(r'\[TASK (\d+)\]', text)
+        return {int(number): body.strip() for number, body in zip(parts[1::2], parts[2::2])}
+
     async def process_chat(
         self,
         conversation: str,
@@ -42,26 +267,10 @@ class TaskIntelligenceService:
     ) -> Tuple[str, Optional[Dict[str, Any]]]:
         """Process chat messages and return response with potential task updates."""
         try:
-            system_prompt = """You are an AI task management assistant with access
-            to the user's Notion tasks. You can provide insights, suggestions,
-            and help optimize task properties. When discussing tasks:
-            1. Provide clear, actionable advice
-            2. Consider context and priorities
-            3. Suggest property updates when appropriate
-            4. Explain your reasoning
-
-            If suggesting task property updates, format them as:
-            [TASK_UPDATE]
-            importance: High/Medium/Low
-            urgency: High/Medium/Low
-            status: Not Started/In Progress/Completed
-            [/TASK_UPDATE]
-            """
-
-            response = await openai.ChatCompletion.create(
+            response = await self.openai.chat.completions.create(
                 model="gpt-4",
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": CHAT_SYSTEM_PROMPT},
                     {"role": "user", "content": conversation}
                 ],
                 temperature=0.7,
@@ -82,6 +291,62 @@ class TaskIntelligenceService:
             logger.error(f"Error processing chat: {str(e)}", exc_info=True)
             raise
 
+    async def stream_chat(
+        self,
+        conversation: str,
+        task_data: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a chat reply as token events, ending with the parsed task updates."""
+        try:
+            response = await self.openai.chat.completions.create(
+                model="gpt-4",
+                messages=[
+                    {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+                    {"role": "user", "content": conversation}
+                ],
+                temperature=0.7,
+                stream=True,
+            )
+
+            update_filter = TaskUpdateStreamFilter()
+            async for chunk in response:
+                if not chunk.choices:
+                    continue
+                content = getattr(chunk.choices[0].delta, "content", None)
+                if not content:
+                    continue
+                visible = update_filter.feed(content)
+                if visible:
+                    yield {"type": "token", "content": visible}
+
+            remainder = update_filter.finish()
+            if remainder:
+                yield {"type": "token", "content": remainder}
+            yield {
+                "type": "task_updates",
+                "taskUpdates": self._extract_task_updates(update_filter.block)
+            }
+
+        except Exception as e:
+            logger.error(f"Error streaming chat: {str(e)}", exc_info=True)
+            raise
+
+    async def summarize_conversation(self, summary: str, messages: List[Dict[str, str]]) -> str:
+        """Fold older chat messages into a running summary."""
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        if summary:
+            transcript = f"Summary so far: {summary}\n{transcript}"
+        response = await self.openai.chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=[
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": transcript}
+            ],
+            temperature=0.2,
+            max_tokens=SUMMARY_MAX_TOKENS,
+        )
+        return response.choices[0].message.content.strip()
+
     def _extract_properties(self, analysis: str) -> Dict[str, str]:
         """Extract suggested properties from analysis text."""
         properties = {}
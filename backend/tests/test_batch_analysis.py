@@ -0,0 +1,86 @@
+import asyncio
+import re
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from src.services.llm_cache import ResponseCache
+from src.services.openai import BudgetExceededError
+from src.services.task_intelligence import TaskIntelligenceService
+
+def completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def batch_reply(prompt, skip=()):
+    count = len(re.findall(r'^\d+\. ', prompt, re.MULTILINE))
+    return ''.join(
+        f"[TASK {n}]\nimportance: High\nurgency: Low\nstatus: In Progress\nreason: test\n"
+        for n in range(1, count + 1) if n not in skip
+    )
+
+@pytest.fixture
+def service():
+    return TaskIntelligenceService(MagicMock(), MagicMock(), response_cache=ResponseCache())
+
+@pytest.mark.asyncio
+async def test_packs_titles_into_few_bounded_prompts(service):
+    in_flight = peak = 0
+
+    async def create(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return completion(batch_reply(kwargs['messages'][1]['content']))
+
+    service.openai.chat.completions.create = create
+    tasks = [(f't{i}', f'Task {i}') for i in range(100)]
+    results = [r async for r in service.analyze_tasks(tasks, batch_size=10, concurrency=3)]
+
+    assert sorted(r['task_id'] for r in results) == sorted(t for t, _ in tasks)
+    assert peak == 3
+    assert results[0]['suggested_properties'] == {
+        'importance': 'High', 'urgency': 'Low', 'status': 'In progress'
+    }
+
+@pytest.mark.asyncio
+async def test_missing_sections_and_failed_prompts_become_errors(service):
+    async def create(**kwargs):
+        prompt = kwargs['messages'][1]['content']
+        if 'Broken' in prompt:
+            raise RuntimeError('boom')
+        return completion(batch_reply(prompt, skip=(2,)))
+
+    service.openai.chat.completions.create = create
+    results = [r async for r in service.analyze_tasks(
+        [('a', 'One'), ('b', 'Two'), ('c', 'Broken')], batch_size=2
+    )]
+    by_id = {r['task_id']: r for r in results}
+
+    assert 'error' not in by_id['a']
+    assert by_id['b']['error'] == 'No analysis returned'
+    assert by_id['c']['error'] == 'boom'
+
+@pytest.mark.asyncio
+async def test_cached_titles_skip_the_prompt(service):
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        return completion(batch_reply(kwargs['messages'][1]['content']))
+
+    service.openai.chat.completions.create = create
+    [r async for r in service.analyze_tasks([('a', 'One')])]
+    again = [r async for r in service.analyze_tasks([('a', ' one ')])]
+
+    assert len(calls) == 1
+    assert again[0]['cached'] is True
+
+@pytest.mark.asyncio
+async def test_exhausted_budget_stops_the_run(service):
+    async def create(**kwargs):
+        raise BudgetExceededError('Daily LLM token budget for POST /api/tasks/analyze is exhausted')
+
+    service.openai.chat.completions.create = create
+    with pytest.raises(BudgetExceededError):
+        [r async for r in service.analyze_tasks([('a', 'One'), ('b', 'Two')], batch_size=1)]
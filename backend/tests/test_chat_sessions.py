@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from src.services.chat_sessions import ChatSessionStore
+
+async def fake_summarize(summary, messages):
+    return (summary + ' ' if summary else '') + f'{len(messages)} msgs'
+
+@pytest.fixture
+def store():
+    return ChatSessionStore(fake_summarize, max_history_tokens=100, keep_recent=2)
+
+def test_sessions_are_reused_by_id(store):
+    session = store.create()
+    assert store.get(session.session_id) is session
+    assert store.get('unknown') is None
+    assert store.delete(session.session_id)
+    assert store.get(session.session_id) is None
+
+@pytest.mark.asyncio
+async def test_single_request_sessions_are_not_compacted(store):
+    session = store.create()
+    for turn in range(5):
+        session.add('user', 'z' * 200)
+    store.record_reply(session, 'answer')
+    await asyncio.sleep(0)
+
+    assert not session.summary and len(session.messages) == 6
+
+@pytest.mark.asyncio
+async def test_history_stays_bounded_over_long_conversations(store):
+    session = store.create()
+    sizes = []
+    for turn in range(30):
+        session.add('user', f'question {turn} ' + 'x' * 100)
+        sizes.append(len(session.render()))
+        store.record_reply(session, 'answer ' + 'y' * 100)
+        await asyncio.sleep(0)
+
+    assert max(sizes[10:]) < 600
+    assert session.summary.startswith('2 msgs')
+    assert session.render().startswith('Summary of earlier conversation:')
+    assert session.messages[-1]['content'].startswith('answer')
+
+@pytest.mark.asyncio
+async def test_failed_summary_keeps_messages(store):
+    async def broken(summary, messages):
+        raise RuntimeError('quota')
+
+    store.summarize = broken
+    session = store.create()
+    for turn in range(5):
+        session.add('user', 'z' * 200)
+    await store.compact(session)
+
+    assert len(session.messages) == 5 and not session.compacting
+
+def test_expired_sessions_are_dropped(store):
+    store.ttl_seconds = -1
+    first = store.create()
+    assert store.get(first.session_id) is None
@@ -0,0 +1,44 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from src.services.task_intelligence import TaskIntelligenceService, TaskUpdateStreamFilter
+
+REPLY = "Focus on it today.\n[TASK_UPDATE]\nimportance: High\nurgency: Low\n[/TASK_UPDATE]\nGood luck!"
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+async def fake_stream(text, size=3):
+    for piece in chunks(text, size):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+@pytest.mark.parametrize('size', [1, 2, 5, 13, len(REPLY)])
+def test_filter_hides_update_block_at_any_chunk_boundary(size):
+    update_filter = TaskUpdateStreamFilter()
+    visible = ''.join(update_filter.feed(piece) for piece in chunks(REPLY, size)) + update_filter.finish()
+
+    assert visible == "Focus on it today.\n\nGood luck!"
+    assert update_filter.block.startswith('[TASK_UPDATE]') and update_filter.block.endswith('[/TASK_UPDATE]')
+
+def test_filter_releases_text_that_only_looks_like_a_marker():
+    update_filter = TaskUpdateStreamFilter()
+    assert update_filter.feed('see [TASK') == 'see '
+    assert update_filter.feed('S] list') == '[TASKS] list'
+    assert update_filter.finish() == ''
+
+def test_filter_drops_unterminated_block():
+    update_filter = TaskUpdateStreamFilter()
+    assert update_filter.feed('Hi [TASK_UPDATE]\nimportance: High') == 'Hi '
+    assert update_filter.finish() == ''
+
+@pytest.mark.asyncio
+async def test_stream_chat_emits_tokens_then_updates():
+    openai_client = MagicMock()
+    create = openai_client.chat.completions.create = AsyncMock(return_value=fake_stream(REPLY))
+    service = TaskIntelligenceService(MagicMock(), openai_client)
+    events = [event async for event in service.stream_chat('user: hello')]
+
+    assert create.call_args.kwargs['stream'] is True
+    text = ''.join(event['content'] for event in events if event['type'] == 'token')
+    assert 'TASK_UPDATE' not in text
+    assert events[-1] == {'type': 'task_updates', 'taskUpdates': {'importance': 'High', 'urgency': 'Low'}}
@@ -0,0 +1,76 @@
+import pytest
+from datetime import datetime
+from src.services.insights.aggregates import PatternAggregates
+
+def task(task_id, edited, status='In Progress', **fields):
+    return {'id': task_id, 'LastEdited': datetime(2024, 1, edited), 'Status': status, **fields}
+
+def done(task_id, edited, category, days):
+    return task(
+        task_id, edited, 'Completed', Category=category,
+        StartDate=datetime(2024, 1, 1), CompletionDate=datetime(2024, 1, 1 + days)
+    )
+
+@pytest.fixture
+def workspace():
+    return {
+        'goals': [{'id': 'g1', 'Title': 'Ship', 'RelatedTasks': ('t1', 't3'), 'LastEdited': datetime(2024, 1, 1)}],
+        'tasks': [done('t1', 1, 'Work', 2), done('t2', 1, 'Home', 10), task('t3', 1, DueDate=datetime(2020, 1, 1))]
+    }
+
+def test_incremental_updates_match_a_full_rebuild(workspace):
+    aggregates = PatternAggregates()
+    assert aggregates.rebuild(workspace) == {'changed': 4, 'removed': 0, 'full': True}
+    assert aggregates.checkpoint == datetime(2024, 1, 1)
+
+    # t3 finishes, t2 is deleted, t4 is new; t1 is untouched and not in the delta
+    edited = [done('t3', 5, 'Work', 4), task('t4', 5, Dependencies=('t3',))]
+    assert aggregates.update({'tasks': edited}, {'tasks': ['t2']}) == {'changed': 2, 'removed': 1, 'full': False}
+    assert aggregates.checkpoint == datetime(2024, 1, 5)
+
+    workspace['tasks'] = [workspace['tasks'][0], *edited]
+    rebuilt = PatternAggregates()
+    rebuilt.rebuild(workspace)
+    now = datetime(2024, 6, 1)
+    assert aggregates.patterns(now) == rebuilt.patterns(now)
+
+    patterns = aggregates.patterns(now)
+    assert patterns['completion_patterns']['completion_rate'] == pytest.approx(0.667)
+    assert patterns['goal_progress'][0]['completed_tasks'] == 2
+    assert patterns['productivity_patterns']['duration_by_category'] == {
+        'Work': {'count': 2, 'mean_days': 3.0, 'stdev_days': 1.0}
+    }
+    assert patterns['blockers'] == []
+
+def test_unchanged_pages_are_skipped(workspace):
+    aggregates = PatternAggregates()
+    aggregates.rebuild(workspace)
+    assert aggregates.update(workspace) == {'changed': 0, 'removed': 0, 'full': False}
+    assert aggregates.rebuild(workspace)['changed'] == 4
+
+def test_removed_pages_edited_again_are_kept(workspace):
+    aggregates = PatternAggregates()
+    aggregates.rebuild(workspace)
+    # A page missing from a stale snapshot but present in the delta is still live
+    assert aggregates.update({'tasks': [task('t3', 6)]}, {'tasks': ['t3', 'unknown']})['removed'] == 0
+    assert aggregates.page_ids('tasks') == {'t1', 't2', 't3'}
+
+def test_aggregates_persist_and_rebuild_when_due(workspace, tmp_path):
+    path = str(tmp_path / 'insights.sqlite')
+    aggregates = PatternAggregates(path=path)
+    assert aggregates.needs_rebuild
+    aggregates.rebuild(workspace)
+    assert not aggregates.needs_rebuild
+    expected = aggregates.patterns(datetime(2024, 6, 1))
+    aggregates.close()
+
+    reopened = PatternAggregates(path=path)
+    assert reopened.patterns(datetime(2024, 6, 1)) == expected
+    assert reopened.checkpoint == datetime(2024, 1, 1)
+    assert not reopened.needs_rebuild
+    assert reopened.update(workspace)['changed'] == 0
+    reopened.close()
+
+    overdue = PatternAggregates(path=path, rebuild_seconds=-1)
+    assert overdue.needs_rebuild
+    overdue.close()
@@ -0,0 +1,54 @@
+import asyncio
+from datetime import datetime
+import pytest
+from src.services.insights.snapshot import WorkspaceSnapshot, load_snapshot
+from src.services.notion.scheduler import Priority
+
+class SlowNotion:
+    """Paginated databases whose pages each take a while to arrive."""
+
+    def __init__(self, pages, delay):
+        self.pages = pages
+        self.delay = delay
+        self.priorities = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def iter_records(self, database, priority=Priority.INTERACTIVE):
+        self.priorities.add(priority)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            for batch in self.pages[database]:
+                await asyncio.sleep(self.delay)
+                for record in batch:
+                    yield record
+        finally:
+            self.in_flight -= 1
+
+@pytest.mark.asyncio
+async def test_databases_load_concurrently():
+    notion = SlowNotion({
+        'goals': [[{'id': 'g1'}]],
+        'tasks': [[{'id': 't1'}, {'id': 't2'}], [{'id': 't3'}]],
+        'projects': [[{'id': 'p1'}]]
+    }, delay=0.01)
+
+    snapshot = await load_snapshot(notion)
+
+    assert [t['id'] for t in snapshot['tasks']] == ['t1', 't2', 't3']
+    assert len(snapshot['goals']) == 1 and len(snapshot['projects']) == 1
+    # All three databases were being paged at the same time
+    assert notion.max_in_flight == 3
+    assert notion.in_flight == 0
+    assert notion.priorities == {Priority.ANALYTICS}
+
+def test_snapshot_is_read_only():
+    snapshot = WorkspaceSnapshot(loaded_at=datetime(2024, 1, 1), tasks=[{'id': 't1'}])
+    assert isinstance(snapshot['tasks'], tuple)
+    assert dict(snapshot).keys() == {'tasks'}
+    assert snapshot.get('goals', ()) == ()
+    with pytest.raises(AttributeError):
+        snapshot.tasks = []
+    with pytest.raises(TypeError):
+        snapshot['tasks'] = []
@@ -0,0 +1,123 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from src.services.insights.snapshot import WorkspaceSnapshot
+from src.services.insights.store import InsightStore
+from src.services.openai import llm_caller
+
+def snapshot(*edits):
+    return WorkspaceSnapshot(loaded_at=None, tasks=[{'id': f't{i}', 'LastEdited': e} for i, e in enumerate(edits)])
+
+@pytest.fixture
+def engine():
+    engine = AsyncMock()
+    engine.gather_data.return_value = snapshot('2024-01-01')
+    engine.insights_for.return_value = {'summary': 'first'}
+    return engine
+
+@pytest.mark.asyncio
+async def test_first_request_waits_then_serves_stored(engine):
+    store = InsightStore(engine, stale_seconds=60)
+
+    first = await store.get()
+    second = await store.get()
+
+    assert first['summary'] == 'first' and first['stale'] is False
+    assert first['version'] == snapshot('2024-01-01').version
+    assert second == first
+    assert engine.insights_for.await_count == 1
+    await store.close()
+
+@pytest.mark.asyncio
+async def test_stale_result_is_served_while_revalidating(engine):
+    store = InsightStore(engine, stale_seconds=0)
+    await store.get()
+
+    engine.gather_data.return_value = snapshot('2024-01-02')
+    engine.insights_for.return_value = {'summary': 'second'}
+    stale = await store.get()
+    assert stale['summary'] == 'first' and stale['stale'] is True
+
+    await store.revalidate()
+    assert (await store.get())['summary'] == 'second'
+    assert [entry['summary'] for entry in store.history()] == ['second', 'first']
+    await store.close()
+
+@pytest.mark.asyncio
+async def test_unchanged_workspace_skips_regeneration(engine):
+    store = InsightStore(engine, stale_seconds=0)
+    assert await store.refresh() is True
+    assert await store.refresh() is False
+    assert engine.insights_for.await_count == 1
+    assert store.stats()['regenerations'] == 1
+    await store.close()
+
+@pytest.mark.asyncio
+async def test_revalidations_are_single_flight(engine):
+    async def slow_gather():
+        await asyncio.sleep(0.05)
+        return snapshot('2024-01-01')
+
+    engine.gather_data.side_effect = slow_gather
+    store = InsightStore(engine)
+    assert store.revalidate() is store.revalidate()
+    await store.revalidate()
+    assert engine.gather_data.await_count == 1
+    await store.close()
+
+@pytest.mark.asyncio
+async def test_results_survive_restart_and_failures_keep_them(engine, tmp_path):
+    path = str(tmp_path / 'insights.sqlite')
+    store = InsightStore(engine, path=path)
+    await store.refresh()
+    await store.close()
+
+    engine.gather_data.side_effect = RuntimeError("notion down")
+    reopened = InsightStore(engine, path=path, stale_seconds=3600)
+    assert (await reopened.get())['summary'] == 'first'
+    assert await reopened.refresh() is False
+    assert reopened.stats()['last_error'] == "notion down"
+    await reopened.close()
+
+@pytest.mark.asyncio
+async def test_no_result_raises(engine):
+    engine.gather_data.side_effect = RuntimeError("notion down")
+    store = InsightStore(engine)
+    with pytest.raises(RuntimeError):
+        await store.get()
+    await store.close()
+
+@pytest.mark.asyncio
+async def test_revalidation_is_billed_to_background(engine):
+    callers = []
+
+    async def insights_for(snapshot):
+        callers.append(llm_caller.get())
+        return {'summary': 'first'}
+
+    engine.insights_for.side_effect = insights_for
+    store = InsightStore(engine, stale_seconds=60)
+    token = llm_caller.set(('GET /api/insights', 'alice'))
+    try:
+        await store.get()
+    finally:
+        llm_caller.reset(token)
+
+    assert callers == [('background', 'system')]
+    await store.close()
+
+@pytest.mark.asyncio
+async def test_close_waits_for_a_running_refresh(engine):
+    started = asyncio.Event()
+
+    async def gather_data():
+        started.set()
+        await asyncio.sleep(10)
+
+    engine.gather_data.side_effect = gather_data
+    store = InsightStore(engine)
+    refresh = store.revalidate()
+    await started.wait()
+    await store.close()
+
+    assert refresh.done()
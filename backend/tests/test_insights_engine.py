@@ -1,5 +1,6 @@
 import pytest
 from datetime import datetime
+from types import SimpleNamespace
 from unittest.mock import Mock, AsyncMock
 from src.services.insights.engine import InsightEngine
 
@@ -13,11 +14,8 @@ def mock_data():
 
 @pytest.fixture
 def mock_response():
-    return {
-        'choices': [{
-            'content': '{"summary": "test", "patterns": [], "recommendations": [], "priorities": []}'
-        }]
-    }
+    content = '{"summary": "test", "patterns": [], "recommendations": [], "priorities": []}'
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
 
 @pytest.fixture
 def insight_engine():
@@ -34,10 +32,63 @@ async def test_synthesize_insights(insight_engine, mock_data, mock_response):
 
 @pytest.mark.asyncio
 async def test_generate_insights_integration(insight_engine, mock_data, mock_response):
-    async def mock_get_database(id):
-        return mock_data['goals']
+    async def iter_records(database, priority=None):
+        for record in mock_data[database]:
+            yield record
 
-    insight_engine.notion.get_database = AsyncMock(side_effect=mock_get_database)
+    insight_engine.notion.iter_records = iter_records
     insight_engine.openai.chat.completions.create.return_value = mock_response
     insights = await insight_engine.generate_insights()
     assert isinstance(insights, dict)
+
+@pytest.mark.asyncio
+async def test_refresh_reads_only_pages_edited_since_the_checkpoint(insight_engine, mock_response):
+    tasks = [
+        {'id': 'task1', 'Status': 'Completed', 'LastEdited': datetime(2024, 1, 1)},
+        {'id': 'task2', 'Status': 'In Progress', 'LastEdited': datetime(2024, 1, 1)}
+    ]
+    insight_engine.openai.chat.completions.create.return_value = mock_response
+    await insight_engine.insights_for({'tasks': tasks, 'goals': []})
+
+    requested = []
+    async def iter_records_since(database, since, priority=None):
+        requested.append((database, since))
+        if database == 'tasks':
+            yield {'id': 'task3', 'Status': 'Completed', 'LastEdited': datetime(2024, 1, 2)}
+
+    insight_engine.notion.iter_records_since = iter_records_since
+    snapshot = {'tasks': [tasks[0], {'id': 'task3', 'Status': 'Completed', 'LastEdited': datetime(2024, 1, 2)}],
+                'goals': []}
+    await insight_engine.insights_for(snapshot)
+
+    assert sorted(requested) == [('goals', datetime(2023, 12, 31, 23, 58)), ('tasks', datetime(2023, 12, 31, 23, 58))]
+    assert insight_engine.aggregates.last_update == {'changed': 1, 'removed': 1, 'full': False}
+    assert insight_engine.aggregates.page_ids('tasks') == {'task1', 'task3'}
+
+def test_base_patterns(insight_engine):
+    data = {
+        'goals': [{'id': 'goal1', 'Title': 'Ship', 'Status': 'In Progress', 'Progress': 60,
+                   'RelatedTasks': ('task1', 'task2')}],
+        'tasks': [
+            {'id': 'task1', 'Status': 'Completed', 'Category': 'Work',
+             'StartDate': datetime(2024, 1, 1), 'CompletionDate': datetime(2024, 1, 3)},
+            {'id': 'task2', 'Title': 'Review', 'Status': 'In Progress',
+             'DueDate': datetime(2020, 1, 1), 'Dependencies': ('task3',)},
+            {'id': 'task3', 'Status': 'Not Started'}
+        ],
+        'projects': []
+    }
+    patterns = insight_engine._analyze_patterns(data)
+
+    assert patterns['completion_patterns']['completion_rate'] == pytest.approx(0.333)
+    assert patterns['completion_patterns']['completed_by_category'] == {'Work': 1}
+    assert patterns['goal_progress'] == [{
+        'goal': 'Ship', 'status': 'In Progress', 'progress': 60, 'related_tasks': 2, 'completed_tasks': 1
+    }]
+    assert patterns['blockers'] == [{'task': 'Review', 'reasons': ['overdue', 'waiting on 1 open tasks']}]
+    assert patterns['productivity_patterns'] == {
+        'completions_by_weekday': {'Wednesday': 1},
+        'average_days_to_complete': 2.0,
+        'duration_histogram': {'1-3d': 1},
+        'duration_by_category': {'Work': {'count': 1, 'mean_days': 2.0, 'stdev_days': 0.0}}
+    }
@@ -0,0 +1,59 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from src.services.llm_cache import ResponseCache
+from src.services.task_intelligence import TaskIntelligenceService
+
+def completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def test_key_normalizes_title():
+    key = ResponseCache.make_key('  Write   Tests ', 'gpt-4', 0.7, '1')
+    assert key == ResponseCache.make_key('write tests', 'gpt-4', 0.7, '1')
+    assert key != ResponseCache.make_key('write tests', 'gpt-4', 0.2, '1')
+    assert key != ResponseCache.make_key('write tests', 'gpt-4', 0.7, '2')
+
+@pytest.mark.asyncio
+async def test_memory_tier_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    await cache.put('a', {'v': 1})
+    await cache.put('b', {'v': 2})
+    await cache.get('a')
+    await cache.put('c', {'v': 3})
+
+    assert await cache.get('b') is None
+    assert await cache.get('a') == {'v': 1}
+    assert cache.stats()['memory_hits'] == 2
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / 'llm.sqlite')
+    cache = ResponseCache(path=path)
+    await cache.put('a', {'v': 1}, title='A')
+    cache.close()
+
+    reopened = ResponseCache(path=path)
+    assert await reopened.get('a') == {'v': 1}
+    assert await reopened.get('a') == {'v': 1}
+    assert reopened.stats() == {
+        'memory_hits': 1, 'disk_hits': 1, 'misses': 0, 'hit_rate': 1.0, 'memory_entries': 1
+    }
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / 'llm.sqlite'), ttl_seconds=0)
+    await cache.put('a', {'v': 1})
+    assert await cache.get('a') is None
+    assert cache.stats()['misses'] == 1
+
+@pytest.mark.asyncio
+async def test_repeat_analysis_skips_openai():
+    openai_client = MagicMock()
+    create = openai_client.chat.completions.create = AsyncMock(return_value=completion('Importance: High'))
+    service = TaskIntelligenceService(MagicMock(), openai_client, response_cache=ResponseCache())
+    first = await service.analyze_task('Write tests')
+    second = await service.analyze_task('write  tests')
+
+    create.assert_awaited_once()
+    assert first['cached'] is False and second['cached'] is True
+    assert second['suggested_properties'] == {'importance': 'High'}
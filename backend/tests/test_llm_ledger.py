@@ -0,0 +1,126 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from src.services.openai import AsyncAIClient, BudgetExceededError, LLMLedger, OpenAISettings, llm_caller
+
+def completion(prompt_tokens, completion_tokens):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content='ok'))],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens
+        )
+    )
+
+def ai_client(ledger):
+    client = AsyncAIClient(OpenAISettings(api_key='sk-test'), ledger=ledger)
+    client.client = AsyncMock()
+    return client
+
+@pytest.fixture
+def caller():
+    token = llm_caller.set(('POST /api/chat', 'alice'))
+    yield
+    llm_caller.reset(token)
+
+@pytest.mark.asyncio
+async def test_calls_are_recorded_per_endpoint_and_user(caller):
+    ledger = LLMLedger()
+    client = ai_client(ledger)
+    client.client.chat.completions.create.return_value = completion(1000, 500)
+
+    await client.chat.completions.create(model='gpt-4', messages=[{'role': 'user', 'content': 'hi'}])
+    client.record_cache_hit('gpt-4')
+
+    [row] = ledger.rollup('endpoint')
+    assert row['endpoint'] == 'POST /api/chat'
+    assert row['calls'] == 2
+    assert row['cache_hits'] == 1
+    assert row['prompt_tokens'] == 1000
+    assert row['completion_tokens'] == 500
+    assert row['cost_usd'] == pytest.approx(0.06)
+    assert ledger.rollup('user')[0]['user'] == 'alice'
+
+@pytest.mark.asyncio
+async def test_streamed_calls_are_estimated(caller):
+    ledger = LLMLedger()
+    client = ai_client(ledger)
+
+    async def chunks():
+        for text in ('abcd', 'efgh', None):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+    client.client.chat.completions.create.return_value = chunks()
+    stream = await client.chat.completions.create(
+        model='gpt-4', messages=[{'role': 'user', 'content': 'x' * 40}], stream=True
+    )
+    assert [chunk.choices[0].delta.content async for chunk in stream] == ['abcd', 'efgh', None]
+
+    [row] = ledger.rollup('model')
+    assert row['prompt_tokens'] == 14
+    assert row['completion_tokens'] == 2
+
+@pytest.mark.asyncio
+async def test_abandoned_streams_are_still_recorded(caller):
+    ledger = LLMLedger()
+    client = ai_client(ledger)
+
+    async def chunks():
+        for text in ('abcd', 'efgh', 'ijkl'):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+    client.client.chat.completions.create.return_value = chunks()
+    stream = await client.chat.completions.create(
+        model='gpt-4', messages=[{'role': 'user', 'content': 'x' * 40}], stream=True
+    )
+    # A client disconnect closes the stream after the first chunk
+    await stream.__anext__()
+    await stream.aclose()
+
+    [row] = ledger.rollup('model')
+    assert row['calls'] == 1
+    assert row['prompt_tokens'] == 14
+    assert row['completion_tokens'] == 1
+
+@pytest.mark.asyncio
+async def test_exhausted_budget_downgrades_the_model(caller):
+    ledger = LLMLedger(budgets={'POST /api/chat': 100}, fallback_model='gpt-3.5-turbo')
+    client = ai_client(ledger)
+    client.client.chat.completions.create.return_value = completion(80, 40)
+
+    await client.chat.completions.create(model='gpt-4', messages=[])
+    await client.chat.completions.create(model='gpt-4', messages=[])
+
+    models = [call.kwargs['model'] for call in client.client.chat.completions.create.call_args_list]
+    assert models == ['gpt-4', 'gpt-3.5-turbo']
+    assert ledger.budget_status()['POST /api/chat'] == {'budget': 100, 'spent': 240, 'remaining': 0}
+
+def test_reject_action_raises_and_other_endpoints_use_wildcard(caller):
+    ledger = LLMLedger(budgets={'POST /api/chat': 10, '*': 1000}, action='reject')
+    ledger.record('gpt-4', 10, 0, 5.0)
+    with pytest.raises(BudgetExceededError):
+        ledger.admit('gpt-4')
+
+    token = llm_caller.set(('GET /api/tasks', 'bob'))
+    try:
+        assert ledger.admit('gpt-4') == 'gpt-4'
+        assert ledger.remaining('GET /api/tasks') == 1000
+    finally:
+        llm_caller.reset(token)
+
+def test_spend_survives_restart(tmp_path, caller):
+    path = str(tmp_path / 'ledger.sqlite')
+    ledger = LLMLedger(path=path, budgets={'*': 500})
+    ledger.record('gpt-4', 300, 100, 12.0)
+    ledger.record('gpt-4', 0, 0, 0.0, cached=True)
+    ledger.close()
+
+    reopened = LLMLedger(path=path, budgets={'*': 500})
+    assert reopened.remaining('POST /api/chat') == 100
+    assert reopened.rollup('endpoint')[0]['calls'] == 2
+    reopened.close()
+
+def test_rollup_rejects_unknown_groups():
+    with pytest.raises(ValueError):
+        LLMLedger().rollup('prompt')
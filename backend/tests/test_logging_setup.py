@@ -0,0 +1,62 @@
+import json
+import logging
+import queue
+import sys
+import pytest
+from src.core.logging_setup import DebugSampler, JsonFormatter, LazyJson, _DeferredQueueHandler
+
+class Payload(dict):
+    dumps = 0
+
+    def items(self):
+        Payload.dumps += 1
+        return super().items()
+
+@pytest.fixture
+def records():
+    def make(level=logging.DEBUG, lineno=10, msg='event %s', args=('x',), **extra):
+        record = logging.LogRecord('test', level, 'module.py', lineno, msg, args, None)
+        record.__dict__.update(extra)
+        return record
+    return make
+
+def test_lazy_json_serializes_only_when_formatted():
+    Payload.dumps = 0
+    logger = logging.getLogger('test.lazy')
+    logger.setLevel(logging.INFO)
+    logger.debug("Task data: %s", LazyJson(Payload(id='t1')))
+    assert Payload.dumps == 0
+    assert str(LazyJson({'id': 't1'})) == '{"id": "t1"}'
+
+def test_json_formatter_includes_extras(records):
+    line = JsonFormatter().format(records(level=logging.INFO, task_id='t1'))
+    entry = json.loads(line)
+    assert entry['message'] == 'event x'
+    assert entry['level'] == 'INFO'
+    assert entry['task_id'] == 't1'
+
+def test_debug_sampler_keeps_one_in_n_per_call_site(records):
+    sampler = DebugSampler(rate=0.25)
+    kept = [sampler.filter(records(lineno=1)) for _ in range(8)]
+    other_site = sampler.filter(records(lineno=2))
+
+    assert kept.count(True) == 2
+    assert other_site
+    assert sampler.filter(records(level=logging.WARNING, lineno=1))
+
+def test_queued_records_capture_arguments_at_call_time(records):
+    log_queue = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(log_queue)
+    page = {'id': 't1', 'status': 'Open'}
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        record = records(level=logging.INFO, msg='page %s', args=(LazyJson(page),), task_id='t1')
+        record.exc_info = sys.exc_info()
+    handler.handle(record)
+    page['status'] = 'Done'
+
+    entry = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+    assert entry['message'] == 'page {"id": "t1", "status": "Open"}'
+    assert entry['task_id'] == 't1'
+    assert 'ValueError: boom' in entry['exc_info']
@@ -1,6 +1,8 @@
+import random
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from src.services.insights.ml_patterns import MLPatternAnalyzer
+from src.services.notion.records import TaskRecord
 
 @pytest.fixture
 def test_data():
@@ -61,3 +63,93 @@ def test_focus_score_calculation(ml_analyzer):
     ]
     score = ml_analyzer._calculate_focus_score(tasks)
     assert 0 <= score <= 1
+
+def random_tasks(count, seed):
+    rng = random.Random(seed)
+    base = datetime(2023, 1, 1)
+    tasks = []
+    for i in range(count):
+        task = {'id': f't{i}', 'Status': rng.choice(['Completed', 'Completed', 'In Progress', 'Delayed', None])}
+        if rng.random() < 0.8:
+            task['Category'] = rng.choice(['Work', 'Home', 'Health', ''])
+        if rng.random() < 0.7:
+            task['StartDate'] = base + timedelta(seconds=rng.randrange(10 ** 8), microseconds=rng.randrange(10 ** 6))
+        if rng.random() < 0.7:
+            start = task.get('StartDate', base)
+            task['CompletionDate'] = start + timedelta(seconds=rng.randrange(10 ** 6), microseconds=rng.randrange(10 ** 6))
+        if rng.random() < 0.6:
+            task['Quality'] = rng.choice([rng.random(), 1, 0])
+        if rng.random() < 0.2:
+            task['Delayed'] = rng.random() < 0.5
+        tasks.append(task)
+    return tasks
+
+@pytest.mark.parametrize('count', [0, 1, 7, 500])
+@pytest.mark.parametrize('as_records', [False, True])
+def test_columnar_matches_row_wise(count, as_records):
+    tasks = random_tasks(count, seed=count)
+    if as_records:
+        tasks = [TaskRecord(**task) for task in tasks]
+    data = {'tasks': tasks, 'goals': [{'Status': 'Completed', 'Category': 'Work'}, {'Status': 'Active'}]}
+
+    columnar = MLPatternAnalyzer(columnar=True).analyze_patterns(data)
+    row_wise = MLPatternAnalyzer().analyze_patterns(data)
+
+    assert columnar == row_wise
+    assert repr(columnar) == repr(row_wise)
+
+def test_columnar_handles_timezone_aware_dates():
+    tz = timezone(timedelta(hours=5))
+    data = {'tasks': [
+        {'Status': 'Completed', 'Category': 'Work', 'StartDate': datetime(2024, 1, 1, 1, tzinfo=tz),
+         'CompletionDate': datetime(2024, 1, 1, 4, tzinfo=tz)},
+        {'Status': 'Completed', 'Category': 'Work', 'StartDate': datetime(2024, 1, 1, 2, tzinfo=timezone.utc),
+         'CompletionDate': datetime(2024, 1, 1, 9, tzinfo=timezone.utc)}
+    ]}
+    assert MLPatternAnalyzer(columnar=True).analyze_patterns(data) == MLPatternAnalyzer().analyze_patterns(data)
+
+def test_focus_summary_size_is_independent_of_task_count(ml_analyzer):
+    small = ml_analyzer.analyze_patterns({'tasks': random_tasks(50, seed=1)})['behavior']['focus_periods']
+    large = ml_analyzer.analyze_patterns({'tasks': random_tasks(5000, seed=2)})['behavior']['focus_periods']
+
+    assert len(large['hour_of_week']['sessions']) == len(small['hour_of_week']['sessions']) == 168
+    assert len(small['top_windows']) <= len(large['top_windows']) == 5
+    assert len(large['peak_slots']) == 3
+    assert large['sessions'] > small['sessions']
+
+def test_focus_windows_and_slots(ml_analyzer):
+    monday = datetime(2024, 1, 1, 9)
+    tasks = [
+        {'Status': 'Completed', 'Quality': 1.0, 'StartDate': monday, 'CompletionDate': monday + timedelta(hours=3)},
+        {'Status': 'Completed', 'Quality': 0.5, 'StartDate': monday, 'CompletionDate': monday + timedelta(hours=1)},
+        {'Status': 'Completed', 'Quality': 1.0, 'StartDate': monday + timedelta(hours=1),
+         'CompletionDate': monday + timedelta(hours=2)},
+        {'Status': 'In Progress', 'StartDate': monday + timedelta(days=1), 'CompletionDate': monday + timedelta(days=1, hours=8)}
+    ]
+    focus = ml_analyzer.analyze_patterns({'tasks': tasks})['behavior']['focus_periods']
+
+    assert focus['sessions'] == 4
+    assert focus['peak_slots'][0] == {'slot': 'Mon 09:00', 'sessions': 2, 'mean_score': 0.9}
+    # Adjacent busy slots form one window; 8 unfinished hours at score 0 come last
+    assert focus['top_windows'] == [
+        {'start': 'Mon 09:00', 'end': 'Mon 11:00', 'hours': 2, 'sessions': 3, 'focused_hours': 4.8, 'mean_score': 0.933},
+        {'start': 'Tue 09:00', 'end': 'Tue 10:00', 'hours': 1, 'sessions': 1, 'focused_hours': 0.0, 'mean_score': 0.0}
+    ]
+
+@pytest.mark.parametrize('columnar', [True, False])
+def test_tasks_left_open_or_misdated_are_not_focus_sessions(columnar):
+    sunday = datetime(2024, 1, 7, 23)
+    tasks = [
+        {'Status': 'Completed', 'Quality': 1.0, 'StartDate': sunday, 'CompletionDate': sunday + timedelta(hours=1)},
+        {'Status': 'Completed', 'Quality': 1.0, 'StartDate': sunday + timedelta(hours=1),
+         'CompletionDate': sunday + timedelta(hours=2)},
+        # Open for weeks, and completed before it started
+        {'Status': 'Completed', 'Quality': 1.0, 'StartDate': sunday, 'CompletionDate': sunday + timedelta(days=30)},
+        {'Status': 'Completed', 'Quality': 1.0, 'StartDate': sunday, 'CompletionDate': sunday - timedelta(hours=5)}
+    ]
+    focus = MLPatternAnalyzer(columnar=columnar).analyze_patterns({'tasks': tasks})['behavior']['focus_periods']
+
+    assert focus['sessions'] == 2
+    assert focus['focused_hours'] == 2.0
+    # Sunday night runs on into Monday morning
+    assert [(w['start'], w['end'], w['hours']) for w in focus['top_windows']] == [('Sun 23:00', 'Mon 01:00', 2)]
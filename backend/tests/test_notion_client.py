@@ -0,0 +1,181 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from src.services.notion_client import NotionClient, NotionClientError
+
+@pytest.fixture
+def settings():
+    return SimpleNamespace(
+        NOTION_API_KEY='ntn_test',
+        NOTION_TASKS_DATABASE_ID='tasks-db',
+        NOTION_AREAS_DATABASE_ID='areas-db',
+        NOTION_PROJECTS_DATABASE_ID='projects-db',
+        NOTION_INSIGHTS_DATABASE_ID='insights-db',
+        NOTION_GOALS_DATABASE_ID='goals-db',
+        NOTION_SCHEMA_CACHE_SECONDS=300,
+        NOTION_TIMEOUT_SECONDS=30,
+        NOTION_RATE_LIMIT_PER_SECOND=1000,
+        NOTION_RATE_LIMIT_BURST=1000,
+        NOTION_MAX_RETRIES=0,
+        NOTION_PAGE_CACHE_SECONDS=5,
+        NOTION_MIRROR_PATH=None
+    )
+
+@pytest.fixture
+def notion(settings):
+    client = NotionClient(settings)
+    client.client = AsyncMock()
+    client.invalidate_schema()
+    return client
+
+def make_batch(ids, next_cursor=None):
+    return {
+        'results': [{'id': page_id, 'properties': {}} for page_id in ids],
+        'has_more': next_cursor is not None,
+        'next_cursor': next_cursor
+    }
+
+@pytest.mark.asyncio
+async def test_iter_tasks_follows_cursor(notion):
+    notion.client.databases.query.side_effect = [
+        make_batch(['t1', 't2'], next_cursor='c1'),
+        make_batch(['t3'], next_cursor='c2'),
+        make_batch(['t4'])
+    ]
+    ids = [task['id'] async for task in notion.iter_tasks()]
+
+    assert ids == ['t1', 't2', 't3', 't4']
+    cursors = [call.kwargs.get('start_cursor') for call in notion.client.databases.query.call_args_list]
+    assert cursors == [None, 'c1', 'c2']
+
+@pytest.mark.asyncio
+async def test_iter_tasks_stops_prefetch_on_early_exit(notion):
+    notion.client.databases.query.side_effect = [
+        make_batch(['t1', 't2'], next_cursor='c1'),
+        make_batch(['t3'], next_cursor='c2'),
+        make_batch(['t4'])
+    ]
+    pages = notion.iter_tasks()
+    first = await pages.__anext__()
+    await pages.aclose()
+
+    assert first['id'] == 't1'
+    assert notion.client.databases.query.call_count <= 2
+
+@pytest.mark.asyncio
+async def test_get_tasks_returns_all_pages(notion):
+    notion.client.databases.retrieve.return_value = {'properties': {}}
+    notion.client.databases.query.side_effect = [
+        make_batch(['t1'], next_cursor='c1'),
+        make_batch(['t2'])
+    ]
+    tasks = await notion.get_tasks()
+    assert [task['id'] for task in tasks] == ['t1', 't2']
+
+@pytest.mark.asyncio
+async def test_query_errors_are_wrapped(notion):
+    notion.client.databases.query.side_effect = RuntimeError('boom')
+    with pytest.raises(NotionClientError):
+        [task async for task in notion.iter_tasks()]
+
+@pytest.mark.asyncio
+async def test_schema_is_retrieved_once(notion):
+    notion.client.databases.retrieve.return_value = {
+        'properties': {'Name': {'type': 'title'}, 'Due Date': {'type': 'date'}}
+    }
+    notion.client.databases.query.return_value = make_batch(['t1'])
+    await notion.get_tasks()
+    await notion.get_tasks()
+    types = await notion.get_property_types()
+
+    assert types == {'Name': 'title', 'Due Date': 'date'}
+    assert notion.client.databases.retrieve.call_count == 1
+
+    notion.invalidate_schema(notion.tasks_db_id)
+    await notion.get_schema()
+    assert notion.client.databases.retrieve.call_count == 2
+
+@pytest.mark.asyncio
+async def test_update_tasks_merges_and_reports_per_task(notion):
+    async def update(page_id, properties):
+        if page_id == 'bad':
+            raise RuntimeError('not found')
+        return {'id': page_id, 'properties': properties}
+
+    notion.client.pages.update.side_effect = update
+    results = await notion.update_tasks([
+        ('t1', {'Importance': {'select': {'name': 'High'}}}),
+        ('t2', {'Urgency': {'select': {'name': 'Low'}}}),
+        ('t1', {'Urgency': {'select': {'name': 'High'}}}),
+        ('bad', {'Urgency': {'select': {'name': 'Low'}}})
+    ], concurrency=2)
+
+    assert results['t1'] == {'status': 'success'}
+    assert results['bad']['status'] == 'error'
+    assert notion.client.pages.update.call_count == 3
+    t1_call = next(c for c in notion.client.pages.update.call_args_list if c.kwargs['page_id'] == 't1')
+    assert set(t1_call.kwargs['properties']) == {'Importance', 'Urgency'}
+
+@pytest.mark.asyncio
+async def test_concurrent_get_task_shares_one_request(notion):
+    async def retrieve(page_id):
+        await asyncio.sleep(0.01)
+        return {'id': page_id, 'properties': {}}
+
+    notion.client.pages.retrieve.side_effect = retrieve
+    results = await asyncio.gather(*(notion.get_task('t1') for _ in range(5)))
+    await notion.get_task('t1')
+
+    assert all(task['id'] == 't1' for task in results)
+    assert notion.client.pages.retrieve.call_count == 1
+    assert notion.page_cache.stats()['coalesced'] == 4
+
+@pytest.mark.asyncio
+async def test_update_task_refreshes_cached_page(notion):
+    notion.client.pages.retrieve.return_value = {'id': 't1', 'properties': {'Status': 'old'}}
+    notion.client.pages.update.return_value = {'id': 't1', 'properties': {'Status': 'new'}}
+    await notion.get_task('t1')
+    await notion.update_task('t1', {'Status': 'new'})
+
+    task = await notion.get_task('t1')
+    assert task['properties']['Status'] == 'new'
+    assert notion.client.pages.retrieve.call_count == 1
+
+@pytest.mark.asyncio
+async def test_read_in_flight_during_update_is_not_cached(notion):
+    released = asyncio.Event()
+
+    async def retrieve(page_id):
+        await released.wait()
+        return {'id': page_id, 'properties': {'Status': 'old'}}
+
+    notion.client.pages.retrieve.side_effect = retrieve
+    notion.client.pages.update.return_value = {'id': 't1', 'properties': {'Status': 'new'}}
+    reading = asyncio.ensure_future(notion.get_task('t1'))
+    await asyncio.sleep(0)
+    await notion.update_task('t1', {'Status': 'new'})
+    released.set()
+
+    assert (await reading)['properties']['Status'] == 'old'
+    assert (await notion.get_task('t1'))['properties']['Status'] == 'new'
+
+@pytest.mark.asyncio
+async def test_cancelled_first_reader_does_not_drop_shared_fetch(notion):
+    released = asyncio.Event()
+
+    async def retrieve(page_id):
+        await released.wait()
+        return {'id': page_id, 'properties': {}}
+
+    notion.client.pages.retrieve.side_effect = retrieve
+    first = asyncio.ensure_future(notion.get_task('t1'))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(notion.get_task('t1'))
+    await asyncio.sleep(0)
+    first.cancel()
+    released.set()
+
+    assert (await second)['id'] == 't1'
+    await notion.get_task('t1')
+    assert notion.client.pages.retrieve.call_count == 1
@@ -0,0 +1,125 @@
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from src.services.notion_client import NotionClient
+from src.services.notion.mirror import MirrorSync
+
+SCHEMA = {'properties': {'Name': {'type': 'title'}, 'Status': {'type': 'status'}}}
+
+@pytest.fixture
+def notion(tmp_path):
+    settings = SimpleNamespace(
+        NOTION_API_KEY='ntn_test',
+        NOTION_TASKS_DATABASE_ID='tasks-db',
+        NOTION_AREAS_DATABASE_ID='areas-db',
+        NOTION_PROJECTS_DATABASE_ID='projects-db',
+        NOTION_INSIGHTS_DATABASE_ID='insights-db',
+        NOTION_GOALS_DATABASE_ID='goals-db',
+        NOTION_SCHEMA_CACHE_SECONDS=300,
+        NOTION_TIMEOUT_SECONDS=30,
+        NOTION_RATE_LIMIT_PER_SECOND=1000,
+        NOTION_RATE_LIMIT_BURST=1000,
+        NOTION_MAX_RETRIES=0,
+        NOTION_PAGE_CACHE_SECONDS=5,
+        NOTION_MIRROR_PATH=str(tmp_path / 'mirror.sqlite')
+    )
+    client = NotionClient(settings)
+    client.client = AsyncMock()
+    client.invalidate_schema()
+    client.client.databases.retrieve.return_value = SCHEMA
+    return client
+
+def page(page_id, edited, **extra):
+    return {'id': page_id, 'last_edited_time': edited, 'properties': {}, **extra}
+
+def batch(*pages):
+    return {'results': list(pages), 'has_more': False, 'next_cursor': None}
+
+@pytest.mark.asyncio
+async def test_full_sync_then_reads_come_from_mirror(notion):
+    notion.client.databases.query.return_value = batch(
+        page('t1', '2024-12-30T10:00:00.000Z'),
+        page('t2', '2024-12-31T10:00:00.000Z')
+    )
+    await MirrorSync(notion, notion.mirror).sync_database('tasks-db')
+    notion.client.databases.query.reset_mock()
+
+    ids = [task['id'] async for task in notion.iter_tasks()]
+    task = await notion.get_task('t1')
+
+    assert ids == ['t2', 't1']
+    assert task['id'] == 't1'
+    notion.client.databases.query.assert_not_called()
+    notion.client.pages.retrieve.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_records_since_reads_only_recent_edits(notion):
+    since = datetime(2024, 12, 31)
+    notion.client.databases.query.return_value = batch(page('t2', '2024-12-31T10:00:00.000Z'))
+    remote = [record['id'] async for record in notion.iter_records_since('tasks', since)]
+    _, kwargs = notion.client.databases.query.call_args
+    assert kwargs['filter'] == {
+        'timestamp': 'last_edited_time', 'last_edited_time': {'on_or_after': '2024-12-31T00:00:00.000Z'}
+    }
+
+    notion.client.databases.query.return_value = batch(
+        page('t1', '2024-12-30T10:00:00.000Z'),
+        page('t2', '2024-12-31T10:00:00.000Z')
+    )
+    await MirrorSync(notion, notion.mirror).sync_database('tasks-db')
+    notion.client.databases.query.reset_mock()
+    mirrored = [record['id'] async for record in notion.iter_records_since('tasks', since)]
+
+    assert remote == mirrored == ['t2']
+    notion.client.databases.query.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_delta_sync_filters_on_checkpoint(notion):
+    sync = MirrorSync(notion, notion.mirror)
+    notion.client.databases.query.return_value = batch(page('t1', '2024-12-30T10:00:00.000Z'))
+    await sync.sync_database('tasks-db')
+
+    notion.client.databases.query.return_value = batch(
+        page('t1', '2024-12-31T09:00:00.000Z'),
+        page('t2', '2024-12-31T10:00:00.000Z', archived=True)
+    )
+    await sync.sync_database('tasks-db')
+
+    query = notion.client.databases.query.call_args.kwargs
+    assert query['filter']['last_edited_time'] == {'on_or_after': '2024-12-30T10:00:00.000Z'}
+    assert notion.mirror.get_checkpoint('tasks-db')['last_edited_time'] == '2024-12-31T10:00:00.000Z'
+    assert notion.mirror.get_page('t1')['last_edited_time'] == '2024-12-31T09:00:00.000Z'
+    assert notion.mirror.get_page('t2') is None
+
+@pytest.mark.asyncio
+async def test_schema_change_forces_full_resync(notion):
+    sync = MirrorSync(notion, notion.mirror)
+    notion.client.databases.query.return_value = batch(page('t1', '2024-12-30T10:00:00.000Z'))
+    await sync.sync_database('tasks-db')
+
+    notion.client.databases.retrieve.return_value = {'properties': {'Name': {'type': 'title'}}}
+    notion.client.databases.query.return_value = batch(page('t3', '2024-12-29T10:00:00.000Z'))
+    await sync.sync_database('tasks-db')
+
+    assert 'filter' not in notion.client.databases.query.call_args.kwargs
+    assert notion.mirror.get_page('t1') is None
+    assert notion.mirror.get_page('t3') is not None
+
+@pytest.mark.asyncio
+async def test_reconcile_drops_pages_deleted_in_notion(notion):
+    sync = MirrorSync(notion, notion.mirror, reconcile_seconds=0)
+    notion.client.databases.query.return_value = batch(
+        page('t1', '2024-12-30T10:00:00.000Z'),
+        page('t2', '2024-12-30T11:00:00.000Z')
+    )
+    await sync.sync_database('tasks-db')
+
+    # t2 was trashed: the delta query no longer returns it, and neither does the ID scan
+    notion.client.databases.query.return_value = batch(page('t1', '2024-12-30T10:00:00.000Z'))
+    await sync.sync_database('tasks-db')
+
+    scan = notion.client.databases.query.call_args.kwargs
+    assert scan['filter_properties'] == ['title'] and 'filter' not in scan
+    assert notion.mirror.get_page('t1') is not None
+    assert notion.mirror.get_page('t2') is None
@@ -0,0 +1,121 @@
+import pytest
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from src.services.notion_client import NotionClient
+from src.services.notion.mirror import MirrorSync
+from src.services.notion.query import TaskQuery
+from src.services.notion.records import TaskRecord, get_decoder
+
+SCHEMA = {
+    'properties': {
+        'Name': {'type': 'title'},
+        'Status': {'type': 'status'},
+        'Due Date': {'type': 'date'},
+        'Project': {'type': 'relation'}
+    }
+}
+
+def page(page_id, status, due, project='proj-1'):
+    return {
+        'id': page_id,
+        'last_edited_time': '2024-12-31T10:00:00.000Z',
+        'properties': {
+            'Name': {'type': 'title', 'title': [{'plain_text': page_id}]},
+            'Status': {'type': 'status', 'status': {'name': status}},
+            'Due Date': {'type': 'date', 'date': {'start': due} if due else None},
+            'Project': {'type': 'relation', 'relation': [{'id': project}]}
+        }
+    }
+
+PAGES = [
+    page('t1', 'In Progress', '2025-01-10'),
+    page('t2', 'In Progress', '2025-01-03'),
+    page('t3', 'Completed', '2025-01-02'),
+    page('t4', 'In Progress', None, project='proj-2')
+]
+
+@pytest.fixture
+def notion(tmp_path):
+    settings = SimpleNamespace(
+        NOTION_API_KEY='ntn_test',
+        NOTION_TASKS_DATABASE_ID='tasks-db',
+        NOTION_AREAS_DATABASE_ID='areas-db',
+        NOTION_PROJECTS_DATABASE_ID='projects-db',
+        NOTION_INSIGHTS_DATABASE_ID='insights-db',
+        NOTION_GOALS_DATABASE_ID='goals-db',
+        NOTION_SCHEMA_CACHE_SECONDS=300,
+        NOTION_TIMEOUT_SECONDS=30,
+        NOTION_RATE_LIMIT_PER_SECOND=1000,
+        NOTION_RATE_LIMIT_BURST=1000,
+        NOTION_MAX_RETRIES=0,
+        NOTION_PAGE_CACHE_SECONDS=5,
+        NOTION_MIRROR_PATH=str(tmp_path / 'mirror.sqlite')
+    )
+    client = NotionClient(settings)
+    client.client = AsyncMock()
+    client.invalidate_schema()
+    client.client.databases.retrieve.return_value = SCHEMA
+    return client
+
+def test_filters_are_pushed_down_to_notion():
+    query = TaskQuery(status='In Progress', due_before=date(2025, 1, 5), project='proj-1', sort='due_date')
+    notion_query = query.to_notion(get_decoder(TaskRecord, SCHEMA))
+
+    assert notion_query['filter'] == {'and': [
+        {'property': 'Status', 'status': {'equals': 'In Progress'}},
+        {'property': 'Due Date', 'date': {'on_or_before': '2025-01-05'}},
+        {'property': 'Project', 'relation': {'contains': 'proj1'}}
+    ]}
+    assert notion_query['sorts'] == [{'property': 'Due Date', 'direction': 'ascending'}]
+
+def test_formula_properties_are_filtered_on_their_result():
+    schema = {'properties': {'Name': {'type': 'title'}, 'Status': {'type': 'formula'}, 'Due': {'type': 'formula'}}}
+    query = TaskQuery(status='Done', due_after=date(2025, 1, 5))
+
+    assert query.to_notion(get_decoder(TaskRecord, schema))['filter'] == {'and': [
+        {'property': 'Status', 'formula': {'string': {'equals': 'Done'}}},
+        {'property': 'Due', 'formula': {'date': {'on_or_after': '2025-01-05'}}}
+    ]}
+
+def test_unknown_sort_is_rejected():
+    with pytest.raises(ValueError):
+        TaskQuery(sort='priority')
+
+@pytest.mark.asyncio
+async def test_filters_the_schema_cannot_satisfy_are_rejected_on_both_paths(notion):
+    notion.client.databases.retrieve.return_value = {
+        'properties': {'Name': {'type': 'title'}, 'Status': {'type': 'status'}}
+    }
+    query = TaskQuery(status='In Progress', project='proj-1')
+
+    with pytest.raises(ValueError, match='Project'):
+        [task async for task in notion.query_tasks(query)]
+    notion.client.databases.query.assert_not_called()
+
+    notion.client.databases.query.return_value = {'results': PAGES, 'has_more': False}
+    await MirrorSync(notion, notion.mirror).sync_database('tasks-db')
+    with pytest.raises(ValueError, match='Project'):
+        [task async for task in notion.query_tasks(query)]
+
+@pytest.mark.asyncio
+async def test_remote_query_sends_filter_and_projects_fields(notion):
+    notion.client.databases.query.return_value = {'results': PAGES[:2], 'has_more': False}
+    query = TaskQuery(status='In Progress', fields=['Name'])
+    tasks = [task async for task in notion.query_tasks(query)]
+
+    sent = notion.client.databases.query.call_args.kwargs
+    assert sent['filter'] == {'property': 'Status', 'status': {'equals': 'In Progress'}}
+    assert tasks[0] == {'id': 't1', 'properties': {'Name': PAGES[0]['properties']['Name']}}
+
+@pytest.mark.asyncio
+async def test_mirror_query_filters_and_sorts_locally(notion):
+    notion.client.databases.query.return_value = {'results': PAGES, 'has_more': False}
+    await MirrorSync(notion, notion.mirror).sync_database('tasks-db')
+    notion.client.databases.query.reset_mock()
+
+    query = TaskQuery(status='In Progress', due_after=date(2025, 1, 1), project='proj-1', sort='due_date')
+    ids = [task['id'] async for task in notion.query_tasks(query)]
+
+    assert ids == ['t2', 't1']
+    notion.client.databases.query.assert_not_called()
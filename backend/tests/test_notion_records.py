@@ -0,0 +1,69 @@
+import pytest
+from datetime import datetime
+from src.services.notion.records import GoalRecord, TaskRecord, get_decoder
+from src.services.insights.ml_patterns import MLPatternAnalyzer
+from src.services.insights.timeline_forecaster import TimelineForecaster
+
+TASKS_SCHEMA = {
+    'properties': {
+        'Name': {'type': 'title'},
+        'Status': {'type': 'status'},
+        'Category': {'type': 'select'},
+        'Start Date': {'type': 'date'},
+        'Due Date': {'type': 'date'},
+        'Complete': {'type': 'checkbox'},
+        'Project': {'type': 'relation'},
+        'Time Estimate': {'type': 'number'}
+    }
+}
+
+def task_page(page_id, title, status, start, complete=True, edited='2024-12-31T10:00:00.000Z'):
+    return {
+        'id': page_id,
+        'created_time': '2024-12-28T09:00:00.000Z',
+        'last_edited_time': edited,
+        'properties': {
+            'Name': {'type': 'title', 'title': [{'plain_text': title}]},
+            'Status': {'type': 'status', 'status': {'name': status}},
+            'Category': {'type': 'select', 'select': {'name': 'Development'}},
+            'Start Date': {'type': 'date', 'date': {'start': start}},
+            'Due Date': {'type': 'date', 'date': None},
+            'Complete': {'type': 'checkbox', 'checkbox': complete},
+            'Project': {'type': 'relation', 'relation': [{'id': 'proj1'}]},
+            'Time Estimate': {'type': 'number', 'number': 2}
+        }
+    }
+
+@pytest.fixture
+def tasks():
+    decoder = get_decoder(TaskRecord, TASKS_SCHEMA)
+    return decoder.decode_all([
+        task_page('t1', 'Write tests', 'Completed', '2024-12-31T08:00:00.000+00:00'),
+        task_page('t2', 'Weekly review', 'Completed', '2024-12-30T06:00:00.000Z',
+                  edited='2024-12-30T09:00:00.000Z')
+    ])
+
+def test_decodes_flat_fields(tasks):
+    task = tasks[0]
+    assert task.Title == 'Write tests'
+    assert task['Status'] == 'Completed'
+    assert task.StartDate == datetime(2024, 12, 31, 8, 0)
+    assert task.CompletionDate == datetime(2024, 12, 31, 10, 0)
+    assert task.Project == 'proj1'
+    assert task.get('DueDate') is None
+    assert task.get('Dependencies', []) == []
+    assert 'DueDate' not in task
+
+def test_decoder_is_built_once_per_schema():
+    assert get_decoder(TaskRecord, TASKS_SCHEMA) is get_decoder(TaskRecord, TASKS_SCHEMA)
+    assert get_decoder(GoalRecord, TASKS_SCHEMA) is not get_decoder(TaskRecord, TASKS_SCHEMA)
+
+def test_records_have_no_instance_dict(tasks):
+    assert not hasattr(tasks[0], '__dict__')
+
+def test_analyzers_accept_records(tasks):
+    durations = TimelineForecaster()._analyze_completion_patterns({'tasks': tasks})
+    patterns = MLPatternAnalyzer().analyze_patterns({'tasks': tasks, 'goals': []})
+
+    assert durations['Development']['mean_duration'] == 2.5
+    assert patterns['productivity']['optimal_duration'] == {'Development': 2.5}
@@ -0,0 +1,92 @@
+import asyncio
+import httpx
+import pytest
+from notion_client import APIResponseError
+from notion_client.errors import APIErrorCode
+from src.services.notion.scheduler import Priority, RequestScheduler
+
+def rate_limited(retry_after='0.05'):
+    request = httpx.Request('POST', 'https://api.notion.com/v1/databases/x/query')
+    response = httpx.Response(429, headers={'Retry-After': retry_after}, request=request)
+    return APIResponseError(response, 'rate limited', APIErrorCode.RateLimited)
+
+def unavailable():
+    request = httpx.Request('POST', 'https://api.notion.com/v1/pages')
+    response = httpx.Response(503, request=request)
+    return APIResponseError(response, 'unavailable', APIErrorCode.ServiceUnavailable)
+
+@pytest.mark.asyncio
+async def test_interactive_requests_jump_the_queue():
+    scheduler = RequestScheduler(rate=50, burst=1)
+    order = []
+
+    async def record(name):
+        order.append(name)
+
+    await scheduler.run(record, 'warmup')
+    await asyncio.gather(
+        scheduler.run(record, 'sync-1', priority=Priority.BACKGROUND),
+        scheduler.run(record, 'sync-2', priority=Priority.BACKGROUND),
+        scheduler.run(record, 'user', priority=Priority.INTERACTIVE)
+    )
+
+    assert order == ['warmup', 'user', 'sync-1', 'sync-2']
+
+@pytest.mark.asyncio
+async def test_429_is_retried_after_retry_after():
+    scheduler = RequestScheduler(rate=100, burst=10, base_delay=0.001)
+    attempts = []
+
+    async def flaky():
+        attempts.append(asyncio.get_running_loop().time())
+        if len(attempts) == 1:
+            raise rate_limited('0.05')
+        return 'ok'
+
+    assert await scheduler.run(flaky) == 'ok'
+    assert attempts[1] - attempts[0] >= 0.05
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_surface_immediately():
+    scheduler = RequestScheduler(rate=100, burst=10)
+    calls = []
+
+    async def broken():
+        calls.append(1)
+        raise ValueError('bad request')
+
+    with pytest.raises(ValueError):
+        await scheduler.run(broken)
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    scheduler = RequestScheduler(rate=100, burst=10, max_retries=2, base_delay=0.001)
+    calls = []
+
+    async def always_limited():
+        calls.append(1)
+        raise rate_limited('0')
+
+    with pytest.raises(APIResponseError):
+        await scheduler.run(always_limited)
+    assert len(calls) == 3
+
+@pytest.mark.asyncio
+async def test_non_idempotent_calls_only_retry_rate_limits():
+    scheduler = RequestScheduler(rate=100, burst=10, base_delay=0.001)
+    calls = []
+
+    async def create(error):
+        calls.append(1)
+        if len(calls) == 1:
+            raise error
+        return 'created'
+
+    with pytest.raises(APIResponseError):
+        await scheduler.run(create, unavailable(), idempotent=False)
+    assert len(calls) == 1
+
+    calls.clear()
+    assert await scheduler.run(create, rate_limited('0'), idempotent=False) == 'created'
+    assert len(calls) == 2
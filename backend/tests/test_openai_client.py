@@ -0,0 +1,70 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from src.services.openai import AsyncAIClient, OpenAISettings
+
+@pytest.fixture
+def ai_client():
+    settings = OpenAISettings(
+        api_key='sk-test',
+        rate_limit_rpm=60,
+        rate_limit_tpm=6000,
+        expected_completion_tokens=100
+    )
+    client = AsyncAIClient(settings)
+    client.client = AsyncMock()
+    return client
+
+def completion(total_tokens):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content='ok'))],
+        usage=SimpleNamespace(total_tokens=total_tokens)
+    )
+
+def test_settings_drive_the_sdk_client():
+    client = AsyncAIClient(OpenAISettings(api_key='sk-test', max_retries=4, timeout=12))
+    assert client.client.max_retries == 4
+    assert client.client.timeout == 12
+
+@pytest.mark.asyncio
+async def test_calls_pass_through_and_consume_budgets(ai_client):
+    ai_client.client.chat.completions.create.return_value = completion(40)
+    messages = [{'role': 'user', 'content': 'x' * 400}]
+
+    response = await ai_client.chat.completions.create(model='gpt-4', messages=messages, timeout=5)
+
+    assert response.choices[0].message.content == 'ok'
+    assert ai_client.client.chat.completions.create.call_args.kwargs['timeout'] == 5
+    assert ai_client.request_bucket.tokens == pytest.approx(59, abs=0.1)
+    # 204 tokens reserved (100 prompt + 4 overhead + 100 completion), 164 refunded
+    assert ai_client.token_bucket.tokens == pytest.approx(5960, abs=1)
+
+def test_estimate_prefers_explicit_max_tokens(ai_client):
+    messages = [{'role': 'system', 'content': 'abcd' * 10}, {'role': 'user', 'content': None}]
+    assert ai_client.estimate_tokens(messages, max_tokens=50) == 14 + 4 + 50
+
+@pytest.mark.asyncio
+async def test_oversized_reservations_never_over_credit(ai_client):
+    ai_client.client.chat.completions.create.return_value = completion(100)
+    messages = [{'role': 'user', 'content': 'x' * 40000}]
+
+    await ai_client.chat.completions.create(model='gpt-4', messages=messages)
+
+    # The 10104-token estimate only took the bucket's 6000, so 5900 come back, not 10004
+    assert ai_client.token_bucket.tokens == pytest.approx(5900, abs=1)
+
+@pytest.mark.asyncio
+async def test_streams_settle_their_reservation(ai_client):
+    async def chunks():
+        for text in ('abcd', 'efgh'):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+    ai_client.client.chat.completions.create.return_value = chunks()
+    stream = await ai_client.chat.completions.create(
+        model='gpt-4', messages=[{'role': 'user', 'content': 'x' * 400}], stream=True
+    )
+    assert ai_client.token_bucket.tokens == pytest.approx(5796, abs=1)
+    [chunk async for chunk in stream]
+
+    # 204 reserved, 104 prompt + 2 completion used
+    assert ai_client.token_bucket.tokens == pytest.approx(5894, abs=1)
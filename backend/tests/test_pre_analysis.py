@@ -0,0 +1,113 @@
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from src.services.llm_cache import ResponseCache
+from src.services.notion.records import TaskRecord, get_decoder
+from src.services.pre_analysis import PreAnalysisWorker, quadrant
+from src.services.task_intelligence import TaskIntelligenceService
+
+SCHEMA = {
+    'properties': {
+        'Name': {'type': 'title'},
+        'Status': {'type': 'status'},
+        'Importance': {'type': 'select'},
+        'Urgency': {'type': 'select'},
+        'Due Date': {'type': 'date'}
+    }
+}
+
+def task(task_id, title, importance='Low', urgency='Low', due=None, status='Not Started'):
+    page = {
+        'id': task_id,
+        'properties': {
+            'Name': {'type': 'title', 'title': [{'plain_text': title}]},
+            'Status': {'type': 'status', 'status': {'name': status}},
+            'Importance': {'type': 'select', 'select': {'name': importance}},
+            'Urgency': {'type': 'select', 'select': {'name': urgency}},
+            'Due Date': {'type': 'date', 'date': {'start': due} if due else None}
+        }
+    }
+    return get_decoder(TaskRecord, SCHEMA).decode(page)
+
+class FakeNotion:
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.queries = []
+
+    async def iter_records(self, database, priority=None, **query):
+        self.queries.append(query)
+        for record in self.tasks:
+            yield record
+
+@pytest.fixture
+def service():
+    openai_client = MagicMock()
+    openai_client.chat.completions.create = AsyncMock(
+        return_value=SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='Importance: High'))])
+    )
+    return TaskIntelligenceService(MagicMock(), openai_client, response_cache=ResponseCache())
+
+def test_orders_by_due_soon_then_quadrant():
+    soon = (datetime.utcnow() + timedelta(days=1)).date().isoformat()
+    worker = PreAnalysisWorker(FakeNotion([]), MagicMock())
+    worker.pending = {t.id: t for t in [
+        task('q4', 'Tidy desk'),
+        task('q2', 'Plan quarter', importance='High'),
+        task('soon', 'File taxes', due=soon),
+        task('q1', 'Fix outage', importance='High', urgency='High')
+    ]}
+    assert [t.id for t in worker.prioritized()] == ['soon', 'q1', 'q2', 'q4']
+    assert quadrant(task('q3', 'Call back', urgency='high ')) == 2
+
+@pytest.mark.asyncio
+async def test_budget_limits_calls_and_leftovers_stay_queued(service):
+    notion = FakeNotion([task('a', 'Write report'), task('b', 'Book flights'), task('c', 'Done', status='Completed')])
+    worker = PreAnalysisWorker(notion, service, analyses_per_hour=1)
+
+    assert await worker.run_once() == 1
+    assert list(worker.pending) == ['b']
+    assert 'filter' not in notion.queries[0]
+
+    # The next round only asks Notion for recent edits
+    await worker.run_once()
+    assert notion.queries[1]['filter']['timestamp'] == 'last_edited_time'
+
+@pytest.mark.asyncio
+async def test_analyze_endpoint_then_hits_cache(service):
+    worker = PreAnalysisWorker(FakeNotion([task('a', 'Write report')]), service)
+    await worker.run_once()
+
+    result = await service.analyze_task('Write report')
+    assert result['cached'] is True
+    service.openai.chat.completions.create.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_retitled_tasks_are_analyzed_again(service):
+    notion = FakeNotion([task('a', 'Write report')])
+    worker = PreAnalysisWorker(notion, service)
+    await worker.run_once()
+    await worker.run_once()
+    assert worker.analyzed == 1
+
+    notion.tasks = [task('a', 'Present quarterly numbers')]
+    await worker.run_once()
+    assert worker.analyzed == 2
+
+@pytest.mark.asyncio
+async def test_closed_and_deleted_tasks_are_forgotten(service):
+    notion = FakeNotion([task('a', 'Write report'), task('b', 'Book flights'), task('c', 'Call bank')])
+    worker = PreAnalysisWorker(notion, service)
+    await worker.run_once()
+    assert set(worker._analyzed_titles) == {'a', 'b', 'c'}
+
+    notion.tasks = [task('a', 'Write report', status='Completed')]
+    await worker.poll()
+    assert set(worker._analyzed_titles) == {'b', 'c'}
+
+    # The daily full poll no longer lists the deleted task c
+    notion.tasks = [task('b', 'Book flights')]
+    worker.full_poll_at -= timedelta(days=2)
+    await worker.poll()
+    assert 'filter' not in notion.queries[-1]
+    assert set(worker._analyzed_titles) == {'b'}
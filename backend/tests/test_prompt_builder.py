@@ -0,0 +1,46 @@
+from src.services.openai.prompt_builder import compact_value, estimate_tokens, render_section, render_task
+from src.services.openai.prompts import create_goal_alignment_prompt, create_insight_prompt
+
+def make_tasks(count):
+    return [
+        {'id': f't{i}', 'Title': f'Task {i}', 'Status': 'Completed' if i % 2 else 'In Progress',
+         'Importance': 'High' if i % 7 == 0 else 'Low', 'Due Date': '2025-01-10'}
+        for i in range(count)
+    ]
+
+GOALS = [
+    {'id': 'g1', 'Title': 'Ship v1', 'Status': 'In Progress', 'Progress': 40, 'Related Tasks': ['t2']},
+    {'id': 'g2', 'Title': 'Old goal', 'Status': 'Completed', 'Progress': 100}
+]
+
+def test_prompt_size_is_bounded_regardless_of_workspace_size():
+    small = create_goal_alignment_prompt(GOALS, make_tasks(10), budget_tokens=800)
+    large = create_goal_alignment_prompt(GOALS, make_tasks(5000), budget_tokens=800)
+
+    assert 'Task 9' in small and 'more' not in small
+    assert estimate_tokens(large) <= 800
+    assert '... ' in large and 'Completed' in large.split('... ')[-1]
+
+def test_relevant_tasks_are_listed_first():
+    prompt = create_goal_alignment_prompt(GOALS, make_tasks(500), budget_tokens=400)
+    listed = prompt.split('Tasks:')[1]
+
+    # Linked to an active goal beats merely open and important
+    assert listed.index('Task 2 ') < listed.index('Task 0 ')
+    assert 'Task 1 ' not in listed
+
+def test_duplicate_lines_are_folded():
+    tasks = [{'Title': 'Inbox zero', 'Status': 'Not Started'}] * 3
+    assert render_section(tasks, render_task, 100) == '- Inbox zero | status Not Started (x3)'
+
+def test_insight_prompt_trims_long_values():
+    data = {
+        'tasks': {'completion_rate': 0.123456, 'peak_productivity_times': list(range(5000)), 'common_blockers': []},
+        'goals': {'goal_progress': {}, 'goal_alignment': None},
+        'behavior': {'consistency': 1, 'adaptation': 2}
+    }
+    prompt = create_insight_prompt(data, budget_tokens=400)
+
+    assert estimate_tokens(prompt) <= 400
+    assert '0.12' in prompt and 'more' in prompt
+    assert compact_value([1, 2, 3], max_items=2) == '[1,2,"+1 more"]'
@@ -0,0 +1,99 @@
+import httpx
+import pytest
+from types import SimpleNamespace
+from src.services.notion_client import NotionClient
+from src.services.notion.transport import NotionTransport
+from src.services.openai import AsyncAIClient, OpenAISettings
+from src.core.config import Settings
+from src.services.replay import Cassette, FaultInjector, LatencyModel, RecordingTransport, ReplayTransport, replay_settings
+
+PAGE = {'object': 'page', 'id': 'task-1', 'properties': {}}
+COMPLETION = {
+    'id': 'c1', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4',
+    'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': 'Importance: High'}}],
+    'usage': {'prompt_tokens': 5, 'completion_tokens': 5, 'total_tokens': 10}
+}
+
+def live_api(request: httpx.Request) -> httpx.Response:
+    if request.url.host == 'api.notion.com':
+        return httpx.Response(200, json=PAGE)
+    return httpx.Response(200, json=COMPLETION)
+
+def notion_settings():
+    return SimpleNamespace(
+        NOTION_API_KEY='ntn_test',
+        NOTION_TASKS_DATABASE_ID='tasks-db',
+        NOTION_AREAS_DATABASE_ID='areas-db',
+        NOTION_PROJECTS_DATABASE_ID='projects-db',
+        NOTION_INSIGHTS_DATABASE_ID='insights-db',
+        NOTION_GOALS_DATABASE_ID='goals-db',
+        NOTION_SCHEMA_CACHE_SECONDS=300,
+        NOTION_TIMEOUT_SECONDS=30,
+        NOTION_RATE_LIMIT_PER_SECOND=1000,
+        NOTION_RATE_LIMIT_BURST=1000,
+        NOTION_MAX_RETRIES=3,
+        NOTION_PAGE_CACHE_SECONDS=0,
+        NOTION_MIRROR_PATH=None
+    )
+
+def clients(wrap):
+    transport = NotionTransport(wrap_transport=wrap)
+    notion = NotionClient(notion_settings(), http_client=transport.http_client)
+    ai = AsyncAIClient(OpenAISettings(api_key='sk-test', max_retries=0), wrap_transport=wrap)
+    return notion, ai
+
+async def exercise(notion, ai):
+    page = await notion.get_task('task-1')
+    reply = await ai.chat.completions.create(model='gpt-4', messages=[{'role': 'user', 'content': 'hi'}])
+    return page, reply.choices[0].message.content
+
+@pytest.mark.asyncio
+async def test_recorded_traffic_replays_offline(tmp_path):
+    cassette = Cassette()
+    recorded = await exercise(*clients(lambda _: RecordingTransport(httpx.MockTransport(live_api), cassette)))
+    path = str(tmp_path / 'cassette.jsonl')
+    cassette.save(path)
+    assert 'ntn_test' not in open(path).read()
+
+    replay = ReplayTransport(Cassette.load(path))
+    assert await exercise(*clients(lambda _: replay)) == recorded == (PAGE, 'Importance: High')
+    assert replay.misses == 0
+
+@pytest.mark.asyncio
+async def test_injected_429s_are_retried_by_the_scheduler(monkeypatch):
+    cassette = Cassette()
+    await exercise(*clients(lambda _: RecordingTransport(httpx.MockTransport(live_api), cassette)))
+
+    faults = FaultInjector(rate_limit_rate=0.5, retry_after=0.01, seed=3)
+    notion, _ = clients(lambda _: ReplayTransport(cassette, faults=faults))
+    monkeypatch.setattr(notion.scheduler, 'base_delay', 0.01)
+    for _ in range(5):
+        assert await notion.get_task('task-1') == PAGE
+
+@pytest.mark.asyncio
+async def test_unrecorded_requests_fail_fast():
+    _, ai = clients(lambda _: ReplayTransport(Cassette()))
+    with pytest.raises(Exception) as error:
+        await ai.chat.completions.create(model='gpt-4', messages=[{'role': 'user', 'content': 'new'}])
+    assert 'No recorded response' in str(error.value)
+
+def test_latency_model_is_seeded():
+    samples = [LatencyModel(100, 0.5, seed=7).sample() for _ in range(2)]
+    assert samples[0] == samples[1] and samples[0] != 0.1
+    assert LatencyModel(100).sample() == 0.1
+
+def test_replays_run_without_workers_or_on_disk_stores():
+    database_ids = {
+        f'NOTION_{name}_DATABASE_ID': name.lower() * 32 for name in ('TASKS', 'AREAS', 'PROJECTS', 'INSIGHTS', 'GOALS')
+    }
+    settings = Settings(
+        _env_file=None, NOTION_API_KEY='ntn_test', OPENAI_API_KEY='sk-test',
+        NOTION_MIRROR_PATH='mirror.sqlite', REPLAY_MODE='replay', **database_ids
+    )
+    replayed = replay_settings(settings)
+
+    assert replayed.PRE_ANALYSIS_PER_HOUR == replayed.INSIGHTS_REFRESH_SECONDS == 0
+    assert replayed.NOTION_MIRROR_PATH is replayed.LLM_LEDGER_PATH is replayed.LLM_CACHE_PATH is None
+    assert replayed.INSIGHTS_STORE_PATH is None
+    assert settings.LLM_LEDGER_PATH == 'llm_ledger.sqlite'
+    assert replay_settings(settings.model_copy(update={'REPLAY_MODE': 'record'})).LLM_LEDGER_PATH == 'llm_ledger.sqlite'
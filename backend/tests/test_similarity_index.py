@@ -0,0 +1,57 @@
+import pytest
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from src.services.llm_cache import ResponseCache
+from src.services.similarity_index import SimilarityIndex, normalize_title
+from src.services.task_intelligence import TaskIntelligenceService
+
+def completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def test_finds_near_duplicates_above_threshold():
+    index = SimilarityIndex(threshold=0.7)
+    index.add('Weekly review', {'analysis': 'weekly'})
+    index.add('Call mom', {'analysis': 'call'})
+
+    title, score, value = index.lookup('Weekly review – Jan')
+    assert (title, value) == ('Weekly review', {'analysis': 'weekly'})
+    assert 0.7 <= score < 1
+    assert index.lookup('Call dad') is None
+    assert index.lookup('Monthly review') is None
+
+def test_same_normalized_title_replaces_entry():
+    index = SimilarityIndex()
+    index.add('Weekly review', {'v': 1})
+    index.add('weekly   REVIEW!', {'v': 2})
+    assert len(index) == 1
+    assert index.lookup('Weekly review')[1:] == (1.0, {'v': 2})
+    assert normalize_title(' Weekly – review ') == 'weekly review'
+
+@pytest.mark.asyncio
+async def test_service_reuses_similar_analysis_across_restarts(tmp_path):
+    path = str(tmp_path / 'llm.sqlite')
+    openai_client = MagicMock()
+    create = openai_client.chat.completions.create = AsyncMock(return_value=completion('Importance: High'))
+    first = TaskIntelligenceService(MagicMock(), openai_client, response_cache=ResponseCache(path=path))
+    await first.analyze_task('Weekly review')
+    first.response_cache.close()
+
+    restarted = TaskIntelligenceService(MagicMock(), openai_client, response_cache=ResponseCache(path=path))
+    assert restarted.load_similarity_index() == 1
+    result = await restarted.analyze_task('Weekly review – Jan')
+
+    create.assert_awaited_once()
+    assert result['similar_to'] == 'Weekly review'
+    assert result['suggested_properties'] == {'importance': 'High'}
+    assert 0.7 <= result['similarity'] < 1
+
+def test_expired_entries_are_skipped_and_evicted():
+    index = SimilarityIndex(ttl_seconds=60)
+    index.add('Weekly review', {'v': 'old'}, created_at=time.time() - 120)
+    index.add('Weekly report', {'v': 'new'})
+
+    assert index.lookup('Weekly review') is None
+    assert len(index) == 1
+    index.add('Weekly review', {'v': 'again'})
+    assert index.lookup('Weekly review')[1:] == (1.0, {'v': 'again'})
@@ -44,10 +44,12 @@ updates = {
 }
 
 try:
-    response = notion.databases.update(
+    notion.databases.update(
         database_id=GOALS_DB_ID,
         properties=updates
     )
+    # A running server only sees the new schema once its cached copy expires
+    # (NOTION_SCHEMA_CACHE_SECONDS); restart it to pick the change up at once
     print("Goals database updated successfully")
 except Exception as e:
     print(f"Error updating database: {e}")
@@ -32,3 +32,25 @@ export const updateTaskProperties = async (taskId: string, properties: Record<st
     throw error;
   }
 };
+
+export const updateTasksProperties = async (
+  updates: { task_id: string; properties: Record<string, any> }[]
+): Promise<Record<string, { status: string; detail?: string }>> => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/api/tasks/properties`, {
+      method: 'PATCH',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ updates }),
+    });
+    if (!response.ok) {
+      throw new Error('Failed to update tasks');
+    }
+    const { results } = await response.json();
+    return results;
+  } catch (error) {
+    console.error('Error updating tasks:', error);
+    throw error;
+  }
+};